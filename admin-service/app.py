@@ -1,6 +1,10 @@
 # Admin Service Main Application
+import time
+_module_started = time.perf_counter()
+
 from flask import Flask, request
 from routes import admin_bp
+from shared.database import init_app as init_database
 from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 
@@ -14,6 +18,7 @@ def get_client_ip(req):
     return ip or req.remote_addr
 
 def create_app():
+    started = time.perf_counter()
     app = Flask(__name__)
     
     # Istio 프록시 체인 신뢰 설정
@@ -32,13 +37,25 @@ def create_app():
     # 실제 클라이언트 IP 로깅 미들웨어 (Istio 환경 최적화)
     @app.before_request
     def log_request_info():
-        if not request.path.endswith('/health'):
+        if not request.path.endswith('/health') and not request.path.startswith('/internal/'):
             real_ip = get_client_ip(request)
             print(f"[ADMIN-SERVICE] {request.method} {request.path} - Client IP: {real_ip}")
     
     # 블루프린트 등록
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     
+    # DB 커넥션 고갈 시 503 응답 훅, readiness 확인
+    # 전체 목록 조회는 기본 기한(DB_REQUEST_TIMEOUT_MS)보다 길게 허용
+    init_database(app, route_timeouts={
+        '/api/admin/bookings': 30000,
+        '/api/admin/schedules': 30000,
+        '/api/admin/discounts': 30000,
+    })
+    
+    # 기동 시간 측정 (readiness 응답에 포함)
+    app.config['STARTUP_TIME_MS'] = round((time.perf_counter() - _module_started) * 1000, 1)
+    print(f"[ADMIN-SERVICE] create_app 완료 ({(time.perf_counter() - started) * 1000:.1f}ms, 모듈 로드 포함 {app.config['STARTUP_TIME_MS']}ms)")
+    
     return app
 
 if __name__ == '__main__':
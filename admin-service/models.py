@@ -3,15 +3,51 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from shared.database import get_db_connection, safe_json_serialize
+from shared.database import get_db_connection, db_session, transaction, iter_query
+from shared.row_serializer import serialize_rows, format_timedelta
+from shared.search_cache import invalidate_schedule, invalidate_route_dates, invalidate_all
+from shared.reference_data import get_reference_data, bump_reference_data
 from mysql.connector import Error
-from datetime import datetime, date, time, timedelta
+from datetime import datetime, date, timedelta
+
+def _admin_time_str(value):
+    """관리자 항공편 목록 시간 형식 유지 (예: '6:30:00', 0이면 '00:00:00')"""
+    return str(value) if value else format_timedelta(value)
+
+_ADMIN_FLIGHT_TIME_FIELDS = {'departure_time': _admin_time_str, 'arrival_time': _admin_time_str}
+
+def _airport_exists(cursor, airport_code):
+    """공항 코드 확인 (참조 데이터 스냅샷에 없을 때만 DB 확인: 스냅샷 로드 이후 추가된 공항)"""
+    snapshot = get_reference_data()
+    if snapshot is not None and snapshot.has_airport(airport_code):
+        return True
+    cursor.execute("SELECT 1 FROM airports WHERE airport_code = %s", (airport_code,))
+    return cursor.fetchone() is not None
+
+_PASSENGER_FIELDS = ('name_kor', 'name_eng', 'birth_date', 'gender', 'seat_number')
+_RAW_PASSENGER_FIELDS = {f'passenger_{field}': (lambda value: value) for field in _PASSENGER_FIELDS}
+
+def _group_booking_passengers(rows):
+    """예약-승객 JOIN 행을 예약별로 묶어 passengers 목록을 붙임 (행은 예약 순으로 연속)"""
+    booking = None
+    for row in rows:
+        passenger_id = row.pop('passenger_id')
+        passenger = {field: row.pop(f'passenger_{field}') for field in _PASSENGER_FIELDS}
+        if booking is None or booking['booking_id'] != row['booking_id']:
+            if booking is not None:
+                yield booking
+            booking = row
+            booking['passengers'] = []
+        if passenger_id is not None:
+            booking['passengers'].append(passenger)
+    if booking is not None:
+        yield booking
 
 class Flight:
     @staticmethod
     def get_all_flights_admin():
         try:
-            connection = get_db_connection()
+            connection = get_db_connection(read_only=True)
             cursor = connection.cursor(dictionary=True)
             query = """
                 SELECT f.*, 
@@ -24,26 +60,9 @@ class Flight:
                 ORDER BY f.departure_time
             """
             cursor.execute(query)
-            flights = cursor.fetchall()
             
-            # JSON 직렬화 가능하도록 데이터 변환
-            for flight in flights:
-                # 시간 필드 문자열로 변환
-                if flight.get('departure_time'):
-                    if isinstance(flight['departure_time'], time):
-                        flight['departure_time'] = flight['departure_time'].strftime('%H:%M')
-                    else:
-                        flight['departure_time'] = str(flight['departure_time'])
-                        
-                if flight.get('arrival_time'):
-                    if isinstance(flight['arrival_time'], time):
-                        flight['arrival_time'] = flight['arrival_time'].strftime('%H:%M')
-                    else:
-                        flight['arrival_time'] = str(flight['arrival_time'])
-                
-                # 기타 필드 안전하게 변환
-                for key, value in flight.items():
-                    flight[key] = safe_json_serialize(value)
+            # JSON 직렬화 가능하도록 데이터 변환 (시간 필드는 기존 문자열 형식 유지)
+            flights = serialize_rows(cursor, cursor.fetchall(), _ADMIN_FLIGHT_TIME_FIELDS)
                 
             return flights, None
         except Error as e:
@@ -77,52 +96,45 @@ class Flight:
                       airline='CloudJet', total_seats=180):
         """항공편 생성 (기존 라우트 호환). duration은 출발/도착 시간으로 계산."""
         try:
-            connection = get_db_connection()
-            cursor = connection.cursor()
+            with transaction() as connection:
+                cursor = connection.cursor()
 
-            # 공항 존재 확인
-            cursor.execute("SELECT airport_code FROM airports WHERE airport_code = %s", (departure_airport,))
-            if not cursor.fetchone():
-                return None, '출발 공항 코드가 유효하지 않습니다.'
-            cursor.execute("SELECT airport_code FROM airports WHERE airport_code = %s", (arrival_airport,))
-            if not cursor.fetchone():
-                return None, '도착 공항 코드가 유효하지 않습니다.'
+                # 공항 존재 확인
+                if not _airport_exists(cursor, departure_airport):
+                    return None, '출발 공항 코드가 유효하지 않습니다.'
+                if not _airport_exists(cursor, arrival_airport):
+                    return None, '도착 공항 코드가 유효하지 않습니다.'
 
-            duration = Flight._compute_duration_str(str(departure_time), str(arrival_time))
+                duration = Flight._compute_duration_str(str(departure_time), str(arrival_time))
 
-            insert_sql = """
-                INSERT INTO flights (flight_id, airline, departure_airport, arrival_airport,
-                                     departure_time, arrival_time, duration, aircraft, base_price, total_seats, is_active)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE)
-            """
-            cursor.execute(insert_sql, (
-                flight_id, airline, departure_airport, arrival_airport,
-                departure_time, arrival_time, duration, aircraft, base_price, total_seats
-            ))
-            connection.commit()
+                insert_sql = """
+                    INSERT INTO flights (flight_id, airline, departure_airport, arrival_airport,
+                                         departure_time, arrival_time, duration, aircraft, base_price, total_seats, is_active)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE)
+                """
+                cursor.execute(insert_sql, (
+                    flight_id, airline, departure_airport, arrival_airport,
+                    departure_time, arrival_time, duration, aircraft, base_price, total_seats
+                ))
+            bump_reference_data()
             return flight_id, None
         except Error as e:
             return None, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
 
     @staticmethod
     def delete_flight(flight_id):
         """항공편 비활성화 (소프트 삭제)"""
         try:
-            connection = get_db_connection()
-            cursor = connection.cursor()
-            cursor.execute("UPDATE flights SET is_active = FALSE WHERE flight_id = %s", (flight_id,))
-            connection.commit()
-            if cursor.rowcount == 0:
-                return False, '항공편을 찾을 수 없습니다.'
+            with transaction() as connection:
+                cursor = connection.cursor()
+                cursor.execute("UPDATE flights SET is_active = FALSE WHERE flight_id = %s", (flight_id,))
+                if cursor.rowcount == 0:
+                    return False, '항공편을 찾을 수 없습니다.'
+            invalidate_all()
+            bump_reference_data()
             return True, None
         except Error as e:
             return False, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
 
     @staticmethod
     def create_flight_with_schedules(payload: dict):
@@ -151,105 +163,102 @@ class Flight:
           }
         }
         """
-        try:
-            connection = get_db_connection()
-            if not connection:
-                return None, '데이터베이스 연결 오류'
-            cursor = connection.cursor()
+        flight = payload.get('flight') or {}
+        schedule = payload.get('schedule') or {}
 
-            flight = payload.get('flight') or {}
-            schedule = payload.get('schedule') or {}
+        # 필수값 검증
+        required_f = ['flight_id', 'departure_airport', 'arrival_airport', 'departure_time', 'arrival_time', 'aircraft', 'base_price']
+        for f in required_f:
+            if f not in flight:
+                return None, f"flight.{f}는 필수입니다."
 
-            # 필수값 검증
-            required_f = ['flight_id', 'departure_airport', 'arrival_airport', 'departure_time', 'arrival_time', 'aircraft', 'base_price']
-            for f in required_f:
-                if f not in flight:
-                    return None, f"flight.{f}는 필수입니다."
+        mode = (schedule.get('mode') or 'single').lower()
+        if mode not in ('single', 'range'):
+            return None, 'schedule.mode는 single 또는 range여야 합니다.'
 
-            mode = (schedule.get('mode') or 'single').lower()
-            if mode not in ('single', 'range'):
-                return None, 'schedule.mode는 single 또는 range여야 합니다.'
+        # 스케줄 생성 날짜 범위 검증 (쓰기 전에 모두 확인)
+        if mode == 'single':
+            if not schedule.get('date'):
+                return None, 'schedule.date는 필수입니다.'
+            start_d = end_d = datetime.strptime(schedule['date'], '%Y-%m-%d').date()
+        else:
+            if not schedule.get('start_date') or not schedule.get('end_date'):
+                return None, 'schedule.start_date, schedule.end_date는 필수입니다.'
+            start_d = datetime.strptime(schedule['start_date'], '%Y-%m-%d').date()
+            end_d = datetime.strptime(schedule['end_date'], '%Y-%m-%d').date()
+            if end_d < start_d:
+                return None, '종료일이 시작일보다 빠릅니다.'
+            # 최대 90일 제한
+            if (end_d - start_d).days > 90:
+                return None, '스케줄 생성 기간은 최대 90일까지만 허용됩니다.'
 
-            # 공항 검증
-            cursor.execute("SELECT 1 FROM airports WHERE airport_code=%s", (flight['departure_airport'],))
-            if not cursor.fetchone():
-                return None, '출발 공항 코드가 유효하지 않습니다.'
-            cursor.execute("SELECT 1 FROM airports WHERE airport_code=%s", (flight['arrival_airport'],))
-            if not cursor.fetchone():
-                return None, '도착 공항 코드가 유효하지 않습니다.'
+        dates = []
+        d = start_d
+        while d <= end_d:
+            dates.append(d)
+            d += timedelta(days=1)
 
-            # 트랜잭션은 autocommit=False 환경에서 첫 쿼리 실행 시 자동 시작됨
-            # 별도의 start_transaction 호출은 "Transaction already in progress"를 유발할 수 있어 호출하지 않음
+        try:
+            with transaction() as connection:
+                cursor = connection.cursor(dictionary=True)
 
-            # flights upsert (존재하면 업데이트, 없으면 생성)
-            duration = Flight._compute_duration_str(str(flight['departure_time']), str(flight['arrival_time']))
-            total_seats = int(flight.get('total_seats') or 180)
-            airline = flight.get('airline') or 'CloudJet'
+                # 공항 검증
+                if not _airport_exists(cursor, flight['departure_airport']):
+                    return None, '출발 공항 코드가 유효하지 않습니다.'
+                if not _airport_exists(cursor, flight['arrival_airport']):
+                    return None, '도착 공항 코드가 유효하지 않습니다.'
 
-            upsert_sql = (
-                "INSERT INTO flights (flight_id, airline, departure_airport, arrival_airport, departure_time, arrival_time, duration, aircraft, base_price, total_seats, is_active) "
-                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE) "
-                "ON DUPLICATE KEY UPDATE airline=VALUES(airline), departure_airport=VALUES(departure_airport), arrival_airport=VALUES(arrival_airport), "
-                "departure_time=VALUES(departure_time), arrival_time=VALUES(arrival_time), duration=VALUES(duration), aircraft=VALUES(aircraft), base_price=VALUES(base_price), total_seats=VALUES(total_seats), is_active=TRUE"
-            )
-            cursor.execute(upsert_sql, (
-                flight['flight_id'], airline, flight['departure_airport'], flight['arrival_airport'],
-                flight['departure_time'], flight['arrival_time'], duration, flight['aircraft'], int(flight['base_price']), total_seats
-            ))
+                # flights upsert (존재하면 업데이트, 없으면 생성)
+                duration = Flight._compute_duration_str(str(flight['departure_time']), str(flight['arrival_time']))
+                total_seats = int(flight.get('total_seats') or 180)
+                airline = flight.get('airline') or 'CloudJet'
 
-            # 스케줄 생성 날짜 집합 계산
-            overwrite = bool(schedule.get('overwrite', False))
-            if mode == 'single':
-                if not schedule.get('date'):
-                    connection.rollback()
-                    return None, 'schedule.date는 필수입니다.'
-                start_d = end_d = datetime.strptime(schedule['date'], '%Y-%m-%d').date()
-            else:
-                if not schedule.get('start_date') or not schedule.get('end_date'):
-                    connection.rollback()
-                    return None, 'schedule.start_date, schedule.end_date는 필수입니다.'
-                start_d = datetime.strptime(schedule['start_date'], '%Y-%m-%d').date()
-                end_d = datetime.strptime(schedule['end_date'], '%Y-%m-%d').date()
-                if end_d < start_d:
-                    connection.rollback()
-                    return None, '종료일이 시작일보다 빠릅니다.'
-                # 최대 90일 제한
-                if (end_d - start_d).days > 90:
-                    connection.rollback()
-                    return None, '스케줄 생성 기간은 최대 90일까지만 허용됩니다.'
-
-            current_price = int(schedule.get('current_price') or flight['base_price'])
-            available_seats = int(schedule.get('available_seats') or total_seats)
+                upsert_sql = (
+                    "INSERT INTO flights (flight_id, airline, departure_airport, arrival_airport, departure_time, arrival_time, duration, aircraft, base_price, total_seats, is_active) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE) "
+                    "ON DUPLICATE KEY UPDATE airline=VALUES(airline), departure_airport=VALUES(departure_airport), arrival_airport=VALUES(arrival_airport), "
+                    "departure_time=VALUES(departure_time), arrival_time=VALUES(arrival_time), duration=VALUES(duration), aircraft=VALUES(aircraft), base_price=VALUES(base_price), total_seats=VALUES(total_seats), is_active=TRUE"
+                )
+                cursor.execute(upsert_sql, (
+                    flight['flight_id'], airline, flight['departure_airport'], flight['arrival_airport'],
+                    flight['departure_time'], flight['arrival_time'], duration, flight['aircraft'], int(flight['base_price']), total_seats
+                ))
+                # rowcount 2: 기존 항공편 정보 변경 (기존 스케줄 전체의 검색 결과에 영향)
+                flight_updated = cursor.rowcount == 2
 
-            created = 0
-            skipped = 0
-            dates = []
-            d = start_d
-            while d <= end_d:
-                dates.append(d)
-                d += timedelta(days=1)
+                overwrite = bool(schedule.get('overwrite', False))
+                current_price = int(schedule.get('current_price') or flight['base_price'])
+                available_seats = int(schedule.get('available_seats') or total_seats)
 
-            for d in dates:
-                if overwrite:
-                    insert_sql = (
-                        "INSERT INTO flight_schedules (flight_id, flight_date, current_price, available_seats, status) "
-                        "VALUES (%s, %s, %s, %s, 'ACTIVE') "
-                        "ON DUPLICATE KEY UPDATE current_price=VALUES(current_price), available_seats=VALUES(available_seats), status='ACTIVE'"
-                    )
-                    cursor.execute(insert_sql, (flight['flight_id'], d.strftime('%Y-%m-%d'), current_price, available_seats))
-                    created += 1
-                else:
-                    try:
-                        cursor.execute(
-                            "INSERT INTO flight_schedules (flight_id, flight_date, current_price, available_seats, status) VALUES (%s, %s, %s, %s, 'ACTIVE')",
-                            (flight['flight_id'], d.strftime('%Y-%m-%d'), current_price, available_seats)
+                created = 0
+                skipped = 0
+                for d in dates:
+                    if overwrite:
+                        insert_sql = (
+                            "INSERT INTO flight_schedules (flight_id, flight_date, current_price, available_seats, status) "
+                            "VALUES (%s, %s, %s, %s, 'ACTIVE') "
+                            "ON DUPLICATE KEY UPDATE current_price=VALUES(current_price), available_seats=VALUES(available_seats), status='ACTIVE'"
                         )
+                        cursor.execute(insert_sql, (flight['flight_id'], d.strftime('%Y-%m-%d'), current_price, available_seats))
                         created += 1
-                    except Error as ie:
-                        # 중복 등으로 실패 시 스킵
-                        skipped += 1
+                    else:
+                        try:
+                            cursor.execute(
+                                "INSERT INTO flight_schedules (flight_id, flight_date, current_price, available_seats, status) VALUES (%s, %s, %s, %s, 'ACTIVE')",
+                                (flight['flight_id'], d.strftime('%Y-%m-%d'), current_price, available_seats)
+                            )
+                            created += 1
+                        except Error as ie:
+                            # 중복 등으로 실패 시 스킵
+                            skipped += 1
 
-            connection.commit()
+            # 새로 생성/변경된 스케줄 날짜의 검색 캐시만 삭제 (항공편 정보가 바뀌었으면 전체)
+            if flight_updated:
+                invalidate_all()
+            else:
+                invalidate_route_dates(flight['departure_airport'], flight['arrival_airport'], dates)
+            # 신규 항공편 생성/정보 변경 모두 항공편 카탈로그에 반영
+            bump_reference_data()
             return {
                 'flight_id': flight['flight_id'],
                 'created_schedules': created,
@@ -257,24 +266,13 @@ class Flight:
                 'total_requested': len(dates)
             }, None
         except Error as e:
-            if 'connection' in locals() and connection:
-                try:
-                    connection.rollback()
-                except Exception:
-                    pass
             return None, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if 'connection' in locals() and connection:
-                connection.close()
 
 class Promotion:
     @staticmethod
     def get_available_schedules():
-        """할인 가능한 스케줄 목록 조회"""
+        """할인 가능한 스케줄 목록 조회 (행 단위 스트림 반환)"""
         try:
-            connection = get_db_connection()
-            cursor = connection.cursor(dictionary=True)
-            
             # 미래 항공편 스케줄 조회 (할인 정보 포함)
             query = """
                 SELECT 
@@ -303,28 +301,15 @@ class Promotion:
                 ORDER BY fs.flight_date, f.departure_time
             """
             
-            cursor.execute(query)
-            schedules = cursor.fetchall()
-            
-            # JSON 직렬화 가능하도록 데이터 변환
-            for schedule in schedules:
-                for key, value in schedule.items():
-                    schedule[key] = safe_json_serialize(value)
-                    
-            return schedules, None
+            # 전체 목록을 메모리에 만들지 않고 배치 단위로 읽어 응답으로 바로 전송
+            return iter_query(query), None
         except Error as e:
             return None, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
 
     @staticmethod
     def get_discounts():
-        """현재 할인 목록 조회 (스케줄 기반)"""
+        """현재 할인 목록 조회 (스케줄 기반, 행 단위 스트림 반환)"""
         try:
-            connection = get_db_connection()
-            cursor = connection.cursor(dictionary=True)
-            
             query = """
                 SELECT 
                     fd.discount_id,
@@ -353,94 +338,87 @@ class Promotion:
                 ORDER BY fd.created_at DESC
             """
             
-            cursor.execute(query)
-            discounts = cursor.fetchall()
-            
-            # JSON 직렬화 가능하도록 데이터 변환
-            for discount in discounts:
-                for key, value in discount.items():
-                    discount[key] = safe_json_serialize(value)
-                    
-            return discounts, None
+            return iter_query(query), None
         except Error as e:
             return None, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
 
     @staticmethod
     def create_discount(schedule_id, discount_percentage):
         """스케줄별 할인 생성"""
         try:
-            connection = get_db_connection()
-            cursor = connection.cursor()
-            
-            # 스케줄 존재 확인
-            cursor.execute("SELECT schedule_id FROM flight_schedules WHERE schedule_id = %s", (schedule_id,))
-            if not cursor.fetchone():
-                return None, "항공편 스케줄을 찾을 수 없습니다."
-            
-            # 중복 할인 확인
-            cursor.execute("""
-                SELECT discount_id FROM flight_discounts 
-                WHERE schedule_id = %s AND status = 'ACTIVE'
-            """, (schedule_id,))
-            
-            if cursor.fetchone():
-                return None, "해당 스케줄에 이미 할인이 설정되어 있습니다."
-            
-            # 할인 생성
-            query = """
-                INSERT INTO flight_discounts (schedule_id, discount_percentage, status)
-                VALUES (%s, %s, 'ACTIVE')
-            """
-            
-            cursor.execute(query, (schedule_id, discount_percentage))
-            connection.commit()
+            with transaction() as connection:
+                cursor = connection.cursor()
+                
+                # 스케줄 존재 확인
+                cursor.execute("SELECT schedule_id FROM flight_schedules WHERE schedule_id = %s", (schedule_id,))
+                if not cursor.fetchone():
+                    return None, "항공편 스케줄을 찾을 수 없습니다."
+                
+                # 중복 할인 확인
+                cursor.execute("""
+                    SELECT discount_id FROM flight_discounts 
+                    WHERE schedule_id = %s AND status = 'ACTIVE'
+                """, (schedule_id,))
+                
+                if cursor.fetchone():
+                    return None, "해당 스케줄에 이미 할인이 설정되어 있습니다."
+                
+                # 할인 생성
+                query = """
+                    INSERT INTO flight_discounts (schedule_id, discount_percentage, status)
+                    VALUES (%s, %s, 'ACTIVE')
+                """
+                
+                cursor.execute(query, (schedule_id, discount_percentage))
+                discount_id = cursor.lastrowid
             
-            discount_id = cursor.lastrowid
             print(f"할인 생성 완료: ID {discount_id}, 스케줄 {schedule_id}, 할인율 {discount_percentage}%")
             
+            # 할인 가격이 반영되도록 해당 스케줄의 검색 캐시 삭제
+            with db_session() as connection:
+                invalidate_schedule(connection, schedule_id)
+            
             return discount_id, None
         except Error as e:
             return None, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
     
     @staticmethod
     def delete_discount(discount_id):
         """할인 삭제"""
         try:
-            connection = get_db_connection()
-            cursor = connection.cursor()
-            
-            # 할인 비활성화 (삭제 대신)
-            cursor.execute("""
-                UPDATE flight_discounts 
-                SET status = 'INACTIVE' 
-                WHERE discount_id = %s
-            """, (discount_id,))
-            connection.commit()
-            
-            if cursor.rowcount == 0:
-                return False, "할인을 찾을 수 없습니다."
+            with transaction() as connection:
+                cursor = connection.cursor()
+                
+                # 검색 캐시 무효화 대상 스케줄 확인
+                cursor.execute("SELECT schedule_id FROM flight_discounts WHERE discount_id = %s", (discount_id,))
+                discount = cursor.fetchone()
+                
+                # 할인 비활성화 (삭제 대신)
+                cursor.execute("""
+                    UPDATE flight_discounts 
+                    SET status = 'INACTIVE' 
+                    WHERE discount_id = %s
+                """, (discount_id,))
+                
+                if cursor.rowcount == 0:
+                    return False, "할인을 찾을 수 없습니다."
             
             print(f"할인 삭제 완료: {discount_id}")
+            with db_session() as connection:
+                invalidate_schedule(connection, discount[0])
             return True, None
         except Error as e:
             return False, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
 
 class Booking:
     @staticmethod
     def get_all_bookings_admin():
-        """관리자용 예약 목록 조회 - 상세 정보 포함"""
+        """관리자용 예약 목록 조회 - 상세 정보 포함 (행 단위 스트림 반환)
+
+        스트리밍 중에는 같은 커넥션으로 승객을 따로 조회할 수 없으므로 승객을 JOIN해
+        예약별로 연속된 행을 묶는다 (예약마다 승객 쿼리를 보내던 N+1 조회도 제거).
+        """
         try:
-            connection = get_db_connection()
-            cursor = connection.cursor(dictionary=True)
             query = """
                 SELECT 
                     b.booking_id,
@@ -463,40 +441,27 @@ class Booking:
                     f.duration,
                     f.airline,
                     dep.airport_name as departure_name,
-                    arr.airport_name as arrival_name
+                    arr.airport_name as arrival_name,
+                    p.passenger_id as passenger_id,
+                    p.name_kor as passenger_name_kor,
+                    p.name_eng as passenger_name_eng,
+                    p.birth_date as passenger_birth_date,
+                    p.gender as passenger_gender,
+                    p.seat_number as passenger_seat_number
                 FROM bookings b
                 JOIN users u ON b.user_id = u.user_id
                 JOIN flight_schedules fs ON b.schedule_id = fs.schedule_id
                 JOIN flights f ON fs.flight_id = f.flight_id
                 JOIN airports dep ON f.departure_airport = dep.airport_code
                 JOIN airports arr ON f.arrival_airport = arr.airport_code
-                ORDER BY b.created_at DESC
+                LEFT JOIN passengers p ON p.booking_id = b.booking_id
+                ORDER BY b.created_at DESC, b.booking_id, p.passenger_id
             """
-            cursor.execute(query)
-            bookings = cursor.fetchall()
-            
-            # 각 예약의 승객 정보 추가
-            for booking in bookings:
-                cursor.execute("""
-                    SELECT name_kor, name_eng, birth_date, gender, seat_number
-                    FROM passengers
-                    WHERE booking_id = %s
-                """, (booking['booking_id'],))
-                
-                passengers = cursor.fetchall()
-                booking['passengers'] = passengers
-                
-                # JSON 직렬화 가능하도록 데이터 변환
-                for key, value in booking.items():
-                    if key != 'passengers':
-                        booking[key] = safe_json_serialize(value)
-                    
-            return bookings, None
+            # 승객 정보는 기존 응답처럼 변환하지 않고 그대로 둠
+            rows = iter_query(query, overrides=_RAW_PASSENGER_FIELDS)
+            return _group_booking_passengers(rows), None
         except Error as e:
             return None, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
 
 class User:
     @staticmethod
@@ -6,6 +6,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from flask import Blueprint, request, jsonify
 from models import Flight, Promotion, Booking, User
 from shared.auth import token_required, admin_required
+from shared.database import stream_json_rows
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -82,7 +83,8 @@ def get_available_schedules(current_user_id):
         schedules, error = Promotion.get_available_schedules()
         if error:
             return jsonify({'message': error}), 500
-        return jsonify({'schedules': schedules}), 200
+        # 목록 전체를 메모리에 만들지 않고 행 단위로 전송
+        return stream_json_rows('schedules', schedules)
     except Exception as e:
         return jsonify({'message': f'서버 오류: {str(e)}'}), 500
 
@@ -95,7 +97,7 @@ def get_discounts(current_user_id):
         discounts, error = Promotion.get_discounts()
         if error:
             return jsonify({'message': error}), 500
-        return jsonify({'discounts': discounts}), 200
+        return stream_json_rows('discounts', discounts)
     except Exception as e:
         return jsonify({'message': f'서버 오류: {str(e)}'}), 500
 
@@ -144,7 +146,7 @@ def get_all_bookings(current_user_id):
         bookings, error = Booking.get_all_bookings_admin()
         if error:
             return jsonify({'message': error}), 500
-        return jsonify({'bookings': bookings}), 200
+        return stream_json_rows('bookings', bookings)
     except Exception as e:
         return jsonify({'message': f'서버 오류: {str(e)}'}), 500
 
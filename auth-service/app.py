@@ -2,8 +2,12 @@
 # JWT 토큰 기반 회원가입, 로그인, 토큰 검증 담당
 # 블루그린 테스트1
 
+import time
+_module_started = time.perf_counter()
+
 from flask import Flask, request
 from routes import auth_bp
+from shared.database import init_app as init_database
 from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import logging
@@ -18,6 +22,7 @@ def get_client_ip(req):
     return ip or req.remote_addr
 
 def create_app():
+    started = time.perf_counter()
     app = Flask(__name__)
     
     # Istio 프록시 체인 신뢰 설정
@@ -42,7 +47,7 @@ def create_app():
         real_ip = get_client_ip(request)
 
         # Health check 요청은 로깅하지 않음
-        if request.path.endswith('/health') or real_ip in HEALTH_CHECK_IPS:
+        if request.path.endswith('/health') or request.path.startswith('/internal/') or real_ip in HEALTH_CHECK_IPS:
             return
 
         print(f"[AUTH-SERVICE] {request.method} {request.path} - Client IP: {real_ip}")
@@ -50,6 +55,13 @@ def create_app():
     # 블루프린트 등록
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     
+    # DB 커넥션 고갈 시 503 응답 훅, readiness 확인
+    init_database(app)
+    
+    # 기동 시간 측정 (readiness 응답에 포함)
+    app.config['STARTUP_TIME_MS'] = round((time.perf_counter() - _module_started) * 1000, 1)
+    print(f"[AUTH-SERVICE] create_app 완료 ({(time.perf_counter() - started) * 1000:.1f}ms, 모듈 로드 포함 {app.config['STARTUP_TIME_MS']}ms)")
+    
     return app
 
 if __name__ == '__main__':
@@ -3,11 +3,71 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from shared.database import get_db_connection, safe_json_serialize
+from shared.database import db_session, transaction, register_statement, run_statement
+from shared.search_cache import get_schedule_route, update_schedule_seats
 from mysql.connector import Error
 import random
 import string
 
+# 자주 실행하는 예약 쿼리 (prepared statement로 재사용)
+_BOOKING_COLUMNS = """
+        b.booking_id,
+        b.booking_number,
+        b.seat_number,
+        b.total_amount,
+        b.contact_email,
+        b.contact_phone,
+        b.payment_method,
+        b.status,
+        b.created_at,
+        fs.flight_date,
+        f.flight_id,
+        f.airline,
+        f.departure_airport,
+        f.arrival_airport,
+        f.departure_time,
+        f.arrival_time,
+        f.duration,
+        f.aircraft,
+        da.airport_name as departure_name,
+        aa.airport_name as arrival_name"""
+
+_BOOKING_JOINS = """
+    FROM bookings b
+    JOIN flight_schedules fs ON b.schedule_id = fs.schedule_id
+    JOIN flights f ON fs.flight_id = f.flight_id
+    JOIN airports da ON f.departure_airport = da.airport_code
+    JOIN airports aa ON f.arrival_airport = aa.airport_code"""
+
+# 항공편 좌석 확인 (검색 캐시 갱신용 노선 정보 함께 조회)
+SEAT_CHECK_STATEMENT = register_statement('booking_seat_check', """
+    SELECT fs.available_seats, f.departure_airport, f.arrival_airport, fs.flight_date
+    FROM flight_schedules fs
+    JOIN flights f ON fs.flight_id = f.flight_id
+    WHERE fs.schedule_id = %s AND fs.status = 'ACTIVE'
+""", dictionary=False)
+
+USER_BOOKINGS_STATEMENT = register_statement('booking_list_by_user', f"""
+    SELECT {_BOOKING_COLUMNS}
+    {_BOOKING_JOINS}
+    WHERE b.user_id = %s
+    ORDER BY b.created_at DESC
+""", serialize=True)
+
+BOOKING_BY_NUMBER_STATEMENT = register_statement('booking_by_number', f"""
+    SELECT {_BOOKING_COLUMNS},
+        u.name as user_name
+    {_BOOKING_JOINS}
+    JOIN users u ON b.user_id = u.user_id
+    WHERE b.booking_number = %s
+""", serialize=True)
+
+BOOKING_PASSENGERS_STATEMENT = register_statement('booking_passengers', """
+    SELECT name_kor, name_eng, birth_date, gender, seat_number
+    FROM passengers
+    WHERE booking_id = %s
+""")
+
 def generate_booking_number():
     """예약 번호 생성"""
     return 'CJ' + ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
@@ -17,26 +77,14 @@ class Booking:
     def create_booking(user_id, schedule_id, passengers, contact_info, payment_method, total_amount, seats=None):
         """새 예약 생성"""
         try:
-            connection = get_db_connection()
-            if not connection:
-                return None, "데이터베이스 연결 오류"
-            
-            cursor = connection.cursor()
-            
-            # 트랜잭션 시작
-            connection.start_transaction()
-            
-            try:
-                # 항공편 좌석 확인
-                cursor.execute("""
-                    SELECT available_seats FROM flight_schedules 
-                    WHERE schedule_id = %s AND status = 'ACTIVE'
-                """, (schedule_id,))
+            with transaction() as connection:
+                cursor = connection.cursor()
                 
-                result = cursor.fetchone()
+                # 항공편 좌석 확인 (검색 캐시 갱신용 노선 정보 함께 조회)
+                result = run_statement(connection, SEAT_CHECK_STATEMENT, (schedule_id,), fetch='one')
                 if not result or result[0] < len(passengers):
-                    connection.rollback()
                     return None, "선택한 항공편의 좌석이 부족합니다."
+                route = result[1:]
                 
                 # 예약 번호 생성
                 booking_number = generate_booking_number()
@@ -57,7 +105,6 @@ class Booking:
                     """, (schedule_id, schedule_id, selected_seat))
                     
                     if cursor.fetchone():
-                        connection.rollback()
                         return None, f"이미 선택된 좌석입니다: {selected_seat}"
 
                 # 예약 생성
@@ -101,208 +148,80 @@ class Booking:
                     SET available_seats = available_seats - %s 
                     WHERE schedule_id = %s
                 """, (len(passengers), schedule_id))
-                
-                connection.commit()
-                return { 'booking_number': booking_number, 'booking_id': booking_id }, None
-                
-            except Exception as e:
-                connection.rollback()
-                raise e
+            
+            # 검색 캐시의 해당 스케줄 잔여 좌석 반영 (커밋 이후)
+            update_schedule_seats(route, schedule_id, -len(passengers))
+            return { 'booking_number': booking_number, 'booking_id': booking_id }, None
                 
         except Error as e:
             return None, f"예약 처리 중 오류가 발생했습니다: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
     
     @staticmethod
     def get_user_bookings(user_id):
         """사용자의 예약 목록 조회"""
         try:
-            connection = get_db_connection()
-            if not connection:
-                return None, "데이터베이스 연결 오류"
-            
-            cursor = connection.cursor(dictionary=True)
+            with db_session(read_only=True) as connection:
+                # 사용자의 예약 목록 조회
+                bookings = run_statement(connection, USER_BOOKINGS_STATEMENT, (user_id,))
             
-            # 사용자의 예약 목록 조회
-            booking_query = """
-                SELECT 
-                    b.booking_id,
-                    b.booking_number,
-                    b.seat_number,
-                    b.total_amount,
-                    b.contact_email,
-                    b.contact_phone,
-                    b.payment_method,
-                    b.status,
-                    b.created_at,
-                    fs.flight_date,
-                    f.flight_id,
-                    f.airline,
-                    f.departure_airport,
-                    f.arrival_airport,
-                    f.departure_time,
-                    f.arrival_time,
-                    f.duration,
-                    f.aircraft,
-                    da.airport_name as departure_name,
-                    aa.airport_name as arrival_name
-                FROM bookings b
-                JOIN flight_schedules fs ON b.schedule_id = fs.schedule_id
-                JOIN flights f ON fs.flight_id = f.flight_id
-                JOIN airports da ON f.departure_airport = da.airport_code
-                JOIN airports aa ON f.arrival_airport = aa.airport_code
-                WHERE b.user_id = %s
-                ORDER BY b.created_at DESC
-            """
+                # 각 예약의 승객 정보 조회 (날짜/시간 포맷은 등록된 직렬화 함수가 변환)
+                for booking in bookings:
+                    booking['passengers'] = run_statement(connection, BOOKING_PASSENGERS_STATEMENT, (booking['booking_id'],))
             
-            cursor.execute(booking_query, (user_id,))
-            bookings = cursor.fetchall()
-            
-            # 각 예약의 승객 정보 조회
-            for booking in bookings:
-                cursor.execute("""
-                    SELECT name_kor, name_eng, birth_date, gender, seat_number
-                    FROM passengers
-                    WHERE booking_id = %s
-                """, (booking['booking_id'],))
-                
-                passengers = cursor.fetchall()
-                booking['passengers'] = passengers
-                
-                # 날짜/시간 포맷 변환
-                booking['flight_date'] = safe_json_serialize(booking['flight_date'])
-                booking['departure_time'] = safe_json_serialize(booking['departure_time'])
-                booking['arrival_time'] = safe_json_serialize(booking['arrival_time'])
-                booking['duration'] = safe_json_serialize(booking['duration'])
-                booking['created_at'] = safe_json_serialize(booking['created_at'])
-            
-            return bookings, None
+                return bookings, None
             
         except Error as e:
             return None, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
     
     @staticmethod
     def get_booking_by_number(booking_number):
         """예약 번호로 예약 정보 조회"""
         try:
-            connection = get_db_connection()
-            if not connection:
-                return None, "데이터베이스 연결 오류"
-            
-            cursor = connection.cursor(dictionary=True)
-            
-            # 예약 번호로 예약 정보 조회
-            booking_query = """
-                SELECT 
-                    b.booking_id,
-                    b.booking_number,
-                    b.seat_number,
-                    b.total_amount,
-                    b.contact_email,
-                    b.contact_phone,
-                    b.payment_method,
-                    b.status,
-                    b.created_at,
-                    fs.flight_date,
-                    f.flight_id,
-                    f.airline,
-                    f.departure_airport,
-                    f.arrival_airport,
-                    f.departure_time,
-                    f.arrival_time,
-                    f.duration,
-                    f.aircraft,
-                    da.airport_name as departure_name,
-                    aa.airport_name as arrival_name,
-                    u.name as user_name
-                FROM bookings b
-                JOIN flight_schedules fs ON b.schedule_id = fs.schedule_id
-                JOIN flights f ON fs.flight_id = f.flight_id
-                JOIN airports da ON f.departure_airport = da.airport_code
-                JOIN airports aa ON f.arrival_airport = aa.airport_code
-                JOIN users u ON b.user_id = u.user_id
-                WHERE b.booking_number = %s
-            """
+            with db_session(read_only=True) as connection:
+                # 예약 번호로 예약 정보 조회
+                booking = run_statement(connection, BOOKING_BY_NUMBER_STATEMENT, (booking_number,), fetch='one')
             
-            cursor.execute(booking_query, (booking_number,))
-            booking = cursor.fetchone()
+                if not booking:
+                    return None, "예약을 찾을 수 없습니다."
             
-            if not booking:
-                return None, "예약을 찾을 수 없습니다."
+                # 승객 정보 조회 (날짜/시간 포맷은 등록된 직렬화 함수가 변환)
+                booking['passengers'] = run_statement(connection, BOOKING_PASSENGERS_STATEMENT, (booking['booking_id'],))
             
-            # 승객 정보 조회
-            cursor.execute("""
-                SELECT name_kor, name_eng, birth_date, gender, seat_number
-                FROM passengers
-                WHERE booking_id = %s
-            """, (booking['booking_id'],))
-            
-            passengers = cursor.fetchall()
-            booking['passengers'] = passengers
-            
-            # 날짜/시간 포맷 변환
-            booking['flight_date'] = safe_json_serialize(booking['flight_date'])
-            booking['departure_time'] = safe_json_serialize(booking['departure_time'])
-            booking['arrival_time'] = safe_json_serialize(booking['arrival_time'])
-            booking['duration'] = safe_json_serialize(booking['duration'])
-            booking['created_at'] = safe_json_serialize(booking['created_at'])
-            
-            return booking, None
+                return booking, None
             
         except Error as e:
             return None, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
     
     @staticmethod
     def get_occupied_seats(schedule_id):
         """특정 항공편의 예약된 좌석 조회 - 실제 예약된 좌석만 반환"""
         try:
-            connection = get_db_connection()
-            if not connection:
-                return None, "데이터베이스 연결 오류"
-            
-            cursor = connection.cursor()
+            with db_session() as connection:
+                cursor = connection.cursor()
             
-            cursor.execute("""
-                SELECT DISTINCT p.seat_number 
-                FROM passengers p
-                JOIN bookings b ON p.booking_id = b.booking_id
-                WHERE b.schedule_id = %s 
-                AND b.status = 'CONFIRMED'
-                AND p.seat_number IS NOT NULL
-                ORDER BY p.seat_number
-            """, (schedule_id,))
+                cursor.execute("""
+                    SELECT DISTINCT p.seat_number 
+                    FROM passengers p
+                    JOIN bookings b ON p.booking_id = b.booking_id
+                    WHERE b.schedule_id = %s 
+                    AND b.status = 'CONFIRMED'
+                    AND p.seat_number IS NOT NULL
+                    ORDER BY p.seat_number
+                """, (schedule_id,))
             
-            occupied_seats = [row[0] for row in cursor.fetchall()]
-            return occupied_seats, None
+                occupied_seats = [row[0] for row in cursor.fetchall()]
+                return occupied_seats, None
             
         except Error as e:
             return None, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
     
     @staticmethod
     def cancel_booking(user_id, booking_number):
         """예약 취소"""
         try:
-            connection = get_db_connection()
-            if not connection:
-                return False, "데이터베이스 연결 오류"
-            
-            cursor = connection.cursor()
-            
-            # 트랜잭션 시작
-            connection.start_transaction()
-            
-            try:
+            with transaction() as connection:
+                cursor = connection.cursor()
+                
                 # 예약 정보 확인
                 cursor.execute("""
                     SELECT b.booking_id, b.schedule_id, COUNT(p.passenger_id) as passenger_count
@@ -314,7 +233,6 @@ class Booking:
                 
                 result = cursor.fetchone()
                 if not result:
-                    connection.rollback()
                     return False, "취소 가능한 예약을 찾을 수 없습니다."
                 
                 booking_id, schedule_id, passenger_count = result
@@ -331,15 +249,11 @@ class Booking:
                     WHERE schedule_id = %s
                 """, (passenger_count, schedule_id))
                 
-                connection.commit()
-                return True, None
-                
-            except Exception as e:
-                connection.rollback()
-                raise e
+                route = get_schedule_route(connection, schedule_id)
+            
+            # 검색 캐시의 해당 스케줄 잔여 좌석 반영 (커밋 이후)
+            update_schedule_seats(route, schedule_id, passenger_count)
+            return True, None
                 
         except Error as e:
             return False, f"예약 취소 중 오류가 발생했습니다: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
@@ -1,8 +1,13 @@
 # CloudJet 항공편 검색 서비스 (포트 5002)
 # 항공편 조회, 검색, 스케줄 관리 담당
 # 블루그린 테스트1
+import time
+_module_started = time.perf_counter()
+
 from flask import Flask, request
 from routes import flight_bp
+from shared.database import init_app as init_database
+from shared.redis_client import check_cache_ready
 from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 
@@ -16,6 +21,7 @@ def get_client_ip(req):
     return ip or req.remote_addr
 
 def create_app():
+    started = time.perf_counter()
     app = Flask(__name__)
     
     # Istio 프록시 체인 신뢰 설정 (ingress gateway + sidecar = 2홉)
@@ -40,7 +46,7 @@ def create_app():
         real_ip = get_client_ip(request)
 
         # Health check 요청은 로깅하지 않음
-        if request.path.endswith('/health') or real_ip in HEALTH_CHECK_IPS:
+        if request.path.endswith('/health') or request.path.startswith('/internal/') or real_ip in HEALTH_CHECK_IPS:
             return
 
         print(f"[FLIGHT-SERVICE] {request.method} {request.path} - Client IP: {real_ip}", flush=True)
@@ -48,6 +54,21 @@ def create_app():
     # 블루프린트 등록
     app.register_blueprint(flight_bp, url_prefix='/api/flights')
     
+    # DB 커넥션 고갈 시 503 응답 훅, readiness 확인 (Redis는 없어도 DB로 처리 가능하므로 필수 아님)
+    init_database(app, readiness_checks=[('redis', check_cache_ready, False)])
+    
+    # 인기 노선 검색 캐시 워머 (레플리카 간 분산 락으로 하나만 실행)
+    # preload/fork 서버에서도 워커마다 스레드가 생기도록 첫 요청 시점에 프로세스별로 시작
+    if os.environ.get('CACHE_WARMER_ENABLED', 'false').lower() == 'true':
+        from cache_warmer import CacheWarmer
+        from models import Flight, SEARCH_RESULT_TTL
+        cache_warmer = CacheWarmer.from_env(Flight._query_flights, SEARCH_RESULT_TTL)
+        app.before_request(cache_warmer.ensure_started)
+    
+    # 기동 시간 측정 (readiness 응답에 포함)
+    app.config['STARTUP_TIME_MS'] = round((time.perf_counter() - _module_started) * 1000, 1)
+    print(f"[FLIGHT-SERVICE] create_app 완료 ({(time.perf_counter() - started) * 1000:.1f}ms, 모듈 로드 포함 {app.config['STARTUP_TIME_MS']}ms)")
+    
     return app
 
 if __name__ == '__main__':
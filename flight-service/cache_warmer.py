@@ -0,0 +1,113 @@
+# Flight Service 검색 캐시 워머
+# 인기 노선의 향후 N일 검색 결과를 미리 계산해 배포/캐시 초기화 직후에도 캐시 히트가 나도록 함
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import threading
+import time
+from datetime import date, timedelta
+from shared.redis_client import get_cache_service
+
+WARMER_LOCK_NAME = "flights:cache-warmer"
+
+class CacheWarmer:
+    """인기 노선 검색 결과 사전 계산 (레플리카 중 락을 잡은 하나만 실행)"""
+
+    def __init__(self, loader, ttl, interval=60, top_routes=20, days=7, max_qps=5.0):
+        # loader: (departure, arrival, date) -> (flights, error)
+        self.loader = loader
+        self.ttl = ttl
+        self.interval = interval
+        self.top_routes = top_routes
+        self.days = days
+        self.max_qps = max_qps
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, loader, ttl):
+        return cls(
+            loader, ttl,
+            interval=float(os.environ.get('CACHE_WARMER_INTERVAL', 60)),
+            top_routes=int(os.environ.get('CACHE_WARMER_TOP_ROUTES', 20)),
+            days=int(os.environ.get('CACHE_WARMER_DAYS', 7)),
+            max_qps=float(os.environ.get('CACHE_WARMER_MAX_QPS', 5))
+        )
+
+    def start(self):
+        """백그라운드 데몬 스레드로 실행"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='flight-cache-warmer', daemon=True)
+        self._thread.start()
+        print(f"[CACHE-WARMER] 시작 (주기: {self.interval}초, 상위 {self.top_routes}개 노선, {self.days}일)")
+
+    def ensure_started(self):
+        """현재 프로세스에서 아직 실행 전이면 시작 (fork 이후 요청 처리 시 호출, 스레드는 fork로 복제되지 않음)"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self._thread = None
+            self.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                # 모든 프로세스가 각자 집계한 검색 인기도를 반영한 뒤 (락 보유자만) 사전 계산
+                get_cache_service().flush_search_popularity()
+                self.warm_once()
+            except Exception as e:
+                print(f"[CACHE-WARMER] 실행 오류: {e}")
+
+    def warm_once(self):
+        """한 주기 실행: 락 획득 → 상위 노선의 캐시 미스 날짜만 DB 조회 후 저장"""
+        cache_service = get_cache_service()
+        lock_ttl_ms = int(self.interval * 1000)
+        token = cache_service.acquire_lock(WARMER_LOCK_NAME, lock_ttl_ms)
+        if token is None:
+            return 0
+
+        warmed = 0
+        try:
+            routes = cache_service.get_popular_routes(self.top_routes)
+            dates = [(date.today() + timedelta(days=d)).isoformat() for d in range(self.days)]
+            min_gap = 1.0 / self.max_qps if self.max_qps > 0 else 0.0
+
+            for departure, arrival in routes:
+                # 다른 레플리카로 락이 넘어갔으면 중단
+                if self._stop_event.is_set() or not cache_service.extend_lock(WARMER_LOCK_NAME, token, lock_ttl_ms):
+                    break
+
+                cached = cache_service.get_flights_cache_many([(departure, arrival, d) for d in dates])
+                for flight_date, flights in zip(dates, cached):
+                    if flights is not None:
+                        continue
+
+                    # RDS 부하 제한 (초당 최대 max_qps 쿼리)
+                    revision = cache_service.get_flights_revision(departure, arrival, flight_date)
+                    started = time.monotonic()
+                    result, error = self.loader(departure, arrival, flight_date)
+                    elapsed = time.monotonic() - started
+                    if not error and result is not None:
+                        cache_ttl = self.ttl if result else cache_service.negative_cache_ttl
+                        cache_service.set_flights_cache(departure, arrival, flight_date, result,
+                                                        cache_ttl, delta=elapsed, revision=revision)
+                        warmed += 1
+                    if elapsed < min_gap:
+                        time.sleep(min_gap - elapsed)
+
+            if warmed:
+                print(f"[CACHE-WARMER] {len(routes)}개 노선, {warmed}건 캐시 사전 계산 완료")
+            return warmed
+        finally:
+            cache_service.release_lock(WARMER_LOCK_NAME, token)
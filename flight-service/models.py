@@ -3,81 +3,222 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from shared.database import get_db_connection, safe_json_serialize
+from shared.database import get_db_connection, register_statement, run_statement, safe_json_serialize, request_deadline_remaining_ms
+from shared.row_serializer import serialize_rows
 from mysql.connector import Error
-from shared.redis_client import CacheService
+from shared.redis_client import get_cache_service
+from shared.reference_data import get_reference_data
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta
+from flask import copy_current_request_context, g, has_request_context
+import re
+import threading
+
+IATA_CODE_PATTERN = re.compile(r'^[A-Z]{3}$')
+
+# 항공편 검색 결과 캐시 TTL (초)
+# 예약/취소/할인 변경 시 해당 키만 정밀하게 갱신하므로 길게 유지
+SEARCH_RESULT_TTL = int(os.environ.get('SEARCH_RESULT_TTL', 1800))
+
+# 운임 캘린더 조회 범위 (기준일 ±N일의 최대값)
+CALENDAR_MAX_DAYS = int(os.environ.get('CALENDAR_MAX_DAYS', 15))
+
+# 일괄 검색: 요청당 최대 구간 수, 캐시 미스 동시 조회 스레드 수 (프로세스 공용)
+BATCH_SEARCH_MAX_LEGS = int(os.environ.get('BATCH_SEARCH_MAX_LEGS', 6))
+BATCH_SEARCH_WORKERS = int(os.environ.get('BATCH_SEARCH_WORKERS', 4))
+_batch_executor = {"executor": None, "pid": None}
+_batch_executor_lock = threading.Lock()
+
+# 항공편 검색 쿼리 (할인 정보 포함), prepared statement로 재사용
+FLIGHT_SEARCH_STATEMENT = register_statement('flight_search', """
+    SELECT 
+        fs.schedule_id,
+        f.flight_id,
+        f.airline,
+        f.departure_airport,
+        f.arrival_airport,
+        f.departure_time,
+        f.arrival_time,
+        f.duration,
+        f.aircraft,
+        fs.current_price as original_price,
+        CASE 
+            WHEN fd.discount_percentage IS NOT NULL THEN 
+                ROUND(fs.current_price * (1 - fd.discount_percentage / 100))
+            ELSE fs.current_price
+        END as price,
+        fs.available_seats,
+        fs.flight_date as date,
+        da.airport_name as departure_name,
+        aa.airport_name as arrival_name,
+        fd.discount_percentage,
+        CASE WHEN fd.discount_percentage IS NOT NULL THEN TRUE ELSE FALSE END as has_discount
+    FROM flight_schedules fs
+    JOIN flights f ON fs.flight_id = f.flight_id
+    JOIN airports da ON f.departure_airport = da.airport_code
+    JOIN airports aa ON f.arrival_airport = aa.airport_code
+    LEFT JOIN flight_discounts fd ON fs.schedule_id = fd.schedule_id AND fd.status = 'ACTIVE'
+    WHERE f.departure_airport = %s 
+    AND f.arrival_airport = %s 
+    AND fs.flight_date = %s
+    AND fs.status = 'ACTIVE'
+    AND fs.available_seats > 0
+    ORDER BY price, f.departure_time
+""", serialize=True)
+
+# 운임 캘린더: 노선의 날짜별 최저가(할인 반영)/잔여 좌석 (월 단위로 조회해 캐싱)
+FARE_CALENDAR_STATEMENT = register_statement('flight_fare_calendar', """
+    SELECT 
+        fs.flight_date as date,
+        MIN(CASE 
+            WHEN fd.discount_percentage IS NOT NULL THEN 
+                ROUND(fs.current_price * (1 - fd.discount_percentage / 100))
+            ELSE fs.current_price
+        END) as min_price,
+        MAX(CASE WHEN fd.discount_percentage IS NOT NULL THEN 1 ELSE 0 END) as has_discount,
+        COUNT(*) as flight_count,
+        SUM(fs.available_seats) as available_seats
+    FROM flight_schedules fs
+    JOIN flights f ON fs.flight_id = f.flight_id
+    LEFT JOIN flight_discounts fd ON fs.schedule_id = fd.schedule_id AND fd.status = 'ACTIVE'
+    WHERE f.departure_airport = %s 
+    AND f.arrival_airport = %s 
+    AND fs.flight_date BETWEEN %s AND %s
+    AND fs.status = 'ACTIVE'
+    AND fs.available_seats > 0
+    GROUP BY fs.flight_date
+    ORDER BY fs.flight_date
+""", serialize=True)
+
+def _calendar_months(start, end):
+    """start~end('YYYY-MM-DD')가 걸친 월 목록 ['YYYY-MM', ...]"""
+    year, month = int(start[:4]), int(start[5:7])
+    months = []
+    while f"{year:04d}-{month:02d}" <= end[:7]:
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+def _month_dates(month):
+    """'YYYY-MM'의 모든 날짜 ['YYYY-MM-01', ...]"""
+    day = datetime.strptime(month, '%Y-%m').date()
+    dates = []
+    while day.strftime('%Y-%m') == month:
+        dates.append(day.isoformat())
+        day += timedelta(days=1)
+    return dates
+
+def _get_batch_executor():
+    """캐시 미스 조회용 스레드 풀 (fork 이후 워커 프로세스에서 최초 사용 시 생성)"""
+    pid = os.getpid()
+    if _batch_executor["pid"] != pid:
+        with _batch_executor_lock:
+            if _batch_executor["pid"] != pid:
+                _batch_executor["executor"] = ThreadPoolExecutor(
+                    max_workers=BATCH_SEARCH_WORKERS, thread_name_prefix='flight-batch-search')
+                _batch_executor["pid"] = pid
+    return _batch_executor["executor"]
+
+def normalize_search_params(departure, arrival, date):
+    """검색 파라미터 정규화 (공항 코드 대문자, 날짜 ISO 형식) 및 검증
+
+    icn/ICN, 2025-9-1/2025-09-01 처럼 같은 검색이 서로 다른 캐시 키가 되지 않도록 한다.
+    Returns: ((departure, arrival, date), error)
+    """
+    departure = (departure or '').strip().upper()
+    arrival = (arrival or '').strip().upper()
+
+    if not IATA_CODE_PATTERN.match(departure) or not IATA_CODE_PATTERN.match(arrival):
+        return None, "공항 코드는 영문 3자리여야 합니다."
+    if departure == arrival:
+        return None, "출발지와 도착지가 같습니다."
+
+    try:
+        date = datetime.strptime((date or '').strip(), '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        return None, "날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)"
+
+    airport_codes = Airport.get_airport_codes()
+    if airport_codes is not None:
+        if departure not in airport_codes:
+            return None, f"존재하지 않는 출발 공항입니다: {departure}"
+        if arrival not in airport_codes:
+            return None, f"존재하지 않는 도착 공항입니다: {arrival}"
+
+    return (departure, arrival, date), None
 
 class Flight:
     @staticmethod
     def search_flights(departure, arrival, date):
-        """캐싱이 적용된 항공편 검색"""
+        """캐싱이 적용된 항공편 검색 (캐시 미스 시 키별로 한 요청만 DB 조회)"""
+        
+        # 프로세스 공용 커넥션 풀 사용
+        cache_service = get_cache_service()
+        # 캐시 워머의 인기 노선 선정용
+        cache_service.record_search_popularity(departure, arrival)
+        return cache_service.get_or_load_flights(
+            departure, arrival, date,
+            lambda: Flight._query_flights(departure, arrival, date),
+            SEARCH_RESULT_TTL
+        )
+    
+    @staticmethod
+    def search_flights_batch(queries):
+        """여러 (departure, arrival, date) 검색을 한 번에 처리 (정규화된 파라미터 목록)
+
+        캐시 히트는 MGET 한 번으로 처리하고, 미스만 스레드 풀에서 동시에 search_flights로
+        조회한다 (키별 single-flight/캐시 저장 유지). 요청 기한이 있으면 남은 시간까지만 기다린다.
+        캐시 히트 구간은 검색 인기도를 따로 기록하지 않는다.
+        Returns: 입력 순서대로 (flights, error) 목록
+        """
+        unique = list(dict.fromkeys(queries))
+        cached = get_cache_service().get_flights_cache_many(unique)
+        results = {query: (flights, None) for query, flights in zip(unique, cached) if flights is not None}
         
-        # 캐시 확인 (새로 추가)
-        cache_service = CacheService()
-        cached_flights = cache_service.get_flights_cache(departure, arrival, date)
+        misses = [query for query in unique if query not in results]
+        if misses:
+            deadline = g.get('db_deadline') if has_request_context() else None
+            futures = {}
+            for query in misses:
+                def run(query=query):
+                    # 작업 스레드에서도 요청 기한이 DB 세션 제한에 적용되도록 전달
+                    if deadline is not None:
+                        g.db_deadline = deadline
+                    return Flight.search_flights(*query)
+                if has_request_context():
+                    run = copy_current_request_context(run)
+                futures[query] = _get_batch_executor().submit(run)
+            
+            for query, future in futures.items():
+                remaining = request_deadline_remaining_ms()
+                try:
+                    results[query] = future.result(timeout=None if remaining is None else max(remaining, 0) / 1000)
+                except FutureTimeoutError:
+                    future.cancel()
+                    results[query] = (None, "검색 시간이 초과되었습니다.")
+                except Exception as e:
+                    results[query] = (None, f"검색 오류: {str(e)}")
         
-        if cached_flights:
-            print(f"캐시에서 항공편 조회: {departure} -> {arrival}, {date}")
-            return cached_flights, None
+        return [results[query] for query in queries]
     
+    @staticmethod
+    def _query_flights(departure, arrival, date):
+        """항공편 검색 DB 조회 (캐시 미스 시 호출)
+
+        결과는 SEARCH_RESULT_TTL 동안 캐싱되고 예약/할인 변경 시에만 갱신되므로,
+        복제 지연으로 이전 좌석/가격을 읽지 않도록 레플리카가 아닌 primary에서 읽는다.
+        """
         try:
             connection = get_db_connection()
             if not connection:
                 return None, "데이터베이스 연결 오류"
             
-            cursor = connection.cursor(dictionary=True)
-            
-            # 항공편 검색 쿼리 (할인 정보 포함)
-            search_query = """
-                SELECT 
-                    fs.schedule_id,
-                    f.flight_id,
-                    f.airline,
-                    f.departure_airport,
-                    f.arrival_airport,
-                    f.departure_time,
-                    f.arrival_time,
-                    f.duration,
-                    f.aircraft,
-                    fs.current_price as original_price,
-                    CASE 
-                        WHEN fd.discount_percentage IS NOT NULL THEN 
-                            ROUND(fs.current_price * (1 - fd.discount_percentage / 100))
-                        ELSE fs.current_price
-                    END as price,
-                    fs.available_seats,
-                    fs.flight_date as date,
-                    da.airport_name as departure_name,
-                    aa.airport_name as arrival_name,
-                    fd.discount_percentage,
-                    CASE WHEN fd.discount_percentage IS NOT NULL THEN TRUE ELSE FALSE END as has_discount
-                FROM flight_schedules fs
-                JOIN flights f ON fs.flight_id = f.flight_id
-                JOIN airports da ON f.departure_airport = da.airport_code
-                JOIN airports aa ON f.arrival_airport = aa.airport_code
-                LEFT JOIN flight_discounts fd ON fs.schedule_id = fd.schedule_id AND fd.status = 'ACTIVE'
-                WHERE f.departure_airport = %s 
-                AND f.arrival_airport = %s 
-                AND fs.flight_date = %s
-                AND fs.status = 'ACTIVE'
-                AND fs.available_seats > 0
-                ORDER BY price, f.departure_time
-            """
-            
-            cursor.execute(search_query, (departure, arrival, date))
-            flights = cursor.fetchall()
+            # 날짜/시간 컬럼은 등록된 직렬화 함수가 컬럼 타입 기준으로 변환
+            flights = run_statement(connection, FLIGHT_SEARCH_STATEMENT, (departure, arrival, date))
             
-            # 데이터 변환
-            for flight in flights:
-                for key, value in flight.items():
-                    flight[key] = safe_json_serialize(value)
-            
-            # 시간 포맷 변환 및 timedelta 처리
             for flight in flights:
-                flight['departureTime'] = safe_json_serialize(flight['departure_time'])
-                flight['arrivalTime'] = safe_json_serialize(flight['arrival_time'])
-                flight['duration'] = safe_json_serialize(flight['duration'])
-                flight['date'] = safe_json_serialize(flight['date'])
+                flight['departureTime'] = flight['departure_time']
+                flight['arrivalTime'] = flight['arrival_time']
                 
                 # 프론트엔드 호환성을 위한 별칭 추가
                 flight['flightId'] = flight['flight_id']
@@ -85,11 +226,6 @@ class Flight:
                 flight['arrivalAirport'] = flight['arrival_airport']
                 # 원본 필드는 유지 (API 응답에서 사용)
                 
-            # 결과를 캐시에 저장 (새로 추가)
-            if flights:
-                cache_service.set_flights_cache(departure, arrival, date, flights, 300)  # 5분 캐시
-                print(f"항공편 검색 결과 캐시 저장: {len(flights)}개")
-            
             return flights, None
             
         except Error as e:
@@ -98,11 +234,67 @@ class Flight:
             if connection:
                 connection.close()
     
+    @staticmethod
+    def get_fare_calendar(departure, arrival, start, end):
+        """노선의 날짜별 최저가/잔여 좌석 캘린더 (start~end, 'YYYY-MM-DD')
+
+        노선·월 단위로 캐싱하고 캐시에 없는 월만 GROUP BY 쿼리 한 번으로 조회한다.
+        운항편이 없는 날도 min_price None으로 포함해 날짜가 빠짐없이 이어지게 한다.
+        """
+        months = _calendar_months(start, end)
+        cache_service = get_cache_service()
+        month_days = cache_service.get_calendar_cache(departure, arrival, months)
+        
+        missing = [month for month in months if month not in month_days]
+        if missing:
+            loaded, error = Flight._query_fare_calendar(departure, arrival, missing)
+            if error:
+                return None, error
+            cache_service.set_calendar_cache(departure, arrival, loaded)
+            month_days.update(loaded)
+        
+        calendar = [day for month in months for day in month_days[month] if start <= day['date'] <= end]
+        return calendar, None
+    
+    @staticmethod
+    def _query_fare_calendar(departure, arrival, months):
+        """여러 월의 운임 캘린더를 한 번에 조회 → {월: 날짜별 목록} (캐시 채우기용이므로 primary에서 읽음)"""
+        try:
+            connection = get_db_connection()
+            if not connection:
+                return None, "데이터베이스 연결 오류"
+            
+            first_day = f"{months[0]}-01"
+            last_day = _month_dates(months[-1])[-1]
+            rows = run_statement(connection, FARE_CALENDAR_STATEMENT, (departure, arrival, first_day, last_day))
+            by_date = {row['date']: row for row in rows}
+            
+            month_days = {}
+            for month in months:
+                days = []
+                for day in _month_dates(month):
+                    row = by_date.get(day)
+                    days.append({
+                        'date': day,
+                        'min_price': int(row['min_price']) if row else None,
+                        'has_discount': bool(row['has_discount']) if row else False,
+                        'flight_count': row['flight_count'] if row else 0,
+                        'available_seats': int(row['available_seats']) if row else 0,
+                    })
+                month_days[month] = days
+            return month_days, None
+            
+        except Error as e:
+            return None, f"데이터베이스 오류: {str(e)}"
+        finally:
+            if connection:
+                connection.close()
+    
     @staticmethod
     def get_featured_flights():
         """오늘의 특가 항공편 조회 (할인된 항공편만)"""
         try:
-            connection = get_db_connection()
+            connection = get_db_connection(read_only=True)
             if not connection:
                 print("Featured flights: 데이터베이스 연결 실패")
                 return None, "데이터베이스 연결 오류"
@@ -182,7 +374,7 @@ class Flight:
     def get_promotions():
         """프로모션 항공편 조회 (API용)"""
         try:
-            connection = get_db_connection()
+            connection = get_db_connection(read_only=True)
             if not connection:
                 print("Promotions: 데이터베이스 연결 실패")
                 return None, "데이터베이스 연결 오류"
@@ -224,12 +416,9 @@ class Flight:
             """
             
             cursor.execute(query)
-            promotions = cursor.fetchall()
             
             # 데이터 변환
-            for promo in promotions:
-                for key, value in promo.items():
-                    promo[key] = safe_json_serialize(value)
+            promotions = serialize_rows(cursor, cursor.fetchall())
             
             return promotions, None
             
@@ -240,22 +429,25 @@ class Flight:
                 connection.close()
 
 class Airport:
+    @staticmethod
+    def get_airport_codes():
+        """공항 코드 집합 조회 (참조 데이터 스냅샷, 조회 실패 시 None)"""
+        snapshot = get_reference_data()
+        return snapshot.airport_codes if snapshot else None
+
     @staticmethod
     def get_all_airports():
-        """모든 공항 정보 조회"""
-        try:
-            connection = get_db_connection()
-            if not connection:
-                return None, "데이터베이스 연결 오류"
-            
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT airport_code, airport_name, city, country FROM airports ORDER BY airport_name")
-            airports = cursor.fetchall()
-            
-            return airports, None
-            
-        except Error as e:
-            return None, f"데이터베이스 오류: {str(e)}"
-        finally:
-            if connection:
-                connection.close()
+        """모든 공항 정보 조회 → (공항 목록, ETag, 오류)"""
+        snapshot = get_reference_data()
+        if snapshot is None:
+            return None, None, "데이터베이스 연결 오류"
+        return snapshot.airports, snapshot.airports_etag, None
+
+class Route:
+    @staticmethod
+    def get_routes():
+        """운항 중인 노선과 노선별 항공편 목록 → (노선 목록, ETag, 오류)"""
+        snapshot = get_reference_data()
+        if snapshot is None:
+            return None, None, "데이터베이스 연결 오류"
+        return snapshot.routes, snapshot.routes_etag, None
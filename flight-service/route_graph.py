@@ -0,0 +1,310 @@
+# Flight Service 연결편(경유) 검색 엔진
+# 날짜별 운항 스케줄을 프로세스 메모리의 노선 그래프로 만들어 1회/2회 경유 여정을 SQL 없이 탐색
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta
+from mysql.connector import Error
+from shared.database import get_db_connection, register_statement, run_statement
+from shared.redis_client import get_cache_service
+from shared.search_cache import ROUTE_GRAPH_VERSION
+
+# 하루치 운항 스케줄 (좌석이 남은 정상 운항편, 할인 반영 가격)
+ROUTE_GRAPH_STATEMENT = register_statement('route_graph_schedules', """
+    SELECT
+        fs.schedule_id,
+        f.flight_id,
+        f.airline,
+        f.departure_airport,
+        f.arrival_airport,
+        f.departure_time,
+        f.arrival_time,
+        CASE
+            WHEN fd.discount_percentage IS NOT NULL THEN
+                ROUND(fs.current_price * (1 - fd.discount_percentage / 100))
+            ELSE fs.current_price
+        END as price,
+        fs.available_seats
+    FROM flight_schedules fs
+    JOIN flights f ON fs.flight_id = f.flight_id
+    LEFT JOIN flight_discounts fd ON fs.schedule_id = fd.schedule_id AND fd.status = 'ACTIVE'
+    WHERE fs.flight_date = %s
+    AND fs.status = 'ACTIVE'
+    AND fs.available_seats > 0
+""", dictionary=False)
+
+LOAD_LOCK_STRIPES = 16
+
+class Leg:
+    """운항편 하나 (그래프의 간선)"""
+    __slots__ = ('schedule_id', 'flight_id', 'airline', 'departure_airport', 'arrival_airport',
+                 'departure', 'arrival', 'price', 'available_seats')
+
+    def __init__(self, row, flight_date):
+        (self.schedule_id, self.flight_id, self.airline, self.departure_airport, self.arrival_airport,
+         departure_time, arrival_time, price, self.available_seats) = row
+        base = datetime.combine(flight_date, datetime.min.time())
+        self.departure = base + departure_time
+        self.arrival = base + arrival_time
+        if self.arrival <= self.departure:
+            # 자정을 넘겨 도착하는 편
+            self.arrival += timedelta(days=1)
+        self.price = int(price)
+
+    def to_dict(self):
+        return {
+            'schedule_id': self.schedule_id,
+            'flight_id': self.flight_id,
+            'airline': self.airline,
+            'departure_airport': self.departure_airport,
+            'arrival_airport': self.arrival_airport,
+            'departure': self.departure.isoformat(timespec='minutes'),
+            'arrival': self.arrival.isoformat(timespec='minutes'),
+            'price': self.price,
+            'available_seats': self.available_seats,
+        }
+
+class DaySnapshot:
+    """하루치 노선 그래프: 출발 공항별 출발 시각 순 간선 목록 + 출발 시각 인덱스"""
+
+    def __init__(self, flight_date, rows):
+        self.flight_date = flight_date
+        self.loaded_at = time.monotonic()
+        outgoing = defaultdict(list)
+        for row in rows:
+            leg = Leg(row, flight_date)
+            outgoing[leg.departure_airport].append(leg)
+        self.outgoing = {}
+        self.departures = {}
+        for airport, legs in outgoing.items():
+            legs.sort(key=lambda leg: leg.departure)
+            self.outgoing[airport] = legs
+            self.departures[airport] = [leg.departure for leg in legs]
+        # 공항 간 연결 관계 (가지치기용 도달 가능성 계산)
+        self.neighbors = {airport: {leg.arrival_airport for leg in legs} for airport, legs in self.outgoing.items()}
+
+    def legs_between(self, airport, earliest, latest):
+        """airport에서 earliest~latest 사이에 출발하는 간선"""
+        legs = self.outgoing.get(airport)
+        if not legs:
+            return []
+        start = bisect_left(self.departures[airport], earliest)
+        end = bisect_left(self.departures[airport], latest, start)
+        return legs[start:end]
+
+class RouteGraph:
+    """날짜별 노선 그래프 캐시와 경유 여정 탐색
+
+    그래프는 날짜 단위로 필요할 때 한 번 읽어 두고, admin-service가 스케줄/할인을 바꾸면
+    Redis의 버전(route_graph)이 증가하므로 바뀐 날짜의 그래프만 다시 읽는다.
+    예약에 따른 잔여 좌석 변화는 ttl 주기로만 반영한다 (최종 좌석 확인은 예약 시점).
+    """
+
+    def __init__(self, min_connection=60, max_connection=720, ttl=300,
+                 version_check_interval=1.0, max_results=20):
+        self.min_connection = timedelta(minutes=min_connection)
+        self.max_connection = timedelta(minutes=max_connection)
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self.max_results = max_results
+        self._snapshots = {}
+        self._version = None
+        self._version_checked_at = 0.0
+        self._lock = threading.Lock()
+        # 날짜별 로드 락은 고정 개수를 해시로 나눠 씀 (날짜가 지나도 늘어나지 않음)
+        self._load_locks = tuple(threading.Lock() for _ in range(LOAD_LOCK_STRIPES))
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            min_connection=int(os.environ.get('ROUTE_GRAPH_MIN_CONNECTION_MINUTES', 60)),
+            max_connection=int(os.environ.get('ROUTE_GRAPH_MAX_CONNECTION_MINUTES', 720)),
+            ttl=float(os.environ.get('ROUTE_GRAPH_TTL', 300)),
+            version_check_interval=float(os.environ.get('ROUTE_GRAPH_VERSION_CHECK', 1)),
+            max_results=int(os.environ.get('ROUTE_GRAPH_MAX_RESULTS', 20))
+        )
+
+    def _refresh_version(self):
+        """Redis 버전이 바뀌었으면 변경된 날짜의 그래프만 폐기 (로그가 부족하면 전체 폐기)"""
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+
+        cache_service = get_cache_service()
+        if self._version is None:
+            self._version = cache_service.get_data_version(ROUTE_GRAPH_VERSION)
+            return
+        changes = cache_service.get_data_changes(ROUTE_GRAPH_VERSION, self._version)
+        if changes is None:
+            # Redis 장애 시 기존 그래프 유지 (ttl로 만료)
+            return
+        version, dates = changes
+        if version == self._version:
+            return
+        with self._lock:
+            if dates is None:
+                self._snapshots.clear()
+            else:
+                for flight_date in dates:
+                    self._snapshots.pop(flight_date, None)
+        print(f"[ROUTE-GRAPH] 버전 {self._version} → {version}, 폐기: {'전체' if dates is None else sorted(dates)}")
+        self._version = version
+
+    def _snapshot(self, flight_date):
+        """날짜별 그래프 (없거나 ttl이 지났으면 DB에서 한 번 읽음, 같은 날짜는 동시에 한 번만)"""
+        key = flight_date.isoformat()
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < self.ttl:
+            return snapshot, None
+
+        with self._load_locks[hash(key) % LOAD_LOCK_STRIPES]:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and time.monotonic() - snapshot.loaded_at < self.ttl:
+                return snapshot, None
+            connection = None
+            try:
+                # _refresh_version이 이미 새 버전을 읽었으므로, 지연된 레플리카가 아닌 primary에서 읽어야
+                # 변경 전 스케줄/가격이 새 버전의 그래프로 남지 않음
+                connection = get_db_connection()
+                if not connection:
+                    return None, "데이터베이스 연결 오류"
+                started = time.perf_counter()
+                snapshot = DaySnapshot(flight_date, run_statement(connection, ROUTE_GRAPH_STATEMENT, (key,)))
+                print(f"[ROUTE-GRAPH] {key} 그래프 로드 ({(time.perf_counter() - started) * 1000:.1f}ms)")
+            except Error as e:
+                return None, f"데이터베이스 오류: {str(e)}"
+            finally:
+                if connection:
+                    connection.close()
+            with self._lock:
+                # 만료된 날짜(지난 날짜 등)는 함께 정리
+                now = time.monotonic()
+                for stale in [k for k, v in self._snapshots.items() if now - v.loaded_at >= self.ttl]:
+                    del self._snapshots[stale]
+                self._snapshots[key] = snapshot
+            return snapshot, None
+
+    def _can_reach(self, snapshots, destination, max_legs):
+        """도착지까지 max_legs개 이하 간선으로 갈 수 있는 공항 → 남은 최소 간선 수 (역방향 BFS)"""
+        reverse = defaultdict(set)
+        for snapshot in snapshots:
+            for airport, neighbors in snapshot.neighbors.items():
+                for neighbor in neighbors:
+                    reverse[neighbor].add(airport)
+        distance = {destination: 0}
+        frontier = [destination]
+        for hops in range(1, max_legs + 1):
+            next_frontier = []
+            for airport in frontier:
+                for previous in reverse[airport]:
+                    if previous not in distance:
+                        distance[previous] = hops
+                        next_frontier.append(previous)
+            frontier = next_frontier
+        return distance
+
+    def search(self, departure, arrival, date, max_stops=2):
+        """출발일 기준 직항/경유 여정 탐색, (총 가격, 총 소요 시간) 순 상위 max_results개
+
+        환승은 도착 후 min_connection~max_connection 사이 출발편만, 같은 공항은 다시 거치지 않는다.
+        다음 날 출발편까지 이어 탐색하며, 현재 상위 결과보다 비싸진 경로는 더 탐색하지 않는다.
+        Returns: (itineraries, error)
+        """
+        self._refresh_version()
+        flight_date = datetime.strptime(date, '%Y-%m-%d').date()
+        snapshots = []
+        for offset in range(2):
+            snapshot, error = self._snapshot(flight_date + timedelta(days=offset))
+            if error:
+                return None, error
+            snapshots.append(snapshot)
+
+        max_legs = max_stops + 1
+        remaining_hops = self._can_reach(snapshots, arrival, max_legs)
+        if departure not in remaining_hops:
+            return [], None
+
+        # 최대 힙 (부호 반전): 현재까지 찾은 상위 결과, 맨 앞이 가장 나쁜 결과
+        best = []
+        counter = 0
+
+        def worst_price():
+            return -best[0][0] if len(best) >= self.max_results else None
+
+        def legs_from(airport, earliest, latest):
+            for snapshot in snapshots:
+                yield from snapshot.legs_between(airport, earliest, latest)
+
+        def extend(path, visited, price):
+            nonlocal counter
+            last = path[-1]
+            if last.arrival_airport == arrival:
+                duration = (last.arrival - path[0].departure).total_seconds()
+                counter += 1
+                item = (-price, -duration, counter, path)
+                if len(best) < self.max_results:
+                    heapq.heappush(best, item)
+                elif (price, duration) < (-best[0][0], -best[0][1]):
+                    heapq.heapreplace(best, item)
+                return
+            if len(path) >= max_legs:
+                return
+            for leg in legs_from(last.arrival_airport, last.arrival + self.min_connection,
+                                 last.arrival + self.max_connection):
+                if leg.arrival_airport in visited:
+                    continue
+                if remaining_hops.get(leg.arrival_airport, max_legs + 1) > max_legs - len(path) - 1:
+                    continue
+                limit = worst_price()
+                if limit is not None and price + leg.price > limit:
+                    continue
+                visited.add(leg.arrival_airport)
+                extend(path + [leg], visited, price + leg.price)
+                visited.discard(leg.arrival_airport)
+
+        day_start = datetime.combine(flight_date, datetime.min.time())
+        for leg in snapshots[0].legs_between(departure, day_start, day_start + timedelta(days=1)):
+            if remaining_hops.get(leg.arrival_airport, max_legs + 1) > max_legs - 1:
+                continue
+            extend([leg], {departure, leg.arrival_airport}, leg.price)
+
+        paths = [item[3] for item in sorted(best, key=lambda item: (-item[0], -item[1], item[2]))]
+        return [self._itinerary(path) for path in paths], None
+
+    @staticmethod
+    def _itinerary(path):
+        total_minutes = int((path[-1].arrival - path[0].departure).total_seconds() // 60)
+        return {
+            'departure_airport': path[0].departure_airport,
+            'arrival_airport': path[-1].arrival_airport,
+            'departure': path[0].departure.isoformat(timespec='minutes'),
+            'arrival': path[-1].arrival.isoformat(timespec='minutes'),
+            'stops': len(path) - 1,
+            'total_price': sum(leg.price for leg in path),
+            'total_minutes': total_minutes,
+            'available_seats': min(leg.available_seats for leg in path),
+            'layovers': [{
+                'airport': previous.arrival_airport,
+                'minutes': int((leg.departure - previous.arrival).total_seconds() // 60),
+            } for previous, leg in zip(path, path[1:])],
+            'legs': [leg.to_dict() for leg in path],
+        }
+
+_route_graph = None
+_route_graph_lock = threading.Lock()
+
+def get_route_graph():
+    """프로세스 공용 노선 그래프 (최초 호출 시 생성)"""
+    global _route_graph
+    if _route_graph is None:
+        with _route_graph_lock:
+            if _route_graph is None:
+                _route_graph = RouteGraph.from_env()
+    return _route_graph
@@ -4,10 +4,129 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from flask import Blueprint, request, jsonify
-from models import Flight, Airport
+from bisect import bisect_right
+from datetime import datetime, timedelta
+import base64
+import json
+from models import Flight, Airport, Route, normalize_search_params, CALENDAR_MAX_DAYS, BATCH_SEARCH_MAX_LEGS
+from route_graph import get_route_graph
 
 flight_bp = Blueprint('flights', __name__)
 
+# 검색 결과 페이지 크기 상한
+MAX_PAGE_SIZE = 100
+
+def _price(flight):
+    # DECIMAL 가격은 직렬화 시 int/float로 바뀌지만 0/None 처리를 위해 한 번 더 변환
+    return float(flight.get('price') or 0)
+
+def _duration_minutes(flight):
+    """출발/도착 시각('HH:MM:SS')으로 계산한 소요 시간 (자정을 넘기는 편 포함)"""
+    dep_h, dep_m = map(int, flight['departure_time'].split(':')[:2])
+    arr_h, arr_m = map(int, flight['arrival_time'].split(':')[:2])
+    return (arr_h * 60 + arr_m - dep_h * 60 - dep_m) % (24 * 60)
+
+# 정렬 기준별 키 (마지막 schedule_id로 순서를 고정해 커서가 항상 한 위치를 가리키게 함)
+SORT_KEYS = {
+    'price': lambda f: (_price(f), f['departure_time'], f['schedule_id']),
+    'departure': lambda f: (f['departure_time'], _price(f), f['schedule_id']),
+    'duration': lambda f: (_duration_minutes(f), _price(f), f['schedule_id']),
+}
+
+def _encode_cursor(sort, key):
+    return base64.urlsafe_b64encode(json.dumps([sort, list(key)]).encode()).decode().rstrip('=')
+
+def _decode_cursor(cursor, sort):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if cursor_sort != sort or not isinstance(key, list) or len(key) != 3:
+        return None
+    return tuple(key)
+
+def parse_result_options(args):
+    """검색 결과 필터/정렬/페이지 옵션 파싱 → (options, error), 옵션이 없으면 options는 None
+
+    airline, aircraft: 쉼표 구분 목록 / departure_after, departure_before: HH:MM /
+    max_price / discount_only=true / sort: price|departure|duration / limit / cursor
+    """
+    names = ('airline', 'aircraft', 'departure_after', 'departure_before', 'max_price',
+             'discount_only', 'sort', 'limit', 'cursor')
+    if not any(args.get(name) for name in names):
+        return None, None
+    
+    options = {
+        'airlines': {value.strip() for value in args.get('airline', '').split(',') if value.strip()},
+        'aircraft': {value.strip() for value in args.get('aircraft', '').split(',') if value.strip()},
+        'discount_only': args.get('discount_only', '').lower() == 'true',
+        'sort': args.get('sort', 'price'),
+    }
+    if options['sort'] not in SORT_KEYS:
+        return None, f"정렬 기준은 {', '.join(SORT_KEYS)} 중 하나여야 합니다."
+    
+    for name in ('departure_after', 'departure_before'):
+        value = args.get(name)
+        if value:
+            try:
+                value = datetime.strptime(value.strip(), '%H:%M').strftime('%H:%M')
+            except ValueError:
+                return None, f"{name}는 HH:MM 형식이어야 합니다."
+        options[name] = value
+    
+    try:
+        options['max_price'] = float(args['max_price']) if args.get('max_price') else None
+        options['limit'] = int(args['limit']) if args.get('limit') else None
+    except ValueError:
+        return None, "max_price, limit은 숫자여야 합니다."
+    if options['limit'] is not None and not 1 <= options['limit'] <= MAX_PAGE_SIZE:
+        return None, f"limit은 1~{MAX_PAGE_SIZE} 사이여야 합니다."
+    
+    options['after'] = None
+    if args.get('cursor'):
+        options['after'] = _decode_cursor(args['cursor'], options['sort'])
+        if options['after'] is None:
+            return None, "유효하지 않은 cursor입니다."
+        if options['limit'] is None:
+            options['limit'] = MAX_PAGE_SIZE
+    return options, None
+
+def apply_result_options(flights, options):
+    """캐시된 검색 결과에 필터/정렬/keyset 페이지 적용 → (page, total, next_cursor)
+
+    캐시 목록과 항목은 여러 요청이 공유하므로 수정하지 않고 새 목록만 만든다.
+    total은 필터 후 전체 건수다.
+    """
+    def matches(flight):
+        if options['airlines'] and flight.get('airline') not in options['airlines']:
+            return False
+        if options['aircraft'] and flight.get('aircraft') not in options['aircraft']:
+            return False
+        if options['discount_only'] and not flight.get('has_discount'):
+            return False
+        if options['max_price'] is not None and _price(flight) > options['max_price']:
+            return False
+        departure = (flight.get('departure_time') or '')[:5]
+        if options['departure_after'] and departure < options['departure_after']:
+            return False
+        if options['departure_before'] and departure > options['departure_before']:
+            return False
+        return True
+    
+    sort_key = SORT_KEYS[options['sort']]
+    keyed = sorted(((sort_key(flight), flight) for flight in flights if matches(flight)),
+                   key=lambda item: item[0])
+    total = len(keyed)
+    
+    start = 0
+    if options['after'] is not None:
+        start = bisect_right([key for key, _ in keyed], options['after'])
+    end = total if options['limit'] is None else start + options['limit']
+    page = [flight for _, flight in keyed[start:end]]
+    next_cursor = _encode_cursor(options['sort'], keyed[end - 1][0]) if end < total and page else None
+    return page, total, next_cursor
+
 @flight_bp.route('/search', methods=['GET'])
 def search_flights():
     """항공편 검색"""
@@ -21,32 +140,196 @@ def search_flights():
         if not all([departure, arrival, date]):
             return jsonify({'message': '출발지, 도착지, 날짜를 모두 입력해주세요.'}), 400
         
-        flights, error = Flight.search_flights(departure, arrival, date)
+        params, error = normalize_search_params(departure, arrival, date)
+        if error:
+            return jsonify({'message': error}), 400
+        
+        options, error = parse_result_options(request.args)
+        if error:
+            return jsonify({'message': error}), 400
+        
+        flights, error = Flight.search_flights(*params)
         
         if error:
             return jsonify({'message': error}), 500
         
         print(f"Found {len(flights)} flights")
         
+        if options is None:
+            return jsonify({
+                'flights': flights,
+                'total': len(flights)
+            }), 200
+        
+        # 필터/정렬/페이지는 캐시된 결과에서 처리 (추가 DB 조회 없음)
+        page, total, next_cursor = apply_result_options(flights, options)
         return jsonify({
-            'flights': flights,
-            'total': len(flights)
+            'flights': page,
+            'total': total,
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
         return jsonify({'message': f'예상치 못한 오류: {str(e)}'}), 500
 
+@flight_bp.route('/search/batch', methods=['POST'])
+def search_flights_batch():
+    """여러 구간 일괄 검색 (왕복/다구간)
+
+    요청: {"legs": [{"departure": "ICN", "arrival": "NRT", "date": "2025-09-01"}, ...]}
+    구간별로 결과 또는 오류를 돌려주며, 한 구간의 실패가 다른 구간에 영향을 주지 않는다.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        legs = data.get('legs')
+        if not isinstance(legs, list) or not legs:
+            return jsonify({'message': '검색할 구간(legs)을 입력해주세요.'}), 400
+        if len(legs) > BATCH_SEARCH_MAX_LEGS:
+            return jsonify({'message': f'한 번에 최대 {BATCH_SEARCH_MAX_LEGS}개 구간까지 검색할 수 있습니다.'}), 400
+        
+        # 구간별 검증 (잘못된 구간은 오류로 표시하고 나머지는 검색)
+        results = []
+        queries = []
+        for leg in legs:
+            leg = leg if isinstance(leg, dict) else {}
+            params, error = normalize_search_params(leg.get('departure'), leg.get('arrival'), leg.get('date'))
+            results.append({
+                'departure': params[0] if params else leg.get('departure'),
+                'arrival': params[1] if params else leg.get('arrival'),
+                'date': params[2] if params else leg.get('date'),
+                'error': error,
+            })
+            if params:
+                queries.append(params)
+        
+        searched = iter(Flight.search_flights_batch(queries)) if queries else iter(())
+        for result in results:
+            if result['error']:
+                result.update({'flights': [], 'total': 0})
+                continue
+            flights, error = next(searched)
+            result.update({'flights': flights or [], 'total': len(flights or []), 'error': error})
+        
+        return jsonify({'results': results}), 200
+        
+    except Exception as e:
+        return jsonify({'message': f'서버 오류: {str(e)}'}), 500
+
+@flight_bp.route('/connections', methods=['GET'])
+def search_connections():
+    """경유 포함 여정 검색 (직항이 없는 노선용, 메모리 노선 그래프 탐색)"""
+    try:
+        departure = request.args.get('departure')
+        arrival = request.args.get('arrival')
+        date = request.args.get('date')
+        
+        if not all([departure, arrival, date]):
+            return jsonify({'message': '출발지, 도착지, 날짜를 모두 입력해주세요.'}), 400
+        
+        params, error = normalize_search_params(departure, arrival, date)
+        if error:
+            return jsonify({'message': error}), 400
+        
+        try:
+            max_stops = int(request.args.get('max_stops', 2))
+        except ValueError:
+            return jsonify({'message': 'max_stops는 숫자여야 합니다.'}), 400
+        if not 0 <= max_stops <= 2:
+            return jsonify({'message': 'max_stops는 0~2 사이여야 합니다.'}), 400
+        
+        itineraries, error = get_route_graph().search(*params, max_stops=max_stops)
+        if error:
+            return jsonify({'message': error}), 500
+        
+        return jsonify({
+            'itineraries': itineraries,
+            'total': len(itineraries)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': f'서버 오류: {str(e)}'}), 500
+
+@flight_bp.route('/calendar', methods=['GET'])
+def get_fare_calendar():
+    """노선 운임 캘린더 조회 (month=YYYY-MM 한 달, 또는 date=YYYY-MM-DD 기준 ±days일)"""
+    try:
+        departure = request.args.get('departure')
+        arrival = request.args.get('arrival')
+        month = request.args.get('month')
+        date = request.args.get('date')
+        
+        if not departure or not arrival or not (month or date):
+            return jsonify({'message': '출발지, 도착지와 조회할 월 또는 날짜를 입력해주세요.'}), 400
+        
+        # 공항 코드/날짜 검증은 검색과 동일하게 처리
+        params, error = normalize_search_params(departure, arrival, f"{month.strip()}-01" if month else date)
+        if error:
+            return jsonify({'message': error}), 400
+        departure, arrival, base_date = params
+        
+        base = datetime.strptime(base_date, '%Y-%m-%d').date()
+        if month:
+            start = base
+            end = (base.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        else:
+            try:
+                days = int(request.args.get('days', 3))
+            except ValueError:
+                return jsonify({'message': 'days는 숫자여야 합니다.'}), 400
+            if not 0 <= days <= CALENDAR_MAX_DAYS:
+                return jsonify({'message': f'days는 0~{CALENDAR_MAX_DAYS} 사이여야 합니다.'}), 400
+            start = base - timedelta(days=days)
+            end = base + timedelta(days=days)
+        
+        calendar, error = Flight.get_fare_calendar(departure, arrival, start.isoformat(), end.isoformat())
+        if error:
+            return jsonify({'message': error}), 500
+        
+        prices = [day for day in calendar if day['min_price'] is not None]
+        return jsonify({
+            'departure': departure,
+            'arrival': arrival,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'calendar': calendar,
+            'lowest': min(prices, key=lambda day: day['min_price'])['date'] if prices else None
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': f'서버 오류: {str(e)}'}), 500
+
 @flight_bp.route('/airports', methods=['GET'])
 def get_airports():
-    """공항 목록 조회"""
+    """공항 목록 조회 (ETag 재검증, 바뀌지 않았으면 304)"""
+    try:
+        airports, etag, error = Airport.get_all_airports()
+        
+        if error:
+            return jsonify({'message': error}), 500
+        
+        response = jsonify({'airports': airports})
+        response.set_etag(etag)
+        # 캐시는 허용하되 매번 ETag로 재검증
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        return jsonify({'message': f'서버 오류: {str(e)}'}), 500
+
+@flight_bp.route('/routes', methods=['GET'])
+def get_routes():
+    """운항 노선 목록 조회 (노선별 항공편 포함, ETag 재검증)"""
     try:
-        airports, error = Airport.get_all_airports()
+        routes, etag, error = Route.get_routes()
         
         if error:
             return jsonify({'message': error}), 500
         
-        return jsonify({'airports': airports}), 200
+        response = jsonify({'routes': routes, 'total': len(routes)})
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
         
     except Exception as e:
         return jsonify({'message': f'서버 오류: {str(e)}'}), 500
@@ -1,6 +1,10 @@
 # 블루그린 테스트1
+import time
+_module_started = time.perf_counter()
+
 from flask import Flask, request
 from routes import payment_bp
+from shared.database import init_app as init_database
 from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 
@@ -14,6 +18,7 @@ def get_client_ip(req):
     return ip or req.remote_addr
 
 def create_app():
+    started = time.perf_counter()
     app = Flask(__name__)
     
     # Istio 프록시 체인 신뢰 설정
@@ -38,12 +43,19 @@ def create_app():
         real_ip = get_client_ip(request)
 
         # Health check 요청은 로깅하지 않음
-        if request.path.endswith('/health') or real_ip in HEALTH_CHECK_IPS:
+        if request.path.endswith('/health') or request.path.startswith('/internal/') or real_ip in HEALTH_CHECK_IPS:
             return
 
         print(f"[PAYMENT-SERVICE] {request.method} {request.path} - Client IP: {real_ip}")
     
     app.register_blueprint(payment_bp, url_prefix='/api/payments')
+    
+    # DB 커넥션 고갈 시 503 응답 훅, readiness 확인
+    init_database(app)
+    # 기동 시간 측정 (readiness 응답에 포함)
+    app.config['STARTUP_TIME_MS'] = round((time.perf_counter() - _module_started) * 1000, 1)
+    print(f"[PAYMENT-SERVICE] create_app 완료 ({(time.perf_counter() - started) * 1000:.1f}ms, 모듈 로드 포함 {app.config['STARTUP_TIME_MS']}ms)")
+    
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,212 @@
+# CloudJet MSA 캐시 직렬화 모듈
+# 항공편 검색 결과를 Redis에 저장할 때 사용하는 직렬화 방식 (JSON / 컬럼 기반 바이너리)
+import json
+import os
+import time
+import zlib
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+# lz4는 선택 의존성 (설치되어 있지 않으면 zlib 사용)
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# 바이너리 페이로드 첫 바이트 (형식 버전)
+# 기존 JSON 텍스트는 '{' 또는 '['로 시작하므로 버전 바이트와 겹치지 않음
+FORMAT_COMPACT_V1 = 0x01
+
+COMPRESSION_NONE = 0x00
+COMPRESSION_ZLIB = 0x01
+COMPRESSION_LZ4 = 0x02
+
+def _json_default(value):
+    """json 기본 변환에 없는 DB 값 처리 (ROUND 등 DECIMAL 컬럼은 Decimal로 읽힘)"""
+    if isinstance(value, Decimal):
+        # 소수부가 없으면 정수로 (가격은 원 단위 정수)
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class JsonSerializer:
+    """기존 JSON 텍스트 형식 (롤백 및 이전 버전 호환용)"""
+    name = 'json'
+
+    def dumps(self, flights: List[Dict], meta: Dict[str, Any]) -> bytes:
+        payload = dict(meta)
+        payload["flights"] = flights
+        return json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+    def loads(self, data: bytes) -> Tuple[List[Dict], Dict[str, Any]]:
+        payload = json.loads(data)
+        if isinstance(payload, list):
+            # 메타데이터 없이 목록만 저장하던 초기 형식
+            return payload, {}
+        flights = payload.pop("flights")
+        return flights, payload
+
+class CompactSerializer:
+    """컬럼 기반 바이너리 형식
+
+    [버전 1바이트][압축 방식 1바이트][본문]
+    본문은 {"m": 메타, "c": 컬럼명, "a": {별칭: 원본 컬럼}, "r": 행 배열} JSON이다.
+    필드명은 페이로드당 한 번만 저장하고, flightId/flight_id 처럼 모든 행에서
+    값이 같은 컬럼은 별칭으로만 기록한다. 본문이 임계치보다 크면 압축한다.
+    """
+    name = 'compact'
+
+    def __init__(self, compression: str = 'zlib', compress_min_bytes: int = 1024):
+        if compression == 'lz4' and lz4_frame is None:
+            compression = 'zlib'
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+
+    def dumps(self, flights: List[Dict], meta: Dict[str, Any]) -> bytes:
+        body = {"m": meta}
+        columns = list(flights[0].keys()) if flights else []
+
+        if any(len(row) != len(columns) or any(c not in row for c in columns) for row in flights):
+            # 행마다 필드 구성이 다르면 컬럼화하지 않고 그대로 저장
+            body["d"] = flights
+        else:
+            aliases = {}
+            stored_columns = []
+            seen = {}  # 컬럼 전체 값(타입 포함) → 처음 나온 컬럼명
+            for column in columns:
+                signature = tuple((type(row[column]), row[column]) for row in flights)
+                try:
+                    source = seen.setdefault(signature, column)
+                except TypeError:
+                    # 리스트 등 해시할 수 없는 값은 별칭 처리하지 않음
+                    source = column
+                if source != column:
+                    aliases[column] = source
+                else:
+                    stored_columns.append(column)
+            body["c"] = columns
+            body["a"] = aliases
+            body["r"] = [[row[c] for c in stored_columns] for row in flights]
+
+        raw = json.dumps(body, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+        compression = COMPRESSION_NONE
+        if len(raw) >= self.compress_min_bytes:
+            if self.compression == 'lz4':
+                raw = lz4_frame.compress(raw)
+                compression = COMPRESSION_LZ4
+            elif self.compression == 'zlib':
+                raw = zlib.compress(raw, 6)
+                compression = COMPRESSION_ZLIB
+        return bytes((FORMAT_COMPACT_V1, compression)) + raw
+
+    def loads(self, data: bytes) -> Tuple[List[Dict], Dict[str, Any]]:
+        compression = data[1]
+        raw = data[2:]
+        if compression == COMPRESSION_ZLIB:
+            raw = zlib.decompress(raw)
+        elif compression == COMPRESSION_LZ4:
+            if lz4_frame is None:
+                raise ValueError("lz4로 압축된 캐시 값이지만 lz4 패키지가 없습니다.")
+            raw = lz4_frame.decompress(raw)
+
+        body = json.loads(raw)
+        meta = body.get("m", {})
+        if "d" in body:
+            return body["d"], meta
+
+        columns = body["c"]
+        aliases = body["a"]
+        stored_columns = [c for c in columns if c not in aliases]
+        flights = []
+        for values in body["r"]:
+            row = dict(zip(stored_columns, values))
+            flights.append({c: row[aliases.get(c, c)] for c in columns})
+        return flights, meta
+
+_json_serializer = JsonSerializer()
+
+def get_serializer():
+    """CACHE_SERIALIZER 환경변수로 쓰기 형식 선택 (json | compact)
+
+    읽기는 decode_payload가 형식을 자동 판별하므로, 모든 파드가 새 버전으로
+    배포된 뒤 compact로 전환하면 안전하게 롤아웃할 수 있다.
+    """
+    if os.environ.get('CACHE_SERIALIZER', 'json').lower() == 'compact':
+        return CompactSerializer(
+            compression=os.environ.get('CACHE_COMPRESSION', 'zlib').lower(),
+            compress_min_bytes=int(os.environ.get('CACHE_COMPRESS_MIN_BYTES', 1024))
+        )
+    return _json_serializer
+
+def decode_payload(data) -> Tuple[List[Dict], Dict[str, Any]]:
+    """저장 형식을 자동 판별해 (flights, meta) 반환"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    if data[:1] == bytes((FORMAT_COMPACT_V1,)):
+        return CompactSerializer().loads(data)
+    return _json_serializer.loads(data)
+
+def _sample_flights(count: int) -> List[Dict]:
+    """벤치마크용 검색 결과 샘플 (Flight.search_flights 응답 형태)"""
+    flights = []
+    for i in range(count):
+        flight = {
+            'schedule_id': 1000 + i,
+            'flight_id': f"CJ{100 + i % 50}",
+            'airline': 'CloudJet',
+            'departure_airport': 'ICN',
+            'arrival_airport': 'NRT',
+            'departure_time': f"{6 + i % 12:02d}:30:00",
+            'arrival_time': f"{9 + i % 12:02d}:15:00",
+            'duration': '2시간 45분',
+            'aircraft': 'Boeing 737-800',
+            'original_price': 320000,
+            # 할인 가격은 ROUND 결과라 DB에서 Decimal로 읽힘
+            'price': Decimal(288000) if i % 3 == 0 else Decimal(320000),
+            'available_seats': 180 - i % 40,
+            'date': '2025-09-01',
+            'departure_name': '인천국제공항',
+            'arrival_name': '나리타국제공항',
+            'discount_percentage': 10 if i % 3 == 0 else None,
+            'has_discount': 1 if i % 3 == 0 else 0,
+        }
+        flight['departureTime'] = flight['departure_time']
+        flight['arrivalTime'] = flight['arrival_time']
+        flight['flightId'] = flight['flight_id']
+        flight['departureAirport'] = flight['departure_airport']
+        flight['arrivalAirport'] = flight['arrival_airport']
+        flights.append(flight)
+    return flights
+
+def benchmark(row_counts=(5, 20, 100), iterations: int = 500):
+    """JSON 대비 compact 형식의 크기와 인코딩/디코딩 시간 비교"""
+    meta = {"delta": 0.05, "expires_at": time.time() + 300}
+    serializers = [
+        ('json', _json_serializer),
+        ('compact', CompactSerializer(compression='none')),
+        ('compact+zlib', CompactSerializer(compression='zlib')),
+    ]
+    if lz4_frame is not None:
+        serializers.append(('compact+lz4', CompactSerializer(compression='lz4')))
+
+    for count in row_counts:
+        flights = _sample_flights(count)
+        print(f"\n[{count}개 항공편, {iterations}회 반복]")
+        print(f"{'형식':<14}{'크기(bytes)':>12}{'인코딩(us)':>12}{'디코딩(us)':>12}")
+        for name, serializer in serializers:
+            data = serializer.dumps(flights, meta)
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                serializer.dumps(flights, meta)
+            encode_us = (time.perf_counter() - started) / iterations * 1e6
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                decoded, _ = decode_payload(data)
+            decode_us = (time.perf_counter() - started) / iterations * 1e6
+
+            assert decoded == flights
+            print(f"{name:<14}{len(data):>12}{encode_us:>12.1f}{decode_us:>12.1f}")
+
+if __name__ == "__main__":
+    benchmark()
@@ -2,36 +2,575 @@
 # AWS RDS MySQL 커넥션 풀 관리, 모든 마이크로서비스에서 공유 사용
 import mysql.connector
 from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
 import os
 import json
+import threading
+import time as time_module
+from contextlib import contextmanager
+from bisect import bisect_left
+from collections import deque
 from datetime import datetime, date, time, timedelta
 from dotenv import load_dotenv
+from flask import Response, current_app, g, has_request_context, jsonify, request, stream_with_context
+from shared.row_serializer import compile_row_serializer
 
 # .env 파일 로드
 load_dotenv()
 
-# 커넥션 풀 글로벌 변수
+# 커넥션 풀 글로벌 변수 (프로세스별로 최초 사용 시 생성)
 connection_pool = None
+_connection_pool_pid = None
+_pool_init_lock = threading.Lock()
+_pool_retry_at = 0.0
+# fork 전 부모 프로세스에서 만든 풀 (자식에서 GC로 닫히며 부모 세션을 끊지 않도록 참조만 유지)
+_inherited_pools = []
+
+# 읽기 전용 레플리카 풀 (DB_READ_HOSTS 미설정 시 빈 목록 → 모든 조회가 primary로)
+replica_pools = None
+_replica_lock = threading.Lock()
+
+# 풀을 만들 수 없을 때만 허용하는 직접 연결 수 상한
+_direct_connection_slots = threading.BoundedSemaphore(int(os.environ.get('DB_MAX_DIRECT_CONNECTIONS', 2)))
+
+# 요청 기한: Istio(Envoy)가 라우트 timeout을 전달하는 헤더, 헤더가 없을 때의 기본값(ms, 0이면 제한 없음)
+DEADLINE_HEADER = os.environ.get('DB_DEADLINE_HEADER', 'x-envoy-expected-rq-timeout-ms')
+DEFAULT_REQUEST_TIMEOUT_MS = int(os.environ.get('DB_REQUEST_TIMEOUT_MS', 10000))
+# 헤더 기한에서 응답 직렬화/전송 몫으로 남겨둘 시간 (ms)
+DEADLINE_MARGIN_MS = int(os.environ.get('DB_DEADLINE_MARGIN_MS', 100))
+# 세션 제한은 이 단위(ms)로 내림해 값이 같으면 SET을 생략
+DEADLINE_STEP_MS = 250
+# 요청 밖(백그라운드 작업 등)에서 쓰는 세션 기본값 (MAX_EXECUTION_TIME ms, innodb_lock_wait_timeout 초)
+DEFAULT_SESSION_LIMITS = (int(os.environ.get('DB_MAX_EXECUTION_MS', 0)),
+                          int(os.environ.get('DB_LOCK_WAIT_TIMEOUT', 50)))
+# 대용량 조회 스트리밍 시 한 번에 읽는 행 수
+STREAM_BATCH_SIZE = int(os.environ.get('DB_STREAM_BATCH_SIZE', 500))
+# MAX_EXECUTION_TIME 초과(3024), 락 대기 시간 초과(1205)
+QUERY_TIMEOUT_ERRNOS = (3024, 1205)
+
+class PoolMetrics:
+    """커넥션 풀 지표 (대기/점유 시간 히스토그램, 사용량 게이지, 이벤트 카운터)"""
+
+    # 히스토그램 버킷 상한 (ms), 마지막은 +Inf
+    BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+    COUNTERS = ('checkouts', 'overflow_checkouts', 'exhausted', 'direct_fallbacks',
+                'direct_rejected', 'stale_replacements', 'errors',
+                'replica_lagging', 'primary_fallbacks')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.histograms = {
+            'checkout_wait_ms': self._new_histogram(),
+            'hold_ms': self._new_histogram(),
+        }
+
+    def _new_histogram(self):
+        return {'buckets': [0] * (len(self.BUCKETS_MS) + 1), 'count': 0, 'sum': 0.0, 'max': 0.0}
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def observe(self, name, value_ms):
+        with self._lock:
+            histogram = self.histograms[name]
+            histogram['buckets'][bisect_left(self.BUCKETS_MS, value_ms)] += 1
+            histogram['count'] += 1
+            histogram['sum'] += value_ms
+            histogram['max'] = max(histogram['max'], value_ms)
+
+    def checked_out(self, wait_ms):
+        with self._lock:
+            self.in_use += 1
+        self.observe('checkout_wait_ms', wait_ms)
+
+    def returned(self, hold_ms):
+        with self._lock:
+            self.in_use -= 1
+        self.observe('hold_ms', hold_ms)
+
+    def _percentile(self, histogram, q):
+        # 버킷 상한으로 근사한 백분위수
+        if not histogram['count']:
+            return None
+        target = histogram['count'] * q
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS, histogram['buckets']):
+            seen += count
+            if seen >= target:
+                return bound
+        return histogram['max']
+
+    def snapshot(self):
+        with self._lock:
+            histograms = {}
+            for name, histogram in self.histograms.items():
+                histograms[name] = {
+                    'count': histogram['count'],
+                    'avg': round(histogram['sum'] / histogram['count'], 2) if histogram['count'] else None,
+                    'max': round(histogram['max'], 2),
+                    'p50': self._percentile(histogram, 0.5),
+                    'p95': self._percentile(histogram, 0.95),
+                    'p99': self._percentile(histogram, 0.99),
+                    'buckets': {**{f"le_{b}": c for b, c in zip(self.BUCKETS_MS, histogram['buckets'])},
+                                'le_inf': histogram['buckets'][-1]},
+                }
+            return {'in_use': self.in_use, 'counters': dict(self.counters), 'histograms': histograms}
+
+pool_metrics = PoolMetrics()
+replica_metrics = PoolMetrics()
+
+class PoolExhaustedError(PoolError):
+    """대기 시간 안에 커넥션을 얻지 못함 (과부하 → 503)"""
+
+class LeasedConnection:
+    """풀에서 빌린 커넥션 래퍼, close() 시 대기열 슬롯 반환"""
+
+    def __init__(self, connection, release, metrics=pool_metrics):
+        self._connection = connection
+        self._release = release
+        self._metrics = metrics
+        self._released = False
+        self._checked_out_at = time_module.monotonic()
+        # 기록 대기 중인 TimedCursor (close하지 않은 cursor도 반환 시점에 기록)
+        self._timed_cursors = set()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._connection.cursor(*args, **kwargs)
+        if kwargs.get('prepared'):
+            # prepared cursor는 StatementRegistry가 직접 시간/오류를 기록
+            return cursor
+        if slow_queries.enabled:
+            return TimedCursor(cursor, self)
+        return GuardedCursor(cursor, self)
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        for cursor in list(self._timed_cursors):
+            cursor._flush()
+        try:
+            # 세션 리셋 없이 풀로 돌아가므로 다음 사용자가 이전 트랜잭션을 이어받지 않도록 정리
+            if self._connection.in_transaction:
+                self._connection.rollback()
+        except Error as e:
+            print(f"❌ 커넥션 반환 전 롤백 실패: {e}")
+        try:
+            self._connection.close()
+        finally:
+            self._release()
+            self._metrics.returned((time_module.monotonic() - self._checked_out_at) * 1000)
+
+class BoundedConnectionPool:
+    """대기 시간이 있는 커넥션 풀
+
+    mysql-connector 풀은 비어 있으면 즉시 PoolError를 던지므로, 세마포어로
+    (pool_size + max_overflow)개까지만 동시에 빌려주고 나머지 요청은 timeout 동안 대기시킨다.
+    pool_size를 넘는 overflow 커넥션은 반환 시 바로 닫는다.
+    """
+
+    def __init__(self, pool_config, max_overflow=0, timeout=1.0, metrics=pool_metrics):
+        self.pool_size = pool_config['pool_size']
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.metrics = metrics
+        self.reset_session = pool_config['pool_reset_session']
+        self._pool = pooling.MySQLConnectionPool(**pool_config)
+        self._connect_config = {k: v for k, v in pool_config.items()
+                                if k not in ('pool_name', 'pool_size', 'pool_reset_session')}
+        self._slots = threading.BoundedSemaphore(self.pool_size + max_overflow)
+
+    def get_connection(self, timeout=None):
+        """timeout: 이번 대기 시간 상한 (요청 기한이 더 짧을 때), 기본은 풀 설정값"""
+        started = time_module.monotonic()
+        timeout = self.timeout if timeout is None else min(self.timeout, timeout)
+        if not self._slots.acquire(timeout=timeout):
+            self.metrics.incr('exhausted')
+            raise PoolExhaustedError(
+                f"커넥션 풀 대기 시간 초과 ({timeout:.2f}초, 최대 {self.pool_size + self.max_overflow}개 사용 중)")
+        try:
+            try:
+                connection = self._pool.get_connection()
+            except PoolError:
+                # 풀의 커넥션이 모두 사용 중 → overflow 슬롯으로 임시 연결
+                connection = mysql.connector.connect(**self._connect_config)
+                self.metrics.incr('overflow_checkouts')
+        except Exception:
+            self._slots.release()
+            self.metrics.incr('errors')
+            raise
+        if self.reset_session:
+            # 반환 시 세션이 리셋되어 서버의 prepared statement가 해제됨
+            forget_prepared_statements(connection)
+        self.metrics.incr('checkouts')
+        self.metrics.checked_out((time_module.monotonic() - started) * 1000)
+        return LeasedConnection(connection, self._slots.release, self.metrics)
+
+    def idle_count(self):
+        # mysql-connector 풀 내부 대기열 크기 (반환되어 재사용 대기 중인 커넥션)
+        return self._pool._cnx_queue.qsize()
+
+def _build_pool_config(pool_name, host, pool_size):
+    return {
+        'pool_name': pool_name,
+        'pool_size': pool_size,
+        # 세션 리셋(COM_RESET_CONNECTION)은 prepared statement도 해제하므로 기본 비활성화
+        # (반환 시 열린 트랜잭션은 LeasedConnection.close에서 롤백)
+        'pool_reset_session': os.environ.get('DB_POOL_RESET_SESSION', 'false').lower() == 'true',
+        'host': host,
+        'database': os.environ.get('DB_NAME'),
+        'user': os.environ.get('DB_USER'),
+        'password': os.environ.get('DB_PASSWORD'),
+        'autocommit': False,
+        'charset': 'utf8mb4',
+        'use_unicode': True,
+        'connect_timeout': 10,
+        'sql_mode': 'STRICT_TRANS_TABLES,NO_ZERO_DATE,NO_ZERO_IN_DATE,ERROR_FOR_DIVISION_BY_ZERO'
+    }
+
+def _reset_pools_after_fork():
+    """fork 직후 자식 프로세스에서 풀 참조 초기화 (부모 소켓은 건드리지 않음)"""
+    global connection_pool, _connection_pool_pid, _pool_init_lock
+    global replica_pools, _replica_lock, _direct_connection_slots
+    _inherited_pools.extend(p for p in [connection_pool] + list(replica_pools or []) if p is not None)
+    connection_pool = None
+    _connection_pool_pid = None
+    replica_pools = None
+    _pool_init_lock = threading.Lock()
+    _replica_lock = threading.Lock()
+    _direct_connection_slots = threading.BoundedSemaphore(int(os.environ.get('DB_MAX_DIRECT_CONNECTIONS', 2)))
+    pool_metrics.reset()
+    replica_metrics.reset()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+def _params_shape(params):
+    # 값 대신 타입만 기록 (개인정보가 로그에 남지 않도록)
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    if len(params) > 10:
+        return f"{len(params)} params"
+    return [type(value).__name__ for value in params]
+
+def _current_route():
+    if not has_request_context():
+        return None
+    rule = request.url_rule.rule if request.url_rule else request.path
+    return f"{request.method} {rule}"
+
+class SlowQueryLog:
+    """느린 쿼리 로그 (DB_SLOW_QUERY_MS 이상, 0이면 비활성)
+
+    쿼리 이름, 파라미터 타입, 행 수, 호출 라우트를 출력하고, SELECT는 같은 커넥션에서
+    EXPLAIN을 실행해 최근 DB_SLOW_QUERY_BUFFER개만 보관한다 (쿼리별 DB_SLOW_QUERY_EXPLAIN_INTERVAL초에 한 번).
+    """
+
+    def __init__(self):
+        self.threshold_ms = float(os.environ.get('DB_SLOW_QUERY_MS', 0))
+        self.enabled = self.threshold_ms > 0
+        self.explain_interval = float(os.environ.get('DB_SLOW_QUERY_EXPLAIN_INTERVAL', 60))
+        self._entries = deque(maxlen=int(os.environ.get('DB_SLOW_QUERY_BUFFER', 50)))
+        self._explained_at = {}
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, name, sql, params, rows, elapsed_ms, connection=None):
+        """쿼리 실행 후 호출, connection은 결과를 모두 읽은 경우에만 넘긴다 (EXPLAIN 실행용)"""
+        if not self.enabled or elapsed_ms < self.threshold_ms:
+            return
+        entry = {
+            'name': name,
+            'elapsed_ms': round(elapsed_ms, 1),
+            'rows': rows,
+            'params': _params_shape(params),
+            'route': _current_route(),
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'explain': None,
+        }
+        print(f"🐢 느린 쿼리 {name} {entry['elapsed_ms']}ms rows={rows} params={entry['params']} route={entry['route']}")
+        if connection is not None and self._should_explain(name, sql):
+            entry['explain'] = self._explain(connection, sql, params)
+        with self._lock:
+            self.count += 1
+            self._entries.append(entry)
+
+    def _should_explain(self, name, sql):
+        if not sql.lstrip().upper().startswith('SELECT'):
+            return False
+        now = time_module.monotonic()
+        with self._lock:
+            if now - self._explained_at.get(name, float('-inf')) < self.explain_interval:
+                return False
+            self._explained_at[name] = now
+            return True
+
+    def _explain(self, connection, sql, params):
+        # 래퍼를 거치지 않는 일반 cursor로 실행 (EXPLAIN 자체는 기록하지 않음)
+        try:
+            cursor = _physical_connection(connection).cursor(dictionary=True)
+            try:
+                cursor.execute(f"EXPLAIN {sql}", params)
+                return [{key: safe_json_serialize(value) for key, value in row.items()}
+                        for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Error as e:
+            return [{'error': str(e)}]
+
+    def snapshot(self):
+        """최근 느린 쿼리 (최신 순)"""
+        with self._lock:
+            return {'threshold_ms': self.threshold_ms if self.enabled else None,
+                    'count': self.count, 'entries': list(reversed(self._entries))}
+
+slow_queries = SlowQueryLog()
+
+class GuardedCursor:
+    """일반 cursor 래퍼: 기한 초과로 중단된 쿼리를 요청의 504 응답 대상으로 표시
+
+    LeasedConnection.cursor가 prepared가 아닌 모든 cursor를 감싸므로, 모델 코드가
+    직접 connection.cursor()로 실행한 쿼리도 시간 초과 시 일반 500 대신 504가 된다.
+    """
+
+    def __init__(self, cursor, connection):
+        self._cursor = cursor
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        except Error as e:
+            _note_query_error(e)
+            raise
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        except Error as e:
+            _note_query_error(e)
+            raise
+
+    def close(self):
+        return self._cursor.close()
+
+class TimedCursor(GuardedCursor):
+    """느린 쿼리 로그용 cursor 래퍼 (DB_SLOW_QUERY_MS 설정 시 LeasedConnection.cursor가 반환)
+
+    unbuffered cursor는 행을 fetch할 때 받으므로 fetchall까지의 시간을 합산해 기록하고,
+    fetchone/fetchmany로 읽는 경우는 읽은 시간을 더해 두었다가 다음 execute/close 시점에 기록한다.
+    cursor를 닫지 않아도 커넥션 반환(LeasedConnection.close) 때 기록된다.
+    """
+
+    def __init__(self, cursor, connection):
+        super().__init__(cursor, connection)
+        self._pending = None
+
+    def _flush(self, extra_ms=0.0, rows=None, connection=None):
+        if self._pending is None:
+            return
+        sql, params, elapsed_ms = self._pending
+        self._pending = None
+        self._connection._timed_cursors.discard(self)
+        slow_queries.record(' '.join(sql.split())[:80], sql, params,
+                            self._cursor.rowcount if rows is None else rows, elapsed_ms + extra_ms, connection)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._flush()
+        started = time_module.perf_counter()
+        result = super().execute(operation, params, *args, **kwargs)
+        self._pending = (operation, params, (time_module.perf_counter() - started) * 1000)
+        if not self._cursor.with_rows:
+            self._flush(connection=self._connection)
+        else:
+            self._connection._timed_cursors.add(self)
+        return result
+
+    def _add_fetch_time(self, started):
+        if self._pending is not None:
+            sql, params, elapsed_ms = self._pending
+            self._pending = (sql, params, elapsed_ms + (time_module.perf_counter() - started) * 1000)
+
+    def fetchone(self):
+        started = time_module.perf_counter()
+        row = self._cursor.fetchone()
+        self._add_fetch_time(started)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        started = time_module.perf_counter()
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._add_fetch_time(started)
+        return rows
+
+    def fetchall(self):
+        started = time_module.perf_counter()
+        rows = self._cursor.fetchall()
+        self._flush((time_module.perf_counter() - started) * 1000, len(rows), self._connection)
+        return rows
+
+    def close(self):
+        self._flush()
+        return self._cursor.close()
+
+class StatementRegistry:
+    """자주 실행하는 쿼리 목록
+
+    이름으로 등록한 쿼리는 물리 커넥션별로 캐시한 prepared cursor로 실행해 MySQL의
+    반복 파싱을 피하고, 쿼리별 호출 수/지연 시간을 집계한다.
+    DB_PREPARED_STATEMENTS=false면 일반 cursor로 실행한다 (집계는 유지).
+    serialize=True로 등록하면 튜플 cursor로 읽고 컬럼 타입 기반 직렬화 함수로
+    JSON 응답용 dict를 만든다 (함수는 쿼리별로 한 번만 컴파일).
+    """
+
+    # 서버에서 prepared statement가 사라진 경우 (세션 리셋/재연결 등)
+    UNKNOWN_STATEMENT_ERRNO = 1243
+
+    def __init__(self):
+        self._statements = {}
+        self._serializers = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.prepared = os.environ.get('DB_PREPARED_STATEMENTS', 'true').lower() == 'true'
+
+    def register(self, name, sql, dictionary=True, serialize=False):
+        self._statements[name] = (sql, dictionary and not serialize, serialize)
+        self._stats.setdefault(name, {'calls': 0, 'errors': 0, 'prepares': 0, 'rows': 0,
+                                      'total_ms': 0.0, 'max_ms': 0.0})
+        return name
+
+    def _cursor(self, connection, name):
+        sql, dictionary, _ = self._statements[name]
+        if not self.prepared:
+            return connection.cursor(dictionary=dictionary), False
+
+        physical = _physical_connection(connection)
+        cursors = getattr(physical, '_cjet_prepared_cursors', None)
+        if cursors is None:
+            cursors = physical._cjet_prepared_cursors = {}
+        cursor = cursors.get(name)
+        if cursor is not None:
+            return cursor, False
+        cursor = cursors[name] = physical.cursor(prepared=True, dictionary=dictionary)
+        return cursor, True
+
+    def execute(self, connection, name, params=(), fetch='all'):
+        """등록된 쿼리 실행
+
+        fetch='all' → 행 목록, 'one' → 첫 행 또는 None, None → 영향받은 행 수.
+        prepared cursor를 재사용하므로 결과는 항상 끝까지 읽는다.
+        """
+        sql, _, serialize = self._statements[name]
+        started = time_module.perf_counter()
+        try:
+            cursor, prepared_now = self._cursor(connection, name)
+            try:
+                cursor.execute(sql, params)
+            except Error as e:
+                if e.errno != self.UNKNOWN_STATEMENT_ERRNO:
+                    raise
+                forget_prepared_statements(connection)
+                cursor, prepared_now = self._cursor(connection, name)
+                cursor.execute(sql, params)
+
+            if fetch is None:
+                result = cursor.rowcount
+                rows = 0
+            else:
+                rows_list = cursor.fetchall() if cursor.with_rows else []
+                if serialize and rows_list:
+                    serializer = self._serializers.get(name)
+                    if serializer is None:
+                        serializer = self._serializers[name] = compile_row_serializer(cursor.description)
+                    rows_list = [serializer(row) for row in rows_list]
+                rows = len(rows_list)
+                result = rows_list if fetch == 'all' else (rows_list[0] if rows_list else None)
+            if not self.prepared:
+                cursor.close()
+        except Error as e:
+            self._record(name, started, error=True)
+            _note_query_error(e)
+            raise
+        elapsed_ms = self._record(name, started, rows=rows, prepared_now=prepared_now)
+        slow_queries.record(name, sql, params, rows, elapsed_ms, connection)
+        return result
+
+    def _record(self, name, started, rows=0, error=False, prepared_now=False):
+        elapsed_ms = (time_module.perf_counter() - started) * 1000
+        with self._lock:
+            stats = self._stats[name]
+            stats['calls'] += 1
+            stats['rows'] += rows
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            if error:
+                stats['errors'] += 1
+            if prepared_now:
+                stats['prepares'] += 1
+        return elapsed_ms
+
+    def snapshot(self):
+        """쿼리별 집계 (누적 시간 순)"""
+        with self._lock:
+            result = {}
+            for name, stats in sorted(self._stats.items(), key=lambda item: -item[1]['total_ms']):
+                result[name] = dict(stats,
+                                    total_ms=round(stats['total_ms'], 1),
+                                    max_ms=round(stats['max_ms'], 2),
+                                    avg_ms=round(stats['total_ms'] / stats['calls'], 2) if stats['calls'] else None)
+            return {'prepared': self.prepared, 'statements': result}
+
+statements = StatementRegistry()
+
+def register_statement(name, sql, dictionary=True, serialize=False):
+    """쿼리 등록 (모듈 로드 시 한 번), 실행은 run_statement(connection, name, params)"""
+    return statements.register(name, sql, dictionary, serialize)
+
+def run_statement(connection, name, params=(), fetch='all'):
+    return statements.execute(connection, name, params, fetch)
+
+def _physical_connection(connection):
+    # ScopedConnection/LeasedConnection/PooledMySQLConnection 래퍼를 벗긴 실제 MySQL 커넥션
+    while isinstance(connection, (ScopedConnection, LeasedConnection)):
+        connection = connection._connection
+    return getattr(connection, '_cnx', connection)
+
+def forget_prepared_statements(connection):
+    """커넥션에 캐시된 prepared cursor 폐기 (서버 측 statement가 이미 해제된 경우)"""
+    physical = _physical_connection(connection)
+    if getattr(physical, '_cjet_prepared_cursors', None):
+        physical._cjet_prepared_cursors = {}
 
 def init_connection_pool():
-    """AWS RDS MySQL 커넥션 풀 초기화"""
+    """AWS RDS MySQL 커넥션 풀 초기화 (연결 확인은 check_database_ready에서 별도로 수행)"""
     global connection_pool
     
     try:
-        pool_config = {
-            'pool_name': 'cloudjet_pool',
-            'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
-            'pool_reset_session': True,
-            'host': os.environ.get('DB_HOST'),
-            'database': os.environ.get('DB_NAME'),
-            'user': os.environ.get('DB_USER'),
-            'password': os.environ.get('DB_PASSWORD'),
-            'autocommit': False,
-            'charset': 'utf8mb4',
-            'use_unicode': True,
-            'connect_timeout': 10,
-            'sql_mode': 'STRICT_TRANS_TABLES,NO_ZERO_DATE,NO_ZERO_IN_DATE,ERROR_FOR_DIVISION_BY_ZERO'
-        }
+        pool_config = _build_pool_config('cloudjet_pool', os.environ.get('DB_HOST'),
+                                         int(os.environ.get('DB_POOL_SIZE', 5)))
         
         # 필수 환경변수 확인 (DB_NAME 추가)
         required_vars = ['DB_HOST', 'DB_USER', 'DB_PASSWORD', 'DB_NAME']
@@ -40,18 +579,12 @@ def init_connection_pool():
         if missing_vars:
             raise ValueError(f"필수 환경변수가 누락되었습니다: {', '.join(missing_vars)}")
         
-        connection_pool = pooling.MySQLConnectionPool(**pool_config)
-        print(f"✅ AWS RDS 커넥션 풀 초기화 완료 (Host: {pool_config['host']}, DB: {pool_config['database']})")
-        
-        # 연결 테스트
-        test_connection = connection_pool.get_connection()
-        if test_connection.is_connected():
-            cursor = test_connection.cursor()
-            cursor.execute("SELECT VERSION()")
-            version = cursor.fetchone()
-            print(f"   MySQL 버전: {version[0]}")
-            cursor.close()
-            test_connection.close()
+        connection_pool = BoundedConnectionPool(
+            pool_config,
+            max_overflow=int(os.environ.get('DB_POOL_MAX_OVERFLOW', 5)),
+            timeout=float(os.environ.get('DB_POOL_TIMEOUT', 1.0))
+        )
+        print(f"✅ AWS RDS 커넥션 풀 초기화 완료 (PID: {os.getpid()}, Host: {pool_config['host']}, DB: {pool_config['database']})")
             
     except Error as e:
         print(f"❌ 커넥션 풀 초기화 실패: {e}")
@@ -60,29 +593,615 @@ def init_connection_pool():
         print(f"❌ 설정 오류: {e}")
         connection_pool = None
 
-def get_db_connection():
-    """AWS RDS 데이터베이스 연결 (커넥션 풀 사용)"""
-    global connection_pool
+class ReplicaPool:
+    """읽기 전용 레플리카 하나의 풀과 상태 (복제 지연 확인 결과를 check_interval 동안 재사용)"""
+
+    def __init__(self, host, pool, max_lag, check_interval):
+        self.host = host
+        self.pool = pool
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag = None
+        self.unhealthy_until = 0.0
+        self.next_check_at = 0.0
+
+    def is_healthy(self):
+        return time_module.monotonic() >= self.unhealthy_until
+
+    def mark_unhealthy(self, reason):
+        print(f"❌ 레플리카 제외 ({self.host}, {self.check_interval}초): {reason}")
+        self.unhealthy_until = time_module.monotonic() + self.check_interval
+
+    def check_lag(self, connection):
+        """복제 지연이 허용치 이내인지 확인 (확인 주기가 지나지 않았으면 생략)"""
+        now = time_module.monotonic()
+        if now < self.next_check_at:
+            return True
+        self.next_check_at = now + self.check_interval
+
+        cursor = connection.cursor(dictionary=True)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except Error:
+                # MySQL 8.0.22 이전 버전
+                cursor.execute("SHOW SLAVE STATUS")
+            status = cursor.fetchone()
+        except Error as e:
+            # 권한 부족 등으로 지연을 확인할 수 없으면 정상으로 간주
+            print(f"레플리카 지연 확인 불가 ({self.host}): {e}")
+            return True
+        finally:
+            cursor.close()
+
+        if not status:
+            # Aurora 리더 엔드포인트 등 복제 상태가 노출되지 않는 경우
+            self.lag = 0
+            return True
+        self.lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        if self.lag is None or self.lag > self.max_lag:
+            self.mark_unhealthy(f"복제 지연 {self.lag}초 (허용 {self.max_lag}초)")
+            return False
+        return True
+
+def init_replica_pools():
+    """DB_READ_HOSTS(쉼표 구분)의 레플리카마다 풀 생성"""
+    global replica_pools
+
+    pools = []
+    hosts = [h.strip() for h in os.environ.get('DB_READ_HOSTS', '').split(',') if h.strip()]
+    for index, host in enumerate(hosts):
+        try:
+            pool = BoundedConnectionPool(
+                _build_pool_config(f"cloudjet_replica_{index}", host,
+                                   int(os.environ.get('DB_READ_POOL_SIZE', os.environ.get('DB_POOL_SIZE', 5)))),
+                max_overflow=int(os.environ.get('DB_POOL_MAX_OVERFLOW', 5)),
+                timeout=float(os.environ.get('DB_READ_POOL_TIMEOUT', 0.2)),
+                metrics=replica_metrics
+            )
+            pools.append(ReplicaPool(
+                host, pool,
+                max_lag=float(os.environ.get('DB_REPLICA_MAX_LAG', 5)),
+                check_interval=float(os.environ.get('DB_REPLICA_CHECK_INTERVAL', 5))
+            ))
+            print(f"✅ 읽기 레플리카 풀 초기화 완료 (Host: {host})")
+        except Error as e:
+            print(f"❌ 읽기 레플리카 풀 초기화 실패 ({host}): {e}")
+    replica_pools = pools
+
+_replica_cursor = 0
+
+def _get_replica_connection():
+    """정상 레플리카에서 라운드로빈으로 커넥션 획득, 모두 사용할 수 없으면 None"""
+    global _replica_cursor
+
+    if replica_pools is None:
+        with _replica_lock:
+            if replica_pools is None:
+                init_replica_pools()
+    if not replica_pools:
+        return None
+
+    start = _replica_cursor
+    _replica_cursor = (_replica_cursor + 1) % len(replica_pools)
+    for offset in range(len(replica_pools)):
+        replica = replica_pools[(start + offset) % len(replica_pools)]
+        if not replica.is_healthy():
+            continue
+        try:
+            connection = _validate_connection(replica.pool.get_connection(_checkout_timeout()), replica_metrics)
+        except PoolExhaustedError:
+            continue
+        except Error as e:
+            replica.mark_unhealthy(e)
+            continue
+        if connection is None:
+            replica.mark_unhealthy("연결 끊김")
+            continue
+
+        try:
+            lag_ok = replica.check_lag(connection)
+        except Error as e:
+            replica.mark_unhealthy(e)
+            lag_ok = False
+        if lag_ok:
+            return connection
+        replica_metrics.incr('replica_lagging')
+        connection.close()
+
+    replica_metrics.incr('primary_fallbacks')
+    return None
+
+def _validate_connection(connection, metrics):
+    """끊어진 커넥션은 같은 슬롯에서 재연결해 교체, 실패 시 반환 후 None"""
+    if connection.is_connected():
+        return connection
+
+    metrics.incr('stale_replacements')
+    try:
+        connection.reconnect(attempts=1, delay=0)
+        forget_prepared_statements(connection)
+        _physical_connection(connection)._cjet_session_limits = None
+        return connection
+    except Error as e:
+        print(f"❌ 커넥션 풀에서 유효하지 않은 연결을 받았습니다: {e}")
+        metrics.incr('errors')
+        connection.close()
+        return None
+
+def get_db_connection(read_only=False):
+    """AWS RDS 데이터베이스 연결 (커넥션 풀 사용)
+
+    read_only=True면 읽기 레플리카를 우선 사용하고, 레플리카가 없거나
+    지연/장애 상태면 primary로 대체한다.
+    풀이 가득 차면 직접 연결로 우회하지 않고 None을 반환하며,
+    요청 컨텍스트에 표시해 두면 init_app의 after_request 훅이 응답을 503으로 바꾼다.
+    요청 기한이 있으면 남은 시간을 세션 제한으로 적용하고, 이미 지났으면 None (응답은 504).
+    """
+    remaining = request_deadline_remaining_ms()
+    if remaining is not None and remaining <= 0:
+        print("❌ 요청 기한 초과: DB 작업을 시작하지 않습니다.")
+        _mark_db_timeout()
+        return None
+
+    connection = _checkout_connection(read_only)
+    if connection is None:
+        return None
+    try:
+        _apply_session_limits(connection)
+    except Error as e:
+        print(f"❌ 세션 제한 적용 실패: {e}")
+        connection.close()
+        return None
+    return connection
+
+def _checkout_connection(read_only):
+    if read_only:
+        connection = _get_replica_connection()
+        if connection is not None:
+            return connection
     
-    # 커넥션 풀이 초기화되지 않았다면 초기화
-    if connection_pool is None:
-        init_connection_pool()
+    _ensure_connection_pool()
     
     if connection_pool is None:
         print("❌ 커넥션 풀을 사용할 수 없습니다. 직접 연결을 시도합니다.")
-        return get_direct_connection()
+        return _get_limited_direct_connection()
     
     try:
-        connection = connection_pool.get_connection()
-        if connection.is_connected():
-            return connection
-        else:
-            print("❌ 커넥션 풀에서 유효하지 않은 연결을 받았습니다.")
-            return None
-            
+        connection = connection_pool.get_connection(_checkout_timeout())
+    except PoolExhaustedError as e:
+        print(f"❌ 커넥션 풀 고갈: {e}")
+        _mark_db_unavailable()
+        return None
     except Error as e:
         print(f"❌ 커넥션 풀 연결 오류: {e}")
-        return get_direct_connection()
+        return None
+
+    return _validate_connection(connection, pool_metrics)
+
+def _pool_ready_for(pid):
+    # 이 프로세스에서 이미 초기화했고, 실패했다면 재시도 대기 중
+    return _connection_pool_pid == pid and (
+        connection_pool is not None or time_module.monotonic() < _pool_retry_at)
+
+def _ensure_connection_pool():
+    """현재 프로세스의 커넥션 풀을 최초 사용 시 생성 (스레드 간 한 번만, 실패 시 DB_POOL_RETRY_INTERVAL 후 재시도)"""
+    global _connection_pool_pid, _pool_retry_at
+
+    pid = os.getpid()
+    if _pool_ready_for(pid):
+        return
+    with _pool_init_lock:
+        if _pool_ready_for(pid):
+            return
+        init_connection_pool()
+        _connection_pool_pid = pid
+        if connection_pool is None:
+            _pool_retry_at = time_module.monotonic() + float(os.environ.get('DB_POOL_RETRY_INTERVAL', 5))
+
+def check_database_ready():
+    """readiness 확인: 커넥션 풀 생성(워밍업) 후 가벼운 쿼리 실행"""
+    connection = get_db_connection()
+    if connection is None:
+        return False, '데이터베이스 연결 오류'
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+        cursor.close()
+        return True, None
+    except Error as e:
+        return False, str(e)
+    finally:
+        connection.close()
+
+def _mark_db_unavailable():
+    """현재 요청을 503 대상으로 표시"""
+    if has_request_context():
+        g.db_unavailable = True
+
+def request_deadline_remaining_ms():
+    """현재 요청의 남은 시간 (ms), 요청 밖이거나 기한이 없으면 None"""
+    if not has_request_context():
+        return None
+    deadline = g.get('db_deadline')
+    if deadline is None:
+        return None
+    return (deadline - time_module.monotonic()) * 1000
+
+def _checkout_timeout():
+    # 커넥션 대기도 요청 기한 안에서만 (None이면 풀 설정값)
+    remaining = request_deadline_remaining_ms()
+    return None if remaining is None else max(remaining, 0) / 1000
+
+def _session_limits():
+    """(MAX_EXECUTION_TIME ms, innodb_lock_wait_timeout 초)"""
+    remaining = request_deadline_remaining_ms()
+    if remaining is None:
+        return DEFAULT_SESSION_LIMITS
+    max_execution_ms = max(int(remaining // DEADLINE_STEP_MS) * DEADLINE_STEP_MS, DEADLINE_STEP_MS)
+    # innodb_lock_wait_timeout 최소값은 1초
+    return max_execution_ms, max(int(remaining // 1000), 1)
+
+def _apply_session_limits(connection):
+    """체크아웃한 커넥션에 요청 기한을 세션 제한으로 적용 (이전 값과 다를 때만 SET)
+
+    MAX_EXECUTION_TIME은 SELECT에만 적용되므로 쓰기는 innodb_lock_wait_timeout으로 락 대기를 끊는다.
+    풀 세션 리셋을 끄고 있어 이전 요청의 값이 남아 있으므로 요청 밖에서는 기본값으로 되돌린다.
+    """
+    limits = _session_limits()
+    physical = _physical_connection(connection)
+    if getattr(physical, '_cjet_session_limits', None) == limits:
+        return
+    cursor = physical.cursor()
+    try:
+        cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s, SESSION innodb_lock_wait_timeout = %s", limits)
+    finally:
+        cursor.close()
+    physical._cjet_session_limits = limits
+
+def _mark_db_timeout():
+    """현재 요청을 504 대상으로 표시"""
+    if has_request_context():
+        g.db_timeout = True
+
+def _note_query_error(error):
+    # 기한 초과로 중단된 쿼리면 요청을 504 대상으로 표시 (cursor와 세션에서 모두 호출되므로 한 번만 처리)
+    if getattr(error, 'errno', None) in QUERY_TIMEOUT_ERRNOS and not getattr(error, '_cjet_noted', False):
+        error._cjet_noted = True
+        print(f"❌ 쿼리 시간 초과로 중단: {error}")
+        _mark_db_timeout()
+
+def _request_budget_ms(path, route_timeouts):
+    """경로별 기본 기한과 기한 헤더 중 짧은 값 (ms), 제한이 없으면 None"""
+    budget = DEFAULT_REQUEST_TIMEOUT_MS
+    matched = ''
+    for prefix, timeout_ms in route_timeouts.items():
+        if path.startswith(prefix) and len(prefix) > len(matched):
+            matched, budget = prefix, timeout_ms
+    header = request.headers.get(DEADLINE_HEADER)
+    if header:
+        try:
+            header_ms = float(header) - DEADLINE_MARGIN_MS
+        except ValueError:
+            header_ms = None
+        if header_ms is not None and header_ms > 0:
+            budget = min(budget, header_ms) if budget else header_ms
+    return budget or None
+
+def _get_limited_direct_connection():
+    """풀 초기화 실패 시 직접 연결 (DB_MAX_DIRECT_CONNECTIONS개까지만)"""
+    if not _direct_connection_slots.acquire(blocking=False):
+        print("❌ 직접 연결 상한 초과")
+        pool_metrics.incr('direct_rejected')
+        _mark_db_unavailable()
+        return None
+    started = time_module.monotonic()
+    connection = get_direct_connection()
+    if connection is None:
+        _direct_connection_slots.release()
+        pool_metrics.incr('errors')
+        return None
+    pool_metrics.incr('direct_fallbacks')
+    pool_metrics.checked_out((time_module.monotonic() - started) * 1000)
+    return LeasedConnection(connection, _direct_connection_slots.release)
+
+def get_pool_stats():
+    """커넥션 풀 설정 및 지표 조회 (DB_POOL_SIZE 산정 근거)"""
+    stats = pool_metrics.snapshot()
+    if connection_pool is None:
+        stats.update({'initialized': False, 'idle': 0})
+    else:
+        stats.update({
+            'initialized': True,
+            'pool_size': connection_pool.pool_size,
+            'max_overflow': connection_pool.max_overflow,
+            'checkout_timeout': connection_pool.timeout,
+            'idle': connection_pool.idle_count(),
+        })
+
+    replica_stats = replica_metrics.snapshot()
+    replica_stats['hosts'] = [{
+        'host': replica.host,
+        'healthy': replica.is_healthy(),
+        'lag': replica.lag,
+        'max_lag': replica.max_lag,
+        'idle': replica.pool.idle_count(),
+    } for replica in (replica_pools or [])]
+    stats['replicas'] = replica_stats
+    stats['statements'] = statements.snapshot()
+    return stats
+
+class DatabaseUnavailableError(Error):
+    """db_session/transaction에서 커넥션을 얻지 못함"""
+
+class ScopedConnection:
+    """요청 범위 커넥션 핸들
+
+    모델 코드의 connection.close()는 풀 반환 대신 끝나지 않은 트랜잭션만 정리하고
+    (다음 조회가 이전 스냅샷을 보지 않도록), 실제 반환은 release()에서 한 번만 한다.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self.transaction_depth = 0
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def close(self):
+        if self.transaction_depth == 0 and self._connection.in_transaction:
+            self._connection.rollback()
+
+    def release(self):
+        try:
+            if self._connection.in_transaction:
+                self._connection.rollback()
+        except Error as e:
+            print(f"❌ 커넥션 반환 전 롤백 실패: {e}")
+        finally:
+            self._connection.close()
+
+# 요청 밖(캐시 워머, 일괄 검색 워커 등 백그라운드 스레드)의 db_session 상태
+_thread_sessions = threading.local()
+
+@contextmanager
+def db_session(read_only=False):
+    """커넥션 범위
+
+    요청 안에서는 요청당 하나의 커넥션을 flask.g에 두고 재사용하며 (teardown 시 반환),
+    요청 밖(백그라운드 스레드 등)에서는 스레드별로 두고 가장 바깥 블록이 끝날 때 풀에 반환한다.
+    read_only=True여도 같은 범위에서 이미 primary 커넥션을 쓰고 있다면 그것을 재사용한다 (쓰기 직후 읽기 일관성).
+    """
+    in_request = has_request_context()
+    scope = g if in_request else _thread_sessions
+    key = 'db_connection'
+    if read_only and getattr(scope, 'db_connection', None) is None:
+        key = 'db_read_connection'
+    handle = getattr(scope, key, None)
+    owned = False
+    if handle is None:
+        connection = get_db_connection(read_only=read_only)
+        if connection is None:
+            raise DatabaseUnavailableError(msg="데이터베이스 연결 오류")
+        handle = ScopedConnection(connection)
+        setattr(scope, key, handle)
+        owned = not in_request
+
+    try:
+        yield handle
+    except Error as e:
+        _note_query_error(e)
+        raise
+    finally:
+        if owned:
+            setattr(scope, key, None)
+            handle.release()
+        else:
+            handle.close()
+
+def _execute_savepoint(connection, statement):
+    with connection.cursor() as cursor:
+        cursor.execute(statement)
+
+@contextmanager
+def transaction():
+    """트랜잭션 범위: 정상 종료 시 커밋, 예외 시 롤백 후 재발생
+
+    중첩되면 (요청 밖에서도 같은 스레드 안이면) 바깥 트랜잭션 안에서 SAVEPOINT로 처리한다.
+    """
+    with db_session() as connection:
+        depth = connection.transaction_depth
+        savepoint = f"cjet_sp_{depth}"
+        if depth == 0:
+            if connection.in_transaction:
+                # 같은 요청의 이전 조회로 열린 암묵적 트랜잭션 정리
+                connection.rollback()
+            connection.start_transaction()
+        else:
+            _execute_savepoint(connection, f"SAVEPOINT {savepoint}")
+
+        connection.transaction_depth += 1
+        try:
+            yield connection
+        except BaseException:
+            connection.transaction_depth -= 1
+            try:
+                if depth == 0:
+                    connection.rollback()
+                else:
+                    _execute_savepoint(connection, f"ROLLBACK TO SAVEPOINT {savepoint}")
+            except Error as e:
+                print(f"❌ 트랜잭션 롤백 실패: {e}")
+            raise
+        else:
+            connection.transaction_depth -= 1
+            if depth == 0:
+                connection.commit()
+            else:
+                _execute_savepoint(connection, f"RELEASE SAVEPOINT {savepoint}")
+
+class RowStream:
+    """iter_query 결과: unbuffered cursor에서 fetchmany로 배치씩 읽어 한 행씩 반환
+
+    끝까지 읽거나 close()하면 커넥션을 반환한다. 요청 안에서 만든 스트림은
+    teardown 시에도 닫으므로 응답이 시작되기 전에 클라이언트가 끊겨도 커넥션이 남지 않는다.
+    """
+
+    def __init__(self, connection, cursor, batch_size, overrides=None):
+        self._connection = connection
+        self._cursor = cursor
+        self._batch_size = batch_size
+        self._serialize = compile_row_serializer(cursor.description, dictionary=True, overrides=overrides)
+        self._exhausted = False
+        self._closed = False
+        if has_request_context():
+            g.setdefault('db_streams', []).append(self)
+
+    def __iter__(self):
+        try:
+            while True:
+                batch = self._cursor.fetchmany(self._batch_size)
+                if not batch:
+                    self._exhausted = True
+                    return
+                for row in batch:
+                    yield self._serialize(row)
+        finally:
+            self.close()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if not self._exhausted:
+                # 중간에 멈추면 남은 행을 버려야 커넥션을 다시 쓸 수 있음
+                _physical_connection(self._connection).consume_results()
+            self._cursor.close()
+        except Error as e:
+            print(f"❌ 스트리밍 조회 정리 실패: {e}")
+        finally:
+            self._connection.close()
+
+def iter_query(sql, params=(), read_only=True, batch_size=None, overrides=None):
+    """대용량 조회를 전체 목록으로 만들지 않고 행 단위로 읽기
+
+    쿼리는 바로 실행하므로 연결/쿼리 오류는 호출 시점에 Error로 발생하고,
+    행은 serialize_rows와 같은 형식의 dict로 반환된다 (overrides도 동일).
+    반환된 스트림은 전용 커넥션을 쓰므로 같은 커넥션에서 다른 쿼리를 실행할 수 없다.
+    """
+    connection = get_db_connection(read_only=read_only)
+    if connection is None:
+        raise DatabaseUnavailableError(msg="데이터베이스 연결 오류")
+    try:
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        cursor.execute(sql, params)
+        return RowStream(connection, cursor, batch_size or STREAM_BATCH_SIZE, overrides)
+    except Error as e:
+        _note_query_error(e)
+        connection.close()
+        raise
+
+def stream_json_rows(key, rows, status=200):
+    """{key: [...]} 형태의 JSON 응답을 행 단위로 전송 (jsonify와 같은 인코더 사용)
+
+    응답 시작 후의 오류는 상태 코드를 바꿀 수 없으므로 로그만 남기고 전송을 중단한다.
+    """
+    provider = current_app.json
+
+    def dumps(obj):
+        # jsonify 기본 출력과 같이 공백 없는 구분자 사용
+        return provider.dumps(obj, separators=(',', ':'))
+
+    def generate():
+        yield '{' + dumps(key) + ':['
+        chunk = []
+        try:
+            for index, row in enumerate(rows):
+                chunk.append(dumps(row) if index == 0 else ',' + dumps(row))
+                if len(chunk) >= STREAM_BATCH_SIZE:
+                    yield ''.join(chunk)
+                    chunk = []
+        except Error as e:
+            print(f"❌ 스트리밍 응답 중 DB 오류: {e}")
+            raise
+        finally:
+            close = getattr(rows, 'close', None)
+            if close is not None:
+                close()
+        yield ''.join(chunk) + ']}'
+
+    return Response(stream_with_context(generate()), status=status, mimetype='application/json')
+
+def init_app(app, readiness_checks=None, route_timeouts=None):
+    """서비스 앱에 DB 관련 훅 등록 (요청 기한, 요청 커넥션 반환, 커넥션 고갈 시 503 + Retry-After,
+    기한 초과 시 504, 내부 지표/readiness 엔드포인트)
+
+    readiness_checks: 추가 확인 목록 [(이름, () -> (ok, error), 필수 여부)]
+    route_timeouts: 경로 프리픽스별 기본 기한 {'/api/admin/bookings': 30000} (ms, 없으면 DB_REQUEST_TIMEOUT_MS)
+    """
+    retry_after = os.environ.get('DB_UNAVAILABLE_RETRY_AFTER', '1')
+    checks = [('database', check_database_ready, True)] + list(readiness_checks or [])
+    route_timeouts = dict(route_timeouts or {})
+
+    @app.before_request
+    def set_request_deadline():
+        if request.path.startswith('/internal/'):
+            return
+        budget_ms = _request_budget_ms(request.path, route_timeouts)
+        if budget_ms:
+            g.db_deadline = time_module.monotonic() + budget_ms / 1000
+
+    # readiness probe용: 첫 호출에서 풀/캐시 연결을 미리 만들어 첫 사용자 요청이 비용을 내지 않도록 함
+    @app.route('/internal/ready', methods=['GET'])
+    def readiness():
+        ready = True
+        results = {}
+        for name, check, required in checks:
+            started = time_module.perf_counter()
+            try:
+                ok, error = check()
+            except Exception as e:
+                ok, error = False, str(e)
+            results[name] = {
+                'ok': ok,
+                'error': error,
+                'elapsed_ms': round((time_module.perf_counter() - started) * 1000, 1),
+            }
+            if required and not ok:
+                ready = False
+        body = {'ready': ready, 'checks': results, 'startup_ms': app.config.get('STARTUP_TIME_MS')}
+        return jsonify(body), 200 if ready else 503
+
+    @app.teardown_request
+    def release_request_connection(exc):
+        for stream in g.pop('db_streams', []):
+            stream.close()
+        for key in ('db_connection', 'db_read_connection'):
+            handle = g.pop(key, None)
+            if handle is not None:
+                handle.release()
+
+    # /api 프리픽스 밖이라 Istio 게이트웨이로는 노출되지 않음 (클러스터 내부 조회용)
+    @app.route('/internal/db/stats', methods=['GET'])
+    def db_pool_stats():
+        return jsonify(get_pool_stats()), 200
+
+    @app.route('/internal/db/slow-queries', methods=['GET'])
+    def db_slow_queries():
+        return jsonify(slow_queries.snapshot()), 200
+
+    @app.after_request
+    def convert_db_unavailable(response):
+        if getattr(g, 'db_timeout', False) and response.status_code >= 500:
+            response = jsonify({'message': '요청 처리 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.'})
+            response.status_code = 504
+        elif getattr(g, 'db_unavailable', False) and response.status_code >= 500:
+            response = jsonify({'message': '요청이 많아 잠시 후 다시 시도해주세요.'})
+            response.status_code = 503
+            response.headers['Retry-After'] = retry_after
+        return response
 
 def get_direct_connection():
     """직접 데이터베이스 연결 (풀을 사용할 수 없을 때)"""
@@ -1,94 +1,554 @@
 # CloudJet MSA Redis 캐시 서비스
 # 항공편 검색 결과 캐싱, 세션 관리 등 성능 최적화용
 import redis
-import json
+import math
 import os
-from typing import Optional, List, Dict, Any
+import random
+import uuid
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Tuple
+from shared.cache_serializer import get_serializer, decode_payload
+
+# 프로세스 단위 Redis 커넥션 풀 글로벌 변수
+# (pre-fork 서버에서 부모의 소켓을 공유하지 않도록 PID 기준으로 관리)
+_redis_pool = None
+_redis_client = None
+_redis_pool_pid = None
+_redis_pool_lock = threading.Lock()
+_circuit_breaker = None
+
+# 항공편 검색 캐시 세대(generation) 카운터
+# 값을 1 증가시키면 이전 세대의 모든 검색 키가 한 번에 무효화됨 (KEYS/DEL 불필요)
+FLIGHT_CACHE_GENERATION_KEY = "flights:generation"
+_flight_generation = {"value": None, "fetched_at": 0.0}
+_UNAVAILABLE = object()
+
+# 프로세스 내 L1 캐시 (LOCAL_CACHE_ENABLED=true 일 때만 사용)
+_local_cache = None
+_local_cache_pid = None
+
+# 계층별(L1: 프로세스 메모리, L2: Redis) 히트/미스 카운터
+_cache_stats = {"l2_hits": 0, "l2_misses": 0, "fill_failures": 0}
+_cache_stats_lock = threading.Lock()
+
+# 락 보유자만 삭제하도록 토큰 비교 후 DEL
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# 락 보유자만 만료 시간을 연장
+_EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# 데이터 버전 증가 + 변경 범위 기록 (버전과 변경 로그가 항상 함께 바뀌도록 스크립트로 처리)
+# 변경 로그 항목은 "버전:범위" 형식이며 최근 ARGV[2]개만 유지
+_BUMP_VERSION_SCRIPT = """
+local version = redis.call('INCR', KEYS[1])
+redis.call('RPUSH', KEYS[2], version .. ':' .. ARGV[1])
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[2]), -1)
+return version
+"""
+DATA_VERSION_LOG_SIZE = 200
+
+# 검색 키별 수정 번호 (좌석 반영/무효화 시 증가)
+# 재계산은 DB 조회 전에 읽은 번호가 그대로일 때만 저장해, 조회 도중 반영된 예약을 덮어쓰지 않음
+FLIGHT_REVISION_TTL = 24 * 3600
+_SET_IF_REVISION_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# 노선별 검색 인기도 (일자별 sorted set, member = "ICN:NRT")
+POPULARITY_KEY_PREFIX = "flights:popularity"
+
+# 검색 경로에서 Redis 왕복을 없애기 위해 프로세스 내에서 세고 캐시 워머가 주기적으로 반영
+_popularity_counts = {}
+_popularity_lock = threading.Lock()
+
+def _count_cache_event(name: str):
+    with _cache_stats_lock:
+        _cache_stats[name] += 1
+
+def _reset_redis_pool_after_fork():
+    """fork 직후 자식 프로세스에서 풀 참조 초기화 (부모 소켓은 건드리지 않음)"""
+    global _redis_pool, _redis_client, _redis_pool_pid, _redis_pool_lock, _circuit_breaker
+    _redis_pool = None
+    _redis_client = None
+    _redis_pool_pid = None
+    _redis_pool_lock = threading.Lock()
+    _circuit_breaker = None
+    _reset_local_cache_after_fork()
+    _reset_popularity_after_fork()
+
+def _reset_local_cache_after_fork():
+    global _local_cache, _local_cache_pid
+    _local_cache = None
+    _local_cache_pid = None
+
+def _reset_popularity_after_fork():
+    # 부모가 센 값은 부모가 반영하므로 자식은 비운 상태로 시작
+    global _popularity_counts, _popularity_lock
+    _popularity_counts = {}
+    _popularity_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_redis_pool_after_fork)
+
+def _create_redis_pool() -> Optional[redis.ConnectionPool]:
+    """환경변수 기반 Redis 커넥션 풀 생성"""
+    redis_host = os.environ.get('REDIS_HOST')
+    if not redis_host:
+        print("❌ REDIS_HOST 환경변수가 설정되지 않았습니다. 캐싱 없이 진행됩니다.")
+        return None
+
+    pool_params = {
+        'host': redis_host,
+        'port': int(os.environ.get('REDIS_PORT', 6379)),  # 표준 포트는 기본값 유지
+        'db': int(os.environ.get('REDIS_DB', 0)),         # DB 0은 표준이므로 기본값 유지
+        'password': os.environ.get('REDIS_PASSWORD', None),
+        # 캐시 값은 바이너리(compact 형식)일 수 있으므로 bytes 그대로 사용
+        'decode_responses': False,
+        # 장애 시 워커가 오래 묶이지 않도록 짧은 명령별 타임아웃 사용
+        'socket_timeout': float(os.environ.get('REDIS_SOCKET_TIMEOUT', 0.25)),
+        'socket_connect_timeout': float(os.environ.get('REDIS_CONNECT_TIMEOUT', 0.5)),
+        # 풀 크기/대기 시간/유휴 연결 헬스체크 주기
+        'max_connections': int(os.environ.get('REDIS_POOL_SIZE', 20)),
+        'timeout': float(os.environ.get('REDIS_POOL_TIMEOUT', 0.2)),
+        'health_check_interval': int(os.environ.get('REDIS_HEALTH_CHECK_INTERVAL', 30)),
+    }
+
+    # ElastiCache TLS 연결 설정
+    if os.environ.get('REDIS_SSL', 'false').lower() == 'true':
+        pool_params.update({
+            'connection_class': redis.SSLConnection,
+            'ssl_check_hostname': False,
+            'ssl_cert_reqs': None
+        })
+
+    pool = redis.BlockingConnectionPool(**pool_params)
+    print(f"✅ Redis 커넥션 풀 생성 (PID: {os.getpid()}, Host: {redis_host}, "
+          f"최대 연결: {pool_params['max_connections']})")
+    return pool
+
+def get_redis_pool() -> Optional[redis.ConnectionPool]:
+    """프로세스 공용 Redis 커넥션 풀 조회 (최초 호출 시 지연 생성)"""
+    global _redis_pool, _redis_client, _redis_pool_pid
+
+    pid = os.getpid()
+    if _redis_pool_pid == pid:
+        return _redis_pool
+
+    with _redis_pool_lock:
+        if _redis_pool_pid != pid:
+            try:
+                _redis_pool = _create_redis_pool()
+            except Exception as e:
+                print(f"❌ Redis 커넥션 풀 생성 실패: {e}")
+                _redis_pool = None
+            _redis_client = redis.Redis(connection_pool=_redis_pool) if _redis_pool else None
+            _redis_pool_pid = pid
+    return _redis_pool
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """프로세스 공용 풀을 사용하는 Redis 클라이언트 조회"""
+    get_redis_pool()
+    return _redis_client
+
+class CircuitBreaker:
+    """Redis 호출용 서킷 브레이커 (closed → open → half-open)
+
+    연속 실패가 임계치를 넘으면 open 상태가 되어 네트워크 호출을 건너뛰고,
+    대기 시간이 지나면 half-open 상태에서 한 번의 probe만 허용한다.
+    probe가 실패할 때마다 대기 시간은 지수적으로 늘어난다.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 1.0,
+                 max_reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.reset_timeout = reset_timeout
+        self.opened_at = None
+        self.total_failures = 0
+        self.short_circuited = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Redis 호출 허용 여부 (open 상태면 즉시 False)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.short_circuited += 1
+                    return False
+                self.state = self.HALF_OPEN
+
+            # half-open: 동시에 하나의 probe만 통과
+            if self._probe_in_flight:
+                self.short_circuited += 1
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        """호출 성공 기록 (half-open probe 성공 시 closed 복귀)"""
+        with self._lock:
+            if self.state != self.CLOSED:
+                print("✅ Redis 서킷 브레이커 closed 복귀")
+            self.state = self.CLOSED
+            self.failure_count = 0
+            self.reset_timeout = self.base_reset_timeout
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """호출 실패 기록 (임계치 초과 또는 probe 실패 시 open)"""
+        with self._lock:
+            self.total_failures += 1
+            if self.state == self.HALF_OPEN:
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self._trip()
+                return
+
+            self.failure_count += 1
+            if self.state == self.CLOSED and self.failure_count >= self.failure_threshold:
+                self._trip()
+
+    def _trip(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+        print(f"⚠️  Redis 서킷 브레이커 open: {self.reset_timeout:.1f}초 동안 캐시 호출 생략")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 브레이커 상태 조회"""
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            return {
+                "state": self.state,
+                "failure_count": self.failure_count,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+                "retry_in": round(retry_in, 3) if retry_in is not None else None,
+                "total_failures": self.total_failures,
+                "short_circuited": self.short_circuited
+            }
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """프로세스 공용 Redis 서킷 브레이커 조회"""
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        with _redis_pool_lock:
+            if _circuit_breaker is None:
+                _circuit_breaker = CircuitBreaker(
+                    failure_threshold=int(os.environ.get('REDIS_CB_FAILURE_THRESHOLD', 5)),
+                    reset_timeout=float(os.environ.get('REDIS_CB_RESET_TIMEOUT', 1)),
+                    max_reset_timeout=float(os.environ.get('REDIS_CB_MAX_RESET_TIMEOUT', 30))
+                )
+    return _circuit_breaker
+
+class LocalLRUCache:
+    """프로세스 내 L1 캐시 (LRU 제거 + 짧은 TTL + 바이트 상한)
+
+    Redis에서 가져와 이미 역직렬화한 결과를 그대로 보관하므로,
+    반환된 객체는 호출 측에서 수정하지 않아야 한다.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024, ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value, size: int):
+        """값 저장 (size는 직렬화된 페이로드 크기 기준 추정치)"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self.current_bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self.current_bytes > self.max_bytes):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+def get_local_cache() -> Optional[LocalLRUCache]:
+    """프로세스 공용 L1 캐시 조회 (비활성화 시 None)"""
+    global _local_cache, _local_cache_pid
+    if os.environ.get('LOCAL_CACHE_ENABLED', 'false').lower() != 'true':
+        return None
+
+    pid = os.getpid()
+    if _local_cache is None or _local_cache_pid != pid:
+        _local_cache = LocalLRUCache(
+            max_entries=int(os.environ.get('LOCAL_CACHE_MAX_ENTRIES', 256)),
+            max_bytes=int(os.environ.get('LOCAL_CACHE_MAX_BYTES', 8 * 1024 * 1024)),
+            ttl=float(os.environ.get('LOCAL_CACHE_TTL', 5))
+        )
+        _local_cache_pid = pid
+    return _local_cache
 
 class CacheService:
     def __init__(self):
-        # Redis 연결 설정 (환경변수 필수)
+        # Redis 연결 설정 (환경변수 필수, 실제 연결은 공용 풀에서 지연 생성)
         self.redis_host = os.environ.get('REDIS_HOST')
-        self.redis_port = int(os.environ.get('REDIS_PORT', 6379))  # 표준 포트는 기본값 유지
-        self.redis_db = int(os.environ.get('REDIS_DB', 0))         # DB 0은 표준이므로 기본값 유지
-        self.redis_password = os.environ.get('REDIS_PASSWORD', None)
-        
-        # TLS/SSL 설정 (ElastiCache용)
-        self.redis_ssl = os.environ.get('REDIS_SSL', 'false').lower() == 'true'
+        self.redis_port = int(os.environ.get('REDIS_PORT', 6379))
+        self.redis_db = int(os.environ.get('REDIS_DB', 0))
         
         # 캐시 TTL 설정 (환경변수에서)
         self.default_ttl = int(os.environ.get('CACHE_TTL', 300))
         self.search_cache_ttl = int(os.environ.get('SEARCH_CACHE_TTL', 600))
+        # 결과가 없는 검색(매진/미운항 노선)은 더 짧게 캐싱
+        self.negative_cache_ttl = int(os.environ.get('NEGATIVE_CACHE_TTL', 60))
+        # 노선·월 단위 운임 캘린더
+        self.calendar_cache_ttl = int(os.environ.get('CALENDAR_CACHE_TTL', 600))
         
-        # Redis 연결 필수 환경변수 확인
-        if not self.redis_host:
-            print("❌ REDIS_HOST 환경변수가 설정되지 않았습니다.")
-            self.is_available = False
-            self.redis_client = None
-            return
+        # 캐시 값 직렬화 방식 (CACHE_SERIALIZER=json|compact)
+        self.serializer = get_serializer()
         
-        # Redis 클라이언트 초기화
-        try:
-            # TLS 설정이 활성화된 경우 SSL 파라미터 추가
-            redis_params = {
-                'host': self.redis_host,
-                'port': self.redis_port,
-                'db': self.redis_db,
-                'password': self.redis_password,
-                'decode_responses': True,
-                'socket_timeout': 30,
-                'socket_connect_timeout': 30
-            }
-            
-            # ElastiCache TLS 연결 설정
-            print(f"🔍 SSL 설정 확인: redis_ssl={self.redis_ssl}, env_value='{os.environ.get('REDIS_SSL')}'")
-            if self.redis_ssl:
-                redis_params.update({
-                    'ssl': True,
-                    'ssl_check_hostname': False,
-                    'ssl_cert_reqs': None
-                })
-                print(f"🔒 TLS 모드로 Redis 연결 시도: {self.redis_host}:{self.redis_port}")
-            else:
-                print(f"⚠️  일반 모드로 Redis 연결 시도: {self.redis_host}:{self.redis_port}")
-            
-            self.redis_client = redis.Redis(**redis_params)
-            # 연결 테스트
-            self.redis_client.ping()
-            self.is_available = True
-            print(f"✅ Redis 연결 성공: {self.redis_host}:{self.redis_port} (DB: {self.redis_db})")
+        # 검색 인기도 집계 (캐시 워머가 켜져 있을 때만, 반영 전 노선 수 상한)
+        self.popularity_enabled = os.environ.get('CACHE_WARMER_ENABLED', 'false').lower() == 'true'
+        self.popularity_max_routes = int(os.environ.get('POPULARITY_MAX_ROUTES', 1000))
+    
+    @property
+    def redis_client(self) -> Optional[redis.Redis]:
+        """프로세스 공용 Redis 클라이언트 (fork 이후에는 새 풀 사용)"""
+        return get_redis_client()
+    
+    @property
+    def is_available(self) -> bool:
+        """Redis 설정 및 풀 사용 가능 여부"""
+        return self.redis_client is not None
+    
+    def _execute(self, operation, fallback=None):
+        """서킷 브레이커를 거쳐 Redis 명령 실행
+
+        브레이커가 open이면 네트워크 호출 없이 fallback을 즉시 반환하고,
+        연결/타임아웃 오류도 실패로 기록한 뒤 fallback을 반환한다.
+        """
+        client = self.redis_client
+        if client is None:
+            return fallback
+
+        breaker = get_circuit_breaker()
+        if not breaker.allow_request():
+            return fallback
+
+        try:
+            result = operation(client)
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            breaker.record_failure()
+            print(f"Redis 연결 오류 (브레이커: {breaker.state}): {e}")
+            return fallback
+        except Exception:
+            # 응답은 받았으므로 연결 자체는 정상
+            breaker.record_success()
+            raise
+
+        breaker.record_success()
+        return result
+    
+    def ping(self) -> bool:
+        """Redis 연결 확인 (readiness 체크용)"""
+        if not self.is_available:
+            return False
+        try:
+            return bool(self._execute(lambda client: client.ping(), False))
         except Exception as e:
             print(f"❌ Redis 연결 실패: {e}")
-            print("캐싱 없이 진행됩니다.")
-            self.redis_client = None
-            self.is_available = False
+            return False
+    
+    def _get_flights_generation(self) -> Optional[int]:
+        """현재 검색 캐시 세대 조회 (짧은 시간 동안 프로세스 내에 보관)"""
+        refresh_interval = float(os.environ.get('CACHE_GENERATION_REFRESH', 1))
+        now = time.monotonic()
+        if (_flight_generation["value"] is not None
+                and now - _flight_generation["fetched_at"] < refresh_interval):
+            return _flight_generation["value"]
+
+        value = self._execute(lambda client: client.get(FLIGHT_CACHE_GENERATION_KEY), _UNAVAILABLE)
+        if value is _UNAVAILABLE:
+            return None
+
+        _flight_generation["value"] = int(value or 0)
+        _flight_generation["fetched_at"] = now
+        return _flight_generation["value"]
     
-    def _generate_flight_cache_key(self, departure: str, arrival: str, date: str) -> str:
-        """항공편 검색 캐시 키 생성"""
-        return f"flights:{departure}:{arrival}:{date}"
+    def _generate_flight_cache_key(self, departure: str, arrival: str, date: str,
+                                   generation: int = None) -> Optional[str]:
+        """항공편 검색 캐시 키 생성 (세대 번호 포함, 공항 코드는 대문자로 통일)"""
+        if generation is None:
+            generation = self._get_flights_generation()
+            if generation is None:
+                return None
+        return f"flights:v{generation}:{departure.strip().upper()}:{arrival.strip().upper()}:{date.strip()}"
+    
+    def _generate_calendar_cache_key(self, departure: str, arrival: str, month: str,
+                                     generation: int = None) -> Optional[str]:
+        """운임 캘린더 캐시 키 (노선·월 'YYYY-MM' 단위, 검색 캐시와 같은 세대 번호 사용)"""
+        if generation is None:
+            generation = self._get_flights_generation()
+            if generation is None:
+                return None
+        return f"calendar:v{generation}:{departure.strip().upper()}:{arrival.strip().upper()}:{month}"
+    
+    def _decode_flights_entry(self, cached_data: bytes):
+        """캐시 값 해석 → (flights, delta, expires_at)
+
+        delta는 마지막 재계산에 걸린 시간(초), expires_at은 만료 시각(epoch).
+        저장 형식(JSON/compact)은 자동 판별하며, 메타데이터가 없는 이전 형식도 읽는다.
+        """
+        flights, meta = decode_payload(cached_data)
+        return flights, meta.get("delta", 0.0), meta.get("expires_at")
+    
+    def _read_flights_entry(self, key: str):
+        """L1 프로세스 캐시 → L2 Redis 순서로 캐시 엔트리 조회"""
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            entry = local_cache.get(key)
+            if entry is not None:
+                return entry
+        
+        cached_data = self._execute(lambda client: client.get(key))
+        
+        if cached_data:
+            _count_cache_event("l2_hits")
+            entry = self._decode_flights_entry(cached_data)
+            if local_cache is not None:
+                local_cache.set(key, entry, len(cached_data))
+            print(f"캐시 히트: {key} ({len(entry[0])}개 항공편)")
+            return entry
+        
+        _count_cache_event("l2_misses")
+        return None
     
     def get_flights_cache(self, departure: str, arrival: str, date: str) -> Optional[List[Dict]]:
-        """항공편 검색 결과 캐시 조회"""
+        """항공편 검색 결과 캐시 조회 (L1 프로세스 캐시 → L2 Redis 순서)"""
         if not self.is_available:
             return None
             
         try:
             key = self._generate_flight_cache_key(departure, arrival, date)
-            cached_data = self.redis_client.get(key)
+            if key is None:
+                return None
             
-            if cached_data:
-                flights = json.loads(cached_data)
-                print(f"캐시 히트: {key} ({len(flights)}개 항공편)")
-                return flights
-            
-            return None
+            entry = self._read_flights_entry(key)
+            return entry[0] if entry is not None else None
         except Exception as e:
             print(f"캐시 조회 오류: {e}")
             return None
     
+    def _revision_key(self, key: str) -> str:
+        return f"rev:{key}"
+    
+    def get_flights_revision(self, departure: str, arrival: str, date: str) -> Optional[str]:
+        """검색 키의 현재 수정 번호 (재계산의 DB 조회 전에 읽어 set_flights_cache에 전달, 실패 시 None)"""
+        if not self.is_available:
+            return None
+        try:
+            key = self._generate_flight_cache_key(departure, arrival, date)
+            if key is None:
+                return None
+            revision = self._execute(lambda client: client.get(self._revision_key(key)), _UNAVAILABLE)
+        except Exception as e:
+            print(f"캐시 수정 번호 조회 오류: {e}")
+            return None
+        if revision is _UNAVAILABLE:
+            return None
+        return revision.decode() if isinstance(revision, bytes) else (revision or '0')
+    
+    def _bump_revisions(self, client, keys):
+        """키별 수정 번호 증가 (진행 중인 재계산의 저장을 무효화)"""
+        pipeline = client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.incr(self._revision_key(key))
+            pipeline.expire(self._revision_key(key), FLIGHT_REVISION_TTL)
+        return pipeline.execute()
+    
     def set_flights_cache(self, departure: str, arrival: str, date: str, 
-                         flights: List[Dict], ttl: int = None) -> bool:
-        """항공편 검색 결과 캐시 저장"""
+                         flights: List[Dict], ttl: int = None, delta: float = 0.0,
+                         revision: Optional[str] = None) -> bool:
+        """항공편 검색 결과 캐시 저장 (delta: 재계산 소요 시간, 조기 갱신 판단용)
+
+        revision: 조회 전에 읽은 수정 번호. 그 사이 좌석 반영/무효화로 번호가 바뀌었으면
+        오래된 결과이므로 저장하지 않는다 (None이면 조건 없이 저장).
+        """
         if not self.is_available:
             return False
         
@@ -98,16 +558,445 @@ class CacheService:
             
         try:
             key = self._generate_flight_cache_key(departure, arrival, date)
-            cached_data = json.dumps(flights, ensure_ascii=False)
+            if key is None:
+                return False
+            entry = (flights, delta, time.time() + ttl)
+            cached_data = self.serializer.dumps(flights, {
+                "delta": round(delta, 4),
+                "expires_at": entry[2]
+            })
             
-            result = self.redis_client.setex(key, ttl, cached_data)
+            if revision is None:
+                result = self._execute(lambda client: client.setex(key, ttl, cached_data), False)
+            else:
+                result = self._execute(lambda client: client.eval(
+                    _SET_IF_REVISION_SCRIPT, 2, key, self._revision_key(key), revision, cached_data, ttl), False)
+                if not result:
+                    print(f"캐시 저장 생략: {key} (조회 중 좌석/가격 변경)")
+                    return False
             if result:
+                local_cache = get_local_cache()
+                if local_cache is not None:
+                    local_cache.set(key, entry, len(cached_data))
                 print(f"캐시 저장: {key} ({len(flights)}개 항공편, TTL: {ttl}초)")
             return result
         except Exception as e:
             print(f"캐시 저장 오류: {e}")
             return False
     
+    def get_flights_cache_many(self, queries: List[Tuple[str, str, str]]) -> List[Optional[List[Dict]]]:
+        """여러 노선/날짜 검색 결과를 한 번의 MGET으로 조회
+
+        queries는 (departure, arrival, date) 목록이며, 같은 순서로 결과(미스는 None)를 반환한다.
+        """
+        results = [None] * len(queries)
+        if not self.is_available or not queries:
+            return results
+        
+        try:
+            generation = self._get_flights_generation()
+            if generation is None:
+                return results
+            keys = [self._generate_flight_cache_key(dep, arr, date, generation) for dep, arr, date in queries]
+            
+            # L1에서 먼저 찾고 나머지만 Redis로 조회
+            local_cache = get_local_cache()
+            pending = []
+            for index, key in enumerate(keys):
+                entry = local_cache.get(key) if local_cache is not None else None
+                if entry is not None:
+                    results[index] = entry[0]
+                else:
+                    pending.append(index)
+            
+            if not pending:
+                return results
+            
+            pending_keys = [keys[index] for index in pending]
+            values = self._execute(lambda client: client.mget(pending_keys))
+            if values is None:
+                return results
+            
+            for index, cached_data in zip(pending, values):
+                if not cached_data:
+                    _count_cache_event("l2_misses")
+                    continue
+                _count_cache_event("l2_hits")
+                entry = self._decode_flights_entry(cached_data)
+                if local_cache is not None:
+                    local_cache.set(keys[index], entry, len(cached_data))
+                results[index] = entry[0]
+            
+            print(f"캐시 일괄 조회: {len(queries)}건 중 {sum(r is not None for r in results)}건 히트")
+            return results
+        except Exception as e:
+            print(f"캐시 일괄 조회 오류: {e}")
+            return results
+    
+    def set_flights_cache_many(self, entries: List[Tuple[str, str, str, List[Dict]]],
+                               ttl: int = None) -> int:
+        """여러 검색 결과를 파이프라인 한 번으로 저장, 저장된 건수 반환
+
+        entries는 (departure, arrival, date, flights) 목록이다.
+        """
+        if not self.is_available or not entries:
+            return 0
+        
+        if ttl is None:
+            ttl = self.search_cache_ttl
+        
+        try:
+            generation = self._get_flights_generation()
+            if generation is None:
+                return 0
+            
+            expires_at = time.time() + ttl
+            prepared = []
+            for departure, arrival, date, flights in entries:
+                key = self._generate_flight_cache_key(departure, arrival, date, generation)
+                cached_data = self.serializer.dumps(flights, {"delta": 0.0, "expires_at": expires_at})
+                prepared.append((key, (flights, 0.0, expires_at), cached_data))
+            
+            def write(client):
+                pipeline = client.pipeline(transaction=False)
+                for key, _, cached_data in prepared:
+                    pipeline.setex(key, ttl, cached_data)
+                return pipeline.execute()
+            
+            results = self._execute(write, [])
+            local_cache = get_local_cache()
+            stored = 0
+            for (key, entry, cached_data), result in zip(prepared, results):
+                if result:
+                    stored += 1
+                    if local_cache is not None:
+                        local_cache.set(key, entry, len(cached_data))
+            
+            print(f"캐시 일괄 저장: {stored}/{len(entries)}건 (TTL: {ttl}초)")
+            return stored
+        except Exception as e:
+            print(f"캐시 일괄 저장 오류: {e}")
+            return 0
+    
+    def get_calendar_cache(self, departure: str, arrival: str, months: List[str]) -> Dict[str, List[Dict]]:
+        """노선의 월별 운임 캘린더를 한 번의 MGET으로 조회 (히트한 월만 {월: 날짜별 목록}으로 반환)"""
+        if not self.is_available or not months:
+            return {}
+        
+        try:
+            generation = self._get_flights_generation()
+            if generation is None:
+                return {}
+            keys = [self._generate_calendar_cache_key(departure, arrival, month, generation) for month in months]
+            values = self._execute(lambda client: client.mget(keys))
+            if values is None:
+                return {}
+            return {month: decode_payload(cached_data)[0]
+                    for month, cached_data in zip(months, values) if cached_data}
+        except Exception as e:
+            print(f"캘린더 캐시 조회 오류: {e}")
+            return {}
+    
+    def set_calendar_cache(self, departure: str, arrival: str, month_days: Dict[str, List[Dict]],
+                           ttl: int = None) -> bool:
+        """월별 운임 캘린더 저장 (파이프라인 한 번)"""
+        if not self.is_available or not month_days:
+            return False
+        
+        if ttl is None:
+            ttl = self.calendar_cache_ttl
+        
+        try:
+            generation = self._get_flights_generation()
+            if generation is None:
+                return False
+            meta = {"expires_at": time.time() + ttl}
+            
+            def write(client):
+                pipeline = client.pipeline(transaction=False)
+                for month, days in month_days.items():
+                    key = self._generate_calendar_cache_key(departure, arrival, month, generation)
+                    pipeline.setex(key, ttl, self.serializer.dumps(days, meta))
+                return pipeline.execute()
+            
+            result = self._execute(write, [])
+            print(f"캘린더 캐시 저장: {departure}-{arrival} {sorted(month_days)} (TTL: {ttl}초)")
+            return bool(result)
+        except Exception as e:
+            print(f"캘린더 캐시 저장 오류: {e}")
+            return False
+    
+    def _should_refresh_early(self, delta: float, expires_at: Optional[float]) -> bool:
+        """XFetch 확률적 조기 갱신 여부 (만료가 가까울수록, 재계산이 느릴수록 확률 증가)"""
+        if not expires_at or delta <= 0:
+            return False
+        beta = float(os.environ.get('CACHE_XFETCH_BETA', 1.0))
+        return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
+    
+    def _acquire_lock(self, lock_key: str, ttl_ms: int):
+        """분산 락 획득 (SET NX PX)
+
+        성공 시 토큰, 다른 요청이 보유 중이면 None, Redis 장애 시 _UNAVAILABLE 반환.
+        """
+        token = uuid.uuid4().hex
+        acquired = self._execute(
+            lambda client: client.set(lock_key, token, nx=True, px=ttl_ms), _UNAVAILABLE)
+        if acquired is _UNAVAILABLE:
+            return _UNAVAILABLE
+        return token if acquired else None
+    
+    def acquire_lock(self, name: str, ttl_ms: int) -> Optional[str]:
+        """이름 기반 분산 락 획득 (성공 시 해제용 토큰, 실패 또는 Redis 장애 시 None)"""
+        token = self._acquire_lock(f"lock:{name}", ttl_ms)
+        return None if token is _UNAVAILABLE else token
+    
+    def extend_lock(self, name: str, token: str, ttl_ms: int) -> bool:
+        """보유 중인 락의 만료 시간 연장 (다른 프로세스에 넘어갔으면 False)"""
+        try:
+            return bool(self._execute(
+                lambda client: client.eval(_EXTEND_LOCK_SCRIPT, 1, f"lock:{name}", token, ttl_ms), 0))
+        except Exception as e:
+            print(f"락 연장 오류: {e}")
+            return False
+    
+    def release_lock(self, name: str, token: str):
+        """보유 중인 락 해제 (토큰이 일치할 때만 삭제)"""
+        try:
+            self._execute(lambda client: client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{name}", token))
+        except Exception as e:
+            print(f"락 해제 오류: {e}")
+    
+    def _acquire_rebuild_lock(self, key: str):
+        """키별 재계산 분산 락 획득"""
+        lock_ttl_ms = int(os.environ.get('STAMPEDE_LOCK_TTL_MS', 5000))
+        return self._acquire_lock(f"lock:{key}", lock_ttl_ms)
+    
+    def _release_rebuild_lock(self, key: str, token: str):
+        self.release_lock(key, token)
+    
+    def record_search_popularity(self, departure: str, arrival: str):
+        """노선 검색 횟수를 프로세스 내에서 집계 (Redis 반영은 flush_search_popularity)
+
+        집계를 비우는 것은 캐시 워머 스레드뿐이므로 워머가 꺼져 있으면 세지 않고,
+        반영 전 노선 수는 POPULARITY_MAX_ROUTES로 제한한다 (새 노선은 다음 반영 후부터 집계).
+        """
+        if not self.popularity_enabled:
+            return
+        sample_rate = float(os.environ.get('POPULARITY_SAMPLE_RATE', 1.0))
+        if sample_rate < 1.0 and random.random() >= sample_rate:
+            return
+        
+        member = f"{departure.strip().upper()}:{arrival.strip().upper()}"
+        with _popularity_lock:
+            count = _popularity_counts.get(member)
+            if count is None and len(_popularity_counts) >= self.popularity_max_routes:
+                return
+            _popularity_counts[member] = (count or 0) + 1
+    
+    def flush_search_popularity(self) -> int:
+        """집계한 검색 횟수를 Redis 인기도에 반영 (캐시 워머 스레드에서 주기적으로 호출)
+        
+        Returns: 반영한 노선 수 (실패 시 집계를 되돌려 다음 주기에 다시 시도)
+        """
+        global _popularity_counts
+        with _popularity_lock:
+            counts, _popularity_counts = _popularity_counts, {}
+        if not counts:
+            return 0
+        
+        key = f"{POPULARITY_KEY_PREFIX}:{datetime.now().strftime('%Y%m%d')}"
+        
+        def write(client):
+            pipeline = client.pipeline(transaction=False)
+            for member, count in counts.items():
+                pipeline.zincrby(key, count, member)
+            pipeline.expire(key, 2 * 24 * 3600)
+            return pipeline.execute()
+        
+        try:
+            if self._execute(write) is not None:
+                return len(counts)
+        except Exception as e:
+            print(f"검색 인기도 기록 오류: {e}")
+        with _popularity_lock:
+            for member, count in counts.items():
+                _popularity_counts[member] = _popularity_counts.get(member, 0) + count
+        return 0
+    
+    def bump_data_version(self, name: str, scopes: Optional[List[str]] = None) -> Optional[int]:
+        """프로세스 내 스냅샷(노선 그래프, 참조 데이터 등)의 버전 증가
+
+        scopes는 바뀐 범위(날짜 등) 목록이며, None이면 전체 변경으로 기록한다.
+        Returns: 새 버전 (Redis 장애 시 None)
+        """
+        scope = ','.join(sorted(set(scopes))) if scopes else '*'
+        try:
+            version = self._execute(lambda client: client.eval(
+                _BUMP_VERSION_SCRIPT, 2, f"version:{name}", f"version:{name}:changes",
+                scope, DATA_VERSION_LOG_SIZE))
+            if version is not None:
+                print(f"데이터 버전 증가: {name} v{version} ({scope})")
+            return version
+        except Exception as e:
+            print(f"데이터 버전 증가 오류: {e}")
+            return None
+    
+    def get_data_version(self, name: str) -> Optional[int]:
+        """현재 데이터 버전 (없으면 0, Redis 장애 시 None)"""
+        try:
+            value = self._execute(lambda client: client.get(f"version:{name}"), _UNAVAILABLE)
+        except Exception as e:
+            print(f"데이터 버전 조회 오류: {e}")
+            return None
+        return None if value is _UNAVAILABLE else int(value or 0)
+    
+    def get_data_changes(self, name: str, since: int):
+        """since 이후 버전과 바뀐 범위 조회 → (현재 버전, 범위 집합 또는 전체 변경이면 None)
+
+        변경 로그가 잘려 since 이후 항목이 빠져 있으면 전체 변경으로 본다.
+        Redis 장애 시 None을 반환한다 (호출 측은 기존 스냅샷 유지).
+        """
+        def read(client):
+            pipeline = client.pipeline(transaction=False)
+            pipeline.get(f"version:{name}")
+            pipeline.lrange(f"version:{name}:changes", 0, -1)
+            return pipeline.execute()
+        
+        try:
+            result = self._execute(read)
+        except Exception as e:
+            print(f"데이터 변경 조회 오류: {e}")
+            return None
+        if result is None:
+            return None
+        
+        version = int(result[0] or 0)
+        if version <= since:
+            return version, set()
+        scopes = set()
+        seen = set()
+        for item in result[1]:
+            item_version, _, scope = item.decode().partition(':')
+            if int(item_version) <= since:
+                continue
+            seen.add(int(item_version))
+            if scope == '*':
+                return version, None
+            scopes.update(scope.split(','))
+        if len(seen) != version - since:
+            return version, None
+        return version, scopes
+    
+    def get_popular_routes(self, limit: int = 20) -> List[Tuple[str, str]]:
+        """최근 이틀(오늘+어제) 검색 횟수 기준 상위 노선 목록"""
+        if not self.is_available:
+            return []
+        
+        today = datetime.now()
+        keys = [f"{POPULARITY_KEY_PREFIX}:{(today - timedelta(days=d)).strftime('%Y%m%d')}" for d in (0, 1)]
+        
+        def read(client):
+            pipeline = client.pipeline(transaction=False)
+            for key in keys:
+                pipeline.zrevrange(key, 0, limit - 1, withscores=True)
+            return pipeline.execute()
+        
+        try:
+            scores = {}
+            for ranking in self._execute(read, []):
+                for member, score in ranking:
+                    member = member.decode('utf-8') if isinstance(member, bytes) else member
+                    scores[member] = scores.get(member, 0) + score
+        except Exception as e:
+            print(f"검색 인기도 조회 오류: {e}")
+            return []
+        
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [tuple(member.split(':', 1)) for member, _ in ranked]
+    
+    def _wait_for_rebuild(self, key: str) -> Optional[List[Dict]]:
+        """다른 요청이 재계산 중일 때 잠시 대기하며 결과 확인"""
+        wait_timeout = float(os.environ.get('STAMPEDE_WAIT_TIMEOUT', 1.0))
+        poll_interval = float(os.environ.get('STAMPEDE_POLL_INTERVAL', 0.05))
+        deadline = time.monotonic() + wait_timeout
+        
+        while time.monotonic() < deadline:
+            time.sleep(poll_interval)
+            entry = self._read_flights_entry(key)
+            if entry is not None:
+                return entry[0]
+            # 락이 사라졌는데 값도 없거나, 락 보유자가 저장 실패를 알렸으면 대기 중단
+            state = self._execute(lambda client: client.mget(f"lock:{key}", f"fill-failed:{key}"))
+            if not state or state[1] or not state[0]:
+                return None
+        return None
+    
+    def _mark_fill_failed(self, key: str):
+        """재계산 결과 저장 실패 기록: 대기 중인 요청이 폴링을 멈추고 바로 DB를 조회하게 함"""
+        _count_cache_event("fill_failures")
+        print(f"캐시 채우기 실패: {key} (대기 요청은 직접 조회)")
+        # 현재 대기 중인 요청들만 보면 되므로 대기 시간만큼만 유지
+        ttl_ms = int(float(os.environ.get('STAMPEDE_WAIT_TIMEOUT', 1.0)) * 1000)
+        try:
+            self._execute(lambda client: client.set(f"fill-failed:{key}", 1, px=ttl_ms))
+        except Exception as e:
+            print(f"캐시 채우기 실패 기록 오류: {e}")
+    
+    def get_or_load_flights(self, departure: str, arrival: str, date: str,
+                            loader, ttl: int = None):
+        """캐시 조회 후 미스 시 키별로 한 요청만 재계산 (single-flight)
+
+        loader는 DB 조회 함수로 (flights, error) 튜플을 반환해야 한다.
+        빈 결과도 NEGATIVE_CACHE_TTL 동안 캐싱해 없는 노선 조회가 DB로 가지 않게 한다.
+        만료가 가까운 키는 XFetch 방식으로 확률적으로 미리 갱신하며,
+        갱신 락을 얻지 못한 요청은 기존 값을 그대로 사용한다.
+        """
+        if not self.is_available:
+            return loader()
+        
+        try:
+            key = self._generate_flight_cache_key(departure, arrival, date)
+            entry = self._read_flights_entry(key) if key is not None else None
+        except Exception as e:
+            print(f"캐시 조회 오류: {e}")
+            return loader()
+        
+        if key is None:
+            return loader()
+        
+        if entry is not None:
+            flights, delta, expires_at = entry
+            if not self._should_refresh_early(delta, expires_at):
+                return flights, None
+            # 조기 갱신: 락을 잡은 요청만 재계산, 나머지는 기존 값 사용
+            token = self._acquire_rebuild_lock(key)
+            if token is None or token is _UNAVAILABLE:
+                return flights, None
+            print(f"캐시 조기 갱신: {key}")
+        else:
+            token = self._acquire_rebuild_lock(key)
+            if token is None:
+                flights = self._wait_for_rebuild(key)
+                if flights is not None:
+                    return flights, None
+            elif token is _UNAVAILABLE:
+                token = None
+        
+        try:
+            revision = self.get_flights_revision(departure, arrival, date)
+            started = time.monotonic()
+            flights, error = loader()
+            if not error and flights is not None:
+                cache_ttl = ttl if flights else self.negative_cache_ttl
+                stored = self.set_flights_cache(departure, arrival, date, flights, cache_ttl,
+                                                delta=time.monotonic() - started, revision=revision)
+                if not stored and token is not None:
+                    self._mark_fill_failed(key)
+            return flights, error
+        finally:
+            if token is not None:
+                self._release_rebuild_lock(key, token)
+    
     def invalidate_flights_cache(self, departure: str = None, arrival: str = None, date: str = None):
         """항공편 캐시 무효화"""
         if not self.is_available:
@@ -115,40 +1004,198 @@ class CacheService:
             
         try:
             if departure and arrival and date:
-                # 특정 검색 결과 캐시 삭제
-                key = self._generate_flight_cache_key(departure, arrival, date)
-                self.redis_client.delete(key)
-                print(f"캐시 무효화: {key}")
+                # 특정 검색 결과 캐시와 해당 월 운임 캘린더 삭제
+                generation = self._get_flights_generation()
+                if generation is not None:
+                    key = self._generate_flight_cache_key(departure, arrival, date, generation)
+                    calendar_key = self._generate_calendar_cache_key(departure, arrival, date[:7], generation)
+                    local_cache = get_local_cache()
+                    if local_cache is not None:
+                        local_cache.delete(key)
+                    self._execute(lambda client: client.delete(key, calendar_key))
+                    self._execute(lambda client: self._bump_revisions(client, [key]))
+                    print(f"캐시 무효화: {key}")
             else:
-                # 모든 항공편 캐시 삭제
-                pattern = "flights:*"
-                keys = self.redis_client.keys(pattern)
-                if keys:
-                    self.redis_client.delete(*keys)
-                    print(f"모든 항공편 캐시 무효화: {len(keys)}개 키")
+                # 세대 번호 증가로 모든 항공편 캐시 무효화 (O(1), 이전 세대 키는 TTL로 만료)
+                generation = self._execute(lambda client: client.incr(FLIGHT_CACHE_GENERATION_KEY))
+                local_cache = get_local_cache()
+                if local_cache is not None:
+                    local_cache.clear()
+                if generation is not None:
+                    _flight_generation["value"] = int(generation)
+                    _flight_generation["fetched_at"] = time.monotonic()
+                    print(f"모든 항공편 캐시 무효화: 세대 {generation}")
         except Exception as e:
             print(f"캐시 무효화 오류: {e}")
     
+    def invalidate_flights_cache_many(self, queries: List[Tuple[str, str, str]]) -> int:
+        """여러 노선/날짜 캐시를 한 번의 DEL로 삭제, 삭제된 키 수 반환"""
+        if not self.is_available or not queries:
+            return 0
+        
+        try:
+            generation = self._get_flights_generation()
+            if generation is None:
+                return 0
+            keys = [self._generate_flight_cache_key(dep, arr, date, generation) for dep, arr, date in queries]
+            local_cache = get_local_cache()
+            if local_cache is not None:
+                for key in keys:
+                    local_cache.delete(key)
+            # 해당 노선·월의 운임 캘린더도 함께 삭제
+            calendar_keys = {self._generate_calendar_cache_key(dep, arr, date[:7], generation)
+                             for dep, arr, date in queries}
+            deleted = self._execute(lambda client: client.delete(*keys, *calendar_keys), 0)
+            self._execute(lambda client: self._bump_revisions(client, keys))
+            print(f"캐시 일괄 무효화: {len(keys)}개 키 중 {deleted}개 삭제")
+            return deleted
+        except Exception as e:
+            print(f"캐시 일괄 무효화 오류: {e}")
+            return 0
+    
+    def patch_schedule_seats(self, departure: str, arrival: str, date: str,
+                             schedule_id: int, seats_delta: int) -> str:
+        """캐시된 검색 결과에서 스케줄 하나의 잔여 좌석만 수정 (남은 TTL 유지)
+
+        좌석이 0 이하가 되면 목록에서 제거하고(검색 조건과 동일), 목록에 없는
+        스케줄의 좌석이 늘어나면(매진 해제) 키를 삭제해 다음 검색에서 다시 조회한다.
+        Returns: 'patched' | 'deleted' | 'missing' | 'unavailable'
+        """
+        if not self.is_available:
+            return 'unavailable'
+        
+        key = self._generate_flight_cache_key(departure, arrival, date)
+        if key is None:
+            return 'unavailable'
+        
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            local_cache.delete(key)
+        
+        def patch(client):
+            # 키가 없어도 번호를 올려, 이 예약 전에 DB를 읽은 재계산이 나중에 저장하지 못하게 함
+            self._bump_revisions(client, [key])
+            with client.pipeline() as pipe:
+                # 동시 수정 충돌 시 몇 번 재시도 후 삭제로 대체
+                for _ in range(3):
+                    try:
+                        pipe.watch(key)
+                        cached_data = pipe.get(key)
+                        remaining_ms = pipe.pttl(key)
+                        if not cached_data or remaining_ms is None or remaining_ms <= 0:
+                            pipe.unwatch()
+                            return 'missing'
+                        
+                        flights, meta = decode_payload(cached_data)
+                        target = next((f for f in flights if f.get('schedule_id') == schedule_id), None)
+                        pipe.multi()
+                        if target is None:
+                            pipe.delete(key)
+                            pipe.execute()
+                            return 'deleted'
+                        
+                        target['available_seats'] = (target.get('available_seats') or 0) + seats_delta
+                        if target['available_seats'] <= 0:
+                            flights = [f for f in flights if f is not target]
+                        pipe.set(key, self.serializer.dumps(flights, meta), px=remaining_ms)
+                        pipe.execute()
+                        return 'patched'
+                    except redis.WatchError:
+                        continue
+            client.delete(key)
+            return 'deleted'
+        
+        try:
+            result = self._execute(patch, 'unavailable')
+            print(f"캐시 좌석 갱신: {key} (스케줄 {schedule_id}, {seats_delta:+d}석) → {result}")
+            # 날짜별 잔여 좌석/매진 여부가 바뀌므로 해당 월 운임 캘린더는 삭제
+            calendar_key = self._generate_calendar_cache_key(departure, arrival, date[:7])
+            if calendar_key is not None:
+                self._execute(lambda client: client.delete(calendar_key))
+            return result
+        except Exception as e:
+            print(f"캐시 좌석 갱신 오류: {e}")
+            # 수정에 실패하면 오래된 좌석 정보가 남지 않도록 삭제
+            self.invalidate_flights_cache(departure, arrival, date)
+            return 'deleted'
+    
+    def _count_flight_cache_keys(self, generation: int) -> Dict[str, Any]:
+        """현재 세대 검색 키 개수 집계 (KEYS 대신 SCAN, 최대 개수 제한)"""
+        scan_limit = int(os.environ.get('CACHE_STATS_SCAN_LIMIT', 10000))
+
+        def count(client):
+            counted = 0
+            for _ in client.scan_iter(match=f"flights:v{generation}:*", count=500):
+                counted += 1
+                if counted >= scan_limit:
+                    return {"count": counted, "truncated": True}
+            return {"count": counted, "truncated": False}
+
+        return self._execute(count, {"count": None, "truncated": True})
+    
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """계층별 캐시 히트/미스 통계"""
+        local_cache = get_local_cache()
+        with _cache_stats_lock:
+            l2_stats = {"hits": _cache_stats["l2_hits"], "misses": _cache_stats["l2_misses"],
+                        "fill_failures": _cache_stats["fill_failures"]}
+        return {
+            "l1": local_cache.stats() if local_cache is not None else {"enabled": False},
+            "l2": l2_stats
+        }
+    
     def get_cache_info(self) -> Dict[str, Any]:
         """캐시 상태 정보 조회"""
         if not self.is_available:
             return {"available": False, "message": "Redis 연결 불가"}
-            
+        
+        breaker = get_circuit_breaker()
         try:
-            info = self.redis_client.info()
-            keys_count = len(self.redis_client.keys("flights:*"))
+            info = self._execute(lambda client: client.info())
+            if info is None:
+                return {
+                    "available": False,
+                    "message": "Redis 응답 없음 (서킷 브레이커)",
+                    "circuit_breaker": breaker.snapshot()
+                }
+            generation = self._get_flights_generation()
+            keys_count = self._count_flight_cache_keys(generation) if generation is not None else {}
             
             return {
                 "available": True,
                 "redis_version": info.get("redis_version"),
                 "used_memory_human": info.get("used_memory_human"),
-                "flight_cache_keys": keys_count,
+                "flight_cache_generation": generation,
+                "flight_cache_keys": keys_count.get("count"),
+                "flight_cache_keys_truncated": keys_count.get("truncated"),
                 "connected_clients": info.get("connected_clients"),
                 "default_ttl": self.default_ttl,
-                "search_cache_ttl": self.search_cache_ttl
+                "search_cache_ttl": self.search_cache_ttl,
+                "negative_cache_ttl": self.negative_cache_ttl,
+                "serializer": self.serializer.name,
+                "tiers": self.get_tier_stats(),
+                "circuit_breaker": breaker.snapshot()
             }
         except Exception as e:
-            return {"available": False, "error": str(e)}
+            return {"available": False, "error": str(e), "circuit_breaker": breaker.snapshot()}
+
+_cache_service = None
+_cache_service_pid = None
+
+def get_cache_service() -> CacheService:
+    """프로세스 공용 CacheService 인스턴스 조회 (요청마다 새로 만들지 않음)"""
+    global _cache_service, _cache_service_pid
+    pid = os.getpid()
+    if _cache_service is None or _cache_service_pid != pid:
+        _cache_service = CacheService()
+        _cache_service_pid = pid
+    return _cache_service
+
+def check_cache_ready():
+    """readiness 확인: Redis 풀 생성(워밍업) 후 PING"""
+    if get_cache_service().ping():
+        return True, None
+    return False, 'Redis 연결 실패'
 
-# 글로벌 캐시 서비스 인스턴스 (옵션)
+# 글로벌 캐시 서비스 인스턴스 (옵션, 생성 시 네트워크 연결 없음)
 cache_service = CacheService()
\ No newline at end of file
@@ -0,0 +1,154 @@
+# CloudJet MSA 참조 데이터 스냅샷 (공항, 운항 중인 항공편)
+# 거의 바뀌지 않는 테이블을 프로세스당 한 번 읽어 인덱스 dict로 보관하고,
+# admin-service가 항공편을 바꾸면 Redis 버전(reference_data)이 증가해 다시 읽는다
+import hashlib
+import json
+import os
+import threading
+import time
+from mysql.connector import Error
+from shared.database import get_db_connection, register_statement, run_statement
+from shared.redis_client import get_cache_service
+
+REFERENCE_DATA_VERSION = 'reference_data'
+
+AIRPORTS_STATEMENT = register_statement('reference_airports', """
+    SELECT airport_code, airport_name, city, country FROM airports ORDER BY airport_name
+""")
+
+ACTIVE_FLIGHTS_STATEMENT = register_statement('reference_flights', """
+    SELECT flight_id, airline, departure_airport, arrival_airport, departure_time, arrival_time,
+           duration, aircraft, base_price, total_seats
+    FROM flights
+    WHERE is_active = TRUE
+    ORDER BY flight_id
+""", serialize=True)
+
+def _content_etag(payload):
+    # 내용이 같으면 재로드 후에도 같은 값
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+class ReferenceSnapshot:
+    """한 시점의 참조 데이터 (읽기 전용, 교체 방식으로만 갱신)"""
+
+    def __init__(self, version, airports, flights):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.airports = airports
+        self.airport_codes = frozenset(airport['airport_code'] for airport in airports)
+        self.airports_etag = _content_etag(airports)
+
+        # 노선별 운항 항공편 목록 (노선 목록 응답을 미리 만들어 둠)
+        routes = {}
+        for flight in flights:
+            routes.setdefault((flight['departure_airport'], flight['arrival_airport']), []).append(flight)
+        self.routes = [{
+            'departure_airport': departure,
+            'arrival_airport': arrival,
+            'flights': route_flights,
+        } for (departure, arrival), route_flights in sorted(routes.items())]
+        self.routes_etag = _content_etag(self.routes)
+
+    def has_airport(self, code):
+        return code in self.airport_codes
+
+class ReferenceData:
+    """참조 데이터 스냅샷 관리
+
+    version_check_interval마다 Redis 버전을 확인해 바뀌었으면 다시 읽고,
+    Redis 장애로 버전을 알 수 없을 때는 ttl 주기로만 다시 읽는다.
+    DB 조회에 실패하면 이전 스냅샷을 계속 사용한다.
+    """
+
+    def __init__(self, ttl=300, version_check_interval=1.0, retry_interval=5.0):
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self.retry_interval = retry_interval
+        self._snapshot = None
+        self._version_checked_at = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            ttl=float(os.environ.get('REFERENCE_DATA_TTL', 300)),
+            version_check_interval=float(os.environ.get('REFERENCE_DATA_VERSION_CHECK', 1)),
+            retry_interval=float(os.environ.get('REFERENCE_DATA_RETRY_INTERVAL', 5))
+        )
+
+    def _is_current(self, snapshot):
+        if snapshot is None:
+            return False
+        now = time.monotonic()
+        if now - snapshot.loaded_at >= self.ttl:
+            return False
+        if now - self._version_checked_at < self.version_check_interval:
+            return True
+        self._version_checked_at = now
+        version = get_cache_service().get_data_version(REFERENCE_DATA_VERSION)
+        # Redis 장애 시 기존 스냅샷 유지 (ttl로 만료)
+        return version is None or version == snapshot.version
+
+    def get(self):
+        """현재 스냅샷 (한 번도 읽지 못했으면 None)"""
+        snapshot = self._snapshot
+        if self._is_current(snapshot):
+            return snapshot
+        if snapshot is None and time.monotonic() < self._retry_at:
+            # 최초 로드 실패 후 재시도 대기 중 (요청마다 DB 조회하지 않음)
+            return None
+
+        with self._lock:
+            if self._snapshot is not snapshot:
+                # 다른 스레드가 이미 다시 읽음
+                return self._snapshot
+            loaded = self._load()
+            if loaded is not None:
+                self._snapshot = loaded
+            elif snapshot is not None:
+                # 재시도 폭주 방지: 실패 시 이전 스냅샷의 ttl을 연장
+                snapshot.loaded_at = time.monotonic()
+            else:
+                self._retry_at = time.monotonic() + self.retry_interval
+            return self._snapshot
+
+    def _load(self):
+        # 버전을 먼저 읽어야 조회 도중 증가한 버전을 다음 확인에서 놓치지 않음
+        # 레플리카는 지연으로 새 버전에 이전 데이터를 담을 수 있으므로 primary에서 읽음
+        version = get_cache_service().get_data_version(REFERENCE_DATA_VERSION)
+        connection = None
+        try:
+            connection = get_db_connection()
+            if not connection:
+                return None
+            started = time.perf_counter()
+            airports = run_statement(connection, AIRPORTS_STATEMENT)
+            flights = run_statement(connection, ACTIVE_FLIGHTS_STATEMENT)
+            snapshot = ReferenceSnapshot(version, airports, flights)
+            print(f"[REFERENCE] v{version} 로드: 공항 {len(airports)}개, 항공편 {len(flights)}개 "
+                  f"({(time.perf_counter() - started) * 1000:.1f}ms)")
+            return snapshot
+        except Error as e:
+            print(f"참조 데이터 조회 오류: {e}")
+            return None
+        finally:
+            if connection:
+                connection.close()
+
+_reference_data = None
+_reference_data_lock = threading.Lock()
+
+def get_reference_data():
+    """프로세스 공용 참조 데이터 스냅샷 (조회 실패 시 None)"""
+    global _reference_data
+    if _reference_data is None:
+        with _reference_data_lock:
+            if _reference_data is None:
+                _reference_data = ReferenceData.from_env()
+    return _reference_data.get()
+
+def bump_reference_data():
+    """항공편/공항 변경 후 각 서비스 프로세스의 스냅샷 갱신 요청"""
+    get_cache_service().bump_data_version(REFERENCE_DATA_VERSION)
@@ -0,0 +1,144 @@
+# CloudJet MSA 조회 결과 직렬화 모듈
+# cursor.description의 컬럼 타입으로 변환 함수를 결과마다 한 번만 만들어,
+# 행/필드마다 isinstance 검사를 반복하는 safe_json_serialize 루프를 대체
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from mysql.connector import FieldType
+
+# 타입별 변환이 필요한 컬럼 (그 외 타입은 값을 그대로 사용)
+_DATE_TYPES = frozenset((FieldType.DATE, FieldType.NEWDATE, FieldType.DATETIME, FieldType.TIMESTAMP))
+_TIME_TYPES = frozenset((FieldType.TIME,))
+_DECIMAL_TYPES = frozenset((FieldType.DECIMAL, FieldType.NEWDECIMAL))
+
+def format_timedelta(value: timedelta) -> str:
+    """MySQL TIME(timedelta) → 'HH:MM:SS' (safe_json_serialize와 동일한 형식)"""
+    total_seconds = int(value.total_seconds())
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+def decimal_to_number(value: Decimal):
+    """MySQL DECIMAL(Decimal) → 소수부가 없으면 int, 있으면 float (ROUND 가격 등, JSON/캐시 인코딩용)
+
+    mysql-connector의 cursor.description에는 scale이 없어 값 기준으로 판단한다.
+    """
+    return int(value) if value == value.to_integral_value() else float(value)
+
+def _isoformat(value):
+    return value.isoformat()
+
+def _column_converter(type_code) -> Optional[Callable[[Any], Any]]:
+    if type_code in _DATE_TYPES:
+        return _isoformat
+    if type_code in _TIME_TYPES:
+        return format_timedelta
+    if type_code in _DECIMAL_TYPES:
+        return decimal_to_number
+    return None
+
+def compile_row_serializer(description: Sequence[Sequence[Any]], dictionary: bool = False,
+                           overrides: Optional[Dict[str, Callable[[Any], Any]]] = None):
+    """cursor.description으로 행 변환 함수 생성
+
+    dictionary=False면 튜플 행을 받아 새 dict를 만들고, True면 dict 행을 제자리에서 변환한다.
+    overrides: 컬럼명 → 변환 함수 (타입 기반 기본 변환 대신 사용, None 값에는 호출하지 않음)
+    """
+    overrides = overrides or {}
+    names = tuple(column[0] for column in description)
+    converted = []
+    for index, column in enumerate(description):
+        converter = overrides.get(column[0]) or _column_converter(column[1])
+        if converter is not None:
+            converted.append((index, column[0], converter))
+    converted = tuple(converted)
+
+    if dictionary:
+        def serialize_dict(row: Dict[str, Any]) -> Dict[str, Any]:
+            for _, name, converter in converted:
+                value = row[name]
+                if value is not None:
+                    row[name] = converter(value)
+            return row
+        return serialize_dict
+
+    def serialize_tuple(row: Sequence[Any]) -> Dict[str, Any]:
+        result = dict(zip(names, row))
+        for index, name, converter in converted:
+            value = row[index]
+            if value is not None:
+                result[name] = converter(value)
+        return result
+    return serialize_tuple
+
+def serialize_rows(cursor, rows: List[Any], overrides: Optional[Dict[str, Callable[[Any], Any]]] = None) -> List[Dict[str, Any]]:
+    """cursor로 조회한 행 목록을 JSON 응답용 dict 목록으로 변환 (튜플/dict 행 모두 지원)"""
+    if not rows:
+        return list(rows or [])
+    serialize = compile_row_serializer(cursor.description, isinstance(rows[0], dict), overrides)
+    return [serialize(row) for row in rows]
+
+def _sample_result(count: int):
+    """벤치마크용 검색 결과 형태의 description/행 (mysql-connector가 돌려주는 파이썬 타입)"""
+    columns = [
+        ('schedule_id', FieldType.LONG), ('flight_id', FieldType.VAR_STRING), ('airline', FieldType.VAR_STRING),
+        ('departure_airport', FieldType.STRING), ('arrival_airport', FieldType.STRING),
+        ('departure_time', FieldType.TIME), ('arrival_time', FieldType.TIME), ('duration', FieldType.VAR_STRING),
+        ('aircraft', FieldType.VAR_STRING), ('original_price', FieldType.LONG), ('price', FieldType.NEWDECIMAL),
+        ('available_seats', FieldType.LONG), ('date', FieldType.DATE), ('departure_name', FieldType.VAR_STRING),
+        ('arrival_name', FieldType.VAR_STRING), ('discount_percentage', FieldType.LONG),
+        ('has_discount', FieldType.LONG), ('created_at', FieldType.DATETIME),
+    ]
+    description = [(name, type_code, None, None, None, None, 1, 0, 0) for name, type_code in columns]
+    rows = []
+    for i in range(count):
+        rows.append((
+            1000 + i, f"CJ{100 + i % 50}", 'CloudJet', 'ICN', 'NRT',
+            timedelta(hours=6 + i % 12, minutes=30), timedelta(hours=9 + i % 12, minutes=15), '2시간 45분',
+            'Boeing 737-800', 320000, Decimal(288000), 180 - i % 40, date(2025, 9, 1 + i % 28), '인천국제공항',
+            '나리타국제공항', 10 if i % 3 == 0 else None, 1 if i % 3 == 0 else 0,
+            datetime(2025, 8, 1, 12, 0, i % 60),
+        ))
+    return description, rows
+
+def benchmark(row_count: int = 10000, iterations: int = 5):
+    """기존 safe_json_serialize 필드 루프 대비 컴파일된 직렬화 시간 비교"""
+    from shared.database import safe_json_serialize
+
+    description, rows = _sample_result(row_count)
+    names = [column[0] for column in description]
+
+    def legacy():
+        # 모델 코드의 기존 방식: dictionary=True 커서 결과의 모든 필드에 safe_json_serialize
+        result = [dict(zip(names, row)) for row in rows]
+        for row in result:
+            for key, value in row.items():
+                row[key] = safe_json_serialize(value)
+        return result
+
+    def compiled_dict():
+        result = [dict(zip(names, row)) for row in rows]
+        serialize = compile_row_serializer(description, dictionary=True)
+        return [serialize(row) for row in result]
+
+    def compiled_tuple():
+        serialize = compile_row_serializer(description)
+        return [serialize(row) for row in rows]
+
+    expected = legacy()
+    print(f"\n[{row_count}행, {iterations}회 반복 평균]")
+    print(f"{'방식':<28}{'시간(ms)':>12}{'행당(us)':>12}")
+    for name, func in (('safe_json_serialize 루프', legacy),
+                       ('컴파일 (dict 행)', compiled_dict),
+                       ('컴파일 (튜플 행)', compiled_tuple)):
+        assert func() == expected
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed_ms = (time.perf_counter() - started) / iterations * 1000
+        print(f"{name:<28}{elapsed_ms:>12.1f}{elapsed_ms * 1000 / row_count:>12.2f}")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,65 @@
+# CloudJet MSA 항공편 검색 캐시 정밀 무효화
+# 예약/취소(booking-service), 할인/스케줄 변경(admin-service) 시 해당 노선·날짜 캐시만 갱신
+from shared.redis_client import get_cache_service
+
+# flight-service 연결편 검색용 노선 그래프 버전 (바뀐 날짜만 다시 읽음)
+ROUTE_GRAPH_VERSION = 'route_graph'
+
+SCHEDULE_ROUTE_QUERY = """
+    SELECT f.departure_airport, f.arrival_airport, fs.flight_date
+    FROM flight_schedules fs
+    JOIN flights f ON fs.flight_id = f.flight_id
+    WHERE fs.schedule_id = %s
+"""
+
+def get_schedule_route(connection, schedule_id):
+    """schedule_id → (출발 공항, 도착 공항, 'YYYY-MM-DD'), 없으면 None"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(SCHEDULE_ROUTE_QUERY, (schedule_id,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    if not row:
+        return None
+    departure, arrival, flight_date = row
+    return departure, arrival, str(flight_date)
+
+def update_schedule_seats(route, schedule_id, seats_delta):
+    """좌석 수 변경을 캐시된 검색 결과에 반영 (해당 스케줄 항목만 수정)"""
+    if not route:
+        return
+    departure, arrival, flight_date = route
+    try:
+        get_cache_service().patch_schedule_seats(departure, arrival, str(flight_date), schedule_id, seats_delta)
+    except Exception as e:
+        # 캐시 갱신 실패가 이미 커밋된 예약 처리에 영향을 주지 않도록 함
+        print(f"검색 캐시 좌석 반영 오류: {e}")
+
+def invalidate_schedule(connection, schedule_id):
+    """가격/할인 변경 시 스케줄이 속한 노선·날짜 캐시 삭제 (정렬 순서가 바뀔 수 있어 수정 대신 삭제)"""
+    try:
+        route = get_schedule_route(connection, schedule_id)
+    except Exception as e:
+        print(f"스케줄 노선 조회 오류: {e}")
+        route = None
+
+    if route is None:
+        # 노선을 알 수 없으면 전체 무효화
+        get_cache_service().invalidate_flights_cache()
+        get_cache_service().bump_data_version(ROUTE_GRAPH_VERSION)
+        return
+    get_cache_service().invalidate_flights_cache(*route)
+    get_cache_service().bump_data_version(ROUTE_GRAPH_VERSION, [route[2]])
+
+def invalidate_all():
+    """항공편 자체가 바뀌는 등 영향 범위가 넓을 때 전체 검색 캐시 무효화 (세대 증가, O(1))"""
+    get_cache_service().invalidate_flights_cache()
+    get_cache_service().bump_data_version(ROUTE_GRAPH_VERSION)
+
+def invalidate_route_dates(departure, arrival, dates):
+    """노선의 여러 날짜 캐시 삭제 (스케줄 생성/변경 시)"""
+    get_cache_service().invalidate_flights_cache_many(
+        [(departure, arrival, str(flight_date)) for flight_date in dates])
+    get_cache_service().bump_data_version(ROUTE_GRAPH_VERSION, [str(flight_date) for flight_date in dates])
@@ -0,0 +1,30 @@
+# 공용 테스트 설정: shared 패키지 경로, fakeredis 기반 CacheService
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared import redis_client
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """프로세스 공용 Redis 클라이언트를 fakeredis로 교체 (Lua 스크립트는 lupa 필요)"""
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(redis_client, '_redis_client', client)
+    monkeypatch.setattr(redis_client, '_redis_pool', object())
+    monkeypatch.setattr(redis_client, '_redis_pool_pid', os.getpid())
+    monkeypatch.setattr(redis_client, '_circuit_breaker', None)
+    monkeypatch.setattr(redis_client, '_flight_generation', {"value": None, "fetched_at": 0.0})
+    monkeypatch.setenv('LOCAL_CACHE_ENABLED', 'false')
+    monkeypatch.setenv('STAMPEDE_POLL_INTERVAL', '0.01')
+    return client
+
+
+@pytest.fixture
+def cache_service(fake_redis):
+    return redis_client.CacheService()
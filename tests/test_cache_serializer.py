@@ -0,0 +1,45 @@
+# 검색 결과 캐시 직렬화 (JSON / compact)
+from decimal import Decimal
+
+import pytest
+
+from shared.cache_serializer import (CompactSerializer, JsonSerializer, _sample_flights,
+                                     decode_payload)
+
+SERIALIZERS = [
+    JsonSerializer(),
+    CompactSerializer(compression='none'),
+    CompactSerializer(compression='zlib', compress_min_bytes=0),
+]
+
+
+@pytest.mark.parametrize('serializer', SERIALIZERS, ids=lambda s: f"{s.name}-{getattr(s, 'compression', '')}")
+def test_round_trip_with_decimal_prices(serializer):
+    flights = _sample_flights(20)
+    assert isinstance(flights[0]['price'], Decimal)
+
+    flights_out, meta = decode_payload(serializer.dumps(flights, {'delta': 0.1, 'expires_at': 1.0}))
+
+    assert flights_out == flights
+    assert meta == {'delta': 0.1, 'expires_at': 1.0}
+    assert all(isinstance(flight['price'], int) for flight in flights_out)
+
+
+@pytest.mark.parametrize('serializer', SERIALIZERS[:2], ids=['json', 'compact'])
+def test_fractional_decimal_becomes_float(serializer):
+    flights, _ = decode_payload(serializer.dumps([{'price': Decimal('1234.5')}], {}))
+    assert flights == [{'price': 1234.5}]
+
+
+def test_empty_result_round_trip():
+    for serializer in SERIALIZERS:
+        assert decode_payload(serializer.dumps([], {'delta': 0.0})) == ([], {'delta': 0.0})
+
+
+def test_unsupported_type_still_raises():
+    with pytest.raises(TypeError):
+        JsonSerializer().dumps([{'value': object()}], {})
+
+
+def test_reads_legacy_list_payload():
+    assert decode_payload(b'[{"schedule_id": 1}]') == ([{'schedule_id': 1}], {})
@@ -0,0 +1,53 @@
+# Redis 서킷 브레이커 상태 전이
+import time
+
+from shared.redis_client import CircuitBreaker
+
+
+def _open_breaker(reset_timeout=0.02):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=reset_timeout, max_reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_threshold_and_short_circuits():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.snapshot()['short_circuited'] == 1
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_single_probe():
+    breaker = _open_breaker()
+    time.sleep(0.03)
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_backs_off_up_to_max():
+    breaker = _open_breaker()
+    for expected in (0.04, 0.05):
+        time.sleep(breaker.reset_timeout + 0.01)
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.reset_timeout == expected
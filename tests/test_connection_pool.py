@@ -0,0 +1,108 @@
+# BoundedConnectionPool 대기/overflow 및 풀 지표
+import pytest
+from mysql.connector.errors import PoolError
+
+from shared import database
+
+
+class FakeConnection:
+    in_transaction = False
+
+    def __init__(self, pool=None):
+        self.pool = pool
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+        if self.pool is not None:
+            self.pool.idle.append(self)
+
+
+class FakeMySQLPool:
+    """pool_size개까지만 빌려주고 비면 PoolError (mysql-connector 풀과 같은 동작)"""
+
+    def __init__(self, pool_size, **config):
+        self.idle = [FakeConnection(self) for _ in range(pool_size)]
+
+    def get_connection(self):
+        if not self.idle:
+            raise PoolError('Failed getting connection; pool exhausted')
+        return self.idle.pop()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    direct = []
+
+    def connect(**config):
+        connection = FakeConnection()
+        direct.append(connection)
+        return connection
+
+    monkeypatch.setattr(database.pooling, 'MySQLConnectionPool', FakeMySQLPool)
+    monkeypatch.setattr(database.mysql.connector, 'connect', connect)
+    config = database._build_pool_config('test_pool', 'localhost', 2)
+    pool = database.BoundedConnectionPool(config, max_overflow=1, timeout=0.05,
+                                          metrics=database.PoolMetrics())
+    pool.direct = direct
+    return pool
+
+
+def test_overflow_connection_is_closed_on_return(pool):
+    leases = [pool.get_connection() for _ in range(3)]
+
+    assert len(pool.direct) == 1
+    assert pool.metrics.snapshot()['counters']['overflow_checkouts'] == 1
+    assert pool.metrics.snapshot()['in_use'] == 3
+
+    for lease in leases:
+        lease.close()
+    assert pool.direct[0].closed
+    assert pool.metrics.snapshot()['in_use'] == 0
+
+
+def test_exhausted_pool_raises_after_wait(pool):
+    leases = [pool.get_connection() for _ in range(3)]
+
+    with pytest.raises(database.PoolExhaustedError):
+        pool.get_connection()
+    assert pool.metrics.snapshot()['counters']['exhausted'] == 1
+
+    # 반납하면 슬롯이 돌아와 다시 빌릴 수 있음
+    leases[0].close()
+    pool.get_connection().close()
+
+
+def test_double_close_releases_slot_once(pool):
+    lease = pool.get_connection()
+    lease.close()
+    lease.close()
+
+    leases = [pool.get_connection() for _ in range(3)]
+    with pytest.raises(database.PoolExhaustedError):
+        pool.get_connection()
+    for lease in leases:
+        lease.close()
+
+
+def test_metrics_snapshot_histograms(pool):
+    pool.get_connection().close()
+    snapshot = pool.metrics.snapshot()
+
+    assert snapshot['counters']['checkouts'] == 1
+    for name in ('checkout_wait_ms', 'hold_ms'):
+        histogram = snapshot['histograms'][name]
+        assert histogram['count'] == 1
+        assert histogram['p50'] == database.PoolMetrics.BUCKETS_MS[0]
+        assert sum(histogram['buckets'].values()) == 1
+
+
+def test_percentile_uses_bucket_upper_bound():
+    metrics = database.PoolMetrics()
+    for value_ms in (3, 3, 3, 40):
+        metrics.observe('hold_ms', value_ms)
+    histogram = metrics.snapshot()['histograms']['hold_ms']
+
+    assert histogram['p50'] == 5
+    assert histogram['p99'] == 50
+    assert histogram['max'] == 40
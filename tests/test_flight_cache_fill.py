@@ -0,0 +1,91 @@
+# get_or_load_flights 캐시 채우기/대기 경로
+import threading
+import time
+
+from shared import redis_client
+
+FLIGHTS = [{'schedule_id': 1, 'flight_id': 'CJ101', 'price': 288000, 'available_seats': 10}]
+SEARCH = ('ICN', 'NRT', '2025-09-01')
+
+
+def _loader(calls, result=FLIGHTS):
+    def load():
+        calls.append(1)
+        return [dict(flight) for flight in result], None
+    return load
+
+
+def test_miss_fills_cache_once(cache_service):
+    calls = []
+    flights, error = cache_service.get_or_load_flights(*SEARCH, _loader(calls), 300)
+    assert error is None and flights == FLIGHTS
+
+    flights, error = cache_service.get_or_load_flights(*SEARCH, _loader(calls), 300)
+    assert flights == FLIGHTS
+    assert len(calls) == 1
+
+
+def test_empty_result_uses_negative_ttl(cache_service, fake_redis):
+    cache_service.get_or_load_flights(*SEARCH, _loader([], []), 300)
+    key = cache_service._generate_flight_cache_key(*SEARCH)
+    assert 0 < fake_redis.ttl(key) <= cache_service.negative_cache_ttl
+
+
+def test_waiter_receives_value_filled_by_lock_holder(cache_service, fake_redis, monkeypatch):
+    monkeypatch.setenv('STAMPEDE_WAIT_TIMEOUT', '2')
+    key = cache_service._generate_flight_cache_key(*SEARCH)
+    token = cache_service._acquire_rebuild_lock(key)
+
+    def holder():
+        time.sleep(0.05)
+        cache_service.set_flights_cache(*SEARCH, FLIGHTS, 300)
+        cache_service._release_rebuild_lock(key, token)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    calls = []
+    flights, _ = cache_service.get_or_load_flights(*SEARCH, _loader(calls), 300)
+    thread.join()
+
+    assert flights == FLIGHTS
+    assert calls == []
+
+
+def test_fill_failure_is_counted_and_marked(cache_service, fake_redis, monkeypatch):
+    def broken_dumps(flights, meta):
+        raise TypeError('not serializable')
+    monkeypatch.setattr(cache_service.serializer, 'dumps', broken_dumps)
+    before = cache_service.get_tier_stats()['l2']['fill_failures']
+
+    flights, error = cache_service.get_or_load_flights(*SEARCH, _loader([]), 300)
+
+    key = cache_service._generate_flight_cache_key(*SEARCH)
+    assert flights == FLIGHTS and error is None
+    assert cache_service.get_tier_stats()['l2']['fill_failures'] == before + 1
+    assert fake_redis.exists(f"fill-failed:{key}")
+    assert not fake_redis.exists(f"lock:{key}")
+
+
+def test_waiter_stops_polling_when_fill_failed(cache_service, fake_redis, monkeypatch):
+    monkeypatch.setenv('STAMPEDE_WAIT_TIMEOUT', '5')
+    key = cache_service._generate_flight_cache_key(*SEARCH)
+    # 다른 요청이 락을 잡은 채 저장에 실패한 상태
+    cache_service._acquire_rebuild_lock(key)
+    fake_redis.set(f"fill-failed:{key}", 1)
+
+    started = time.monotonic()
+    calls = []
+    flights, _ = cache_service.get_or_load_flights(*SEARCH, _loader(calls), 300)
+
+    assert flights == FLIGHTS
+    assert calls == [1]
+    assert time.monotonic() - started < 1
+
+
+def test_redis_unavailable_falls_back_to_loader(monkeypatch):
+    monkeypatch.setattr(redis_client, '_redis_client', None)
+    monkeypatch.setattr(redis_client, '_redis_pool', None)
+    monkeypatch.setattr(redis_client, '_redis_pool_pid', redis_client.os.getpid())
+    calls = []
+    flights, error = redis_client.CacheService().get_or_load_flights(*SEARCH, _loader(calls), 300)
+    assert flights == FLIGHTS and calls == [1]
@@ -0,0 +1,95 @@
+# 요청 기한 → 504, 커넥션 고갈 → 503 응답 변환 (init_app 훅)
+import time
+
+import pytest
+from flask import Flask, jsonify
+from mysql.connector import Error
+
+from shared import database
+
+
+class TimeoutCursor:
+    def execute(self, operation, params=None):
+        raise Error(msg='Query execution was interrupted, maximum statement execution time exceeded', errno=3024)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    in_transaction = False
+
+    def cursor(self, *args, **kwargs):
+        return TimeoutCursor()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def app(monkeypatch):
+    checkouts = []
+
+    def checkout(read_only):
+        checkouts.append(read_only)
+        return database.LeasedConnection(FakeConnection(), lambda: None)
+
+    monkeypatch.setattr(database, '_checkout_connection', checkout)
+    monkeypatch.setattr(database, '_apply_session_limits', lambda connection: None)
+
+    app = Flask(__name__)
+    app.checkouts = checkouts
+    database.init_app(app, route_timeouts={'/api/admin/bookings': 30000})
+
+    @app.route('/api/query')
+    def query():
+        # 모델 코드와 같은 방식: 오류를 잡아 500으로 응답
+        connection = database.get_db_connection()
+        if not connection:
+            return jsonify({'message': '데이터베이스 연결 오류'}), 500
+        try:
+            connection.cursor().execute("SELECT SLEEP(10)")
+        except Error as e:
+            return jsonify({'message': str(e)}), 500
+        finally:
+            connection.close()
+        return jsonify({}), 200
+
+    @app.route('/api/slow')
+    def slow():
+        time.sleep(0.06)
+        return query()
+
+    return app
+
+
+def test_plain_cursor_timeout_becomes_504(app):
+    response = app.test_client().get('/api/query')
+    assert response.status_code == 504
+
+
+def test_expired_deadline_skips_checkout(app):
+    response = app.test_client().get('/api/slow', headers={database.DEADLINE_HEADER: '150'})
+    assert response.status_code == 504
+    assert app.checkouts == []
+
+
+def test_pool_exhaustion_becomes_503(app, monkeypatch):
+    def exhausted(read_only):
+        database._mark_db_unavailable()
+        return None
+    monkeypatch.setattr(database, '_checkout_connection', exhausted)
+
+    response = app.test_client().get('/api/query')
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+
+
+def test_budget_uses_longest_prefix_and_shorter_header(app):
+    timeouts = {'/api/admin': 20000, '/api/admin/bookings': 30000}
+    with app.test_request_context('/api/admin/bookings/1'):
+        assert database._request_budget_ms('/api/admin/bookings/1', timeouts) == 30000
+    with app.test_request_context('/api/admin/bookings', headers={database.DEADLINE_HEADER: '5000'}):
+        assert database._request_budget_ms('/api/admin/bookings', timeouts) == 5000 - database.DEADLINE_MARGIN_MS
+    with app.test_request_context('/api/flights', headers={database.DEADLINE_HEADER: 'abc'}):
+        assert database._request_budget_ms('/api/flights', timeouts) == database.DEFAULT_REQUEST_TIMEOUT_MS
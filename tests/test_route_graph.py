@@ -0,0 +1,74 @@
+# 연결편 노선 그래프 탐색
+import os
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'flight-service'))
+
+import route_graph
+from route_graph import DaySnapshot, RouteGraph
+
+DAY = date(2025, 9, 1)
+
+
+def _row(schedule_id, departure, arrival, dep_hm, arr_hm, price, seats=10):
+    return (schedule_id, f"CJ{schedule_id}", 'CloudJet', departure, arrival,
+            timedelta(hours=dep_hm[0], minutes=dep_hm[1]), timedelta(hours=arr_hm[0], minutes=arr_hm[1]),
+            Decimal(price), seats)
+
+
+ROWS = [
+    _row(1, 'ICN', 'CJU', (8, 0), (9, 10), 80000),
+    _row(2, 'CJU', 'NRT', (11, 0), (13, 30), 120000),
+    _row(3, 'ICN', 'NRT', (9, 0), (11, 30), 250000),
+    # 환승 시간 부족 (도착 9:10 → 9:40 출발, 최소 60분)
+    _row(4, 'CJU', 'NRT', (9, 40), (12, 0), 90000),
+]
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    graph = RouteGraph(min_connection=60, max_connection=720)
+    snapshots = {DAY: DaySnapshot(DAY, ROWS), DAY + timedelta(days=1): DaySnapshot(DAY + timedelta(days=1), [])}
+    monkeypatch.setattr(graph, '_refresh_version', lambda: None)
+    monkeypatch.setattr(graph, '_snapshot', lambda flight_date: (snapshots[flight_date], None))
+    return graph
+
+
+def test_finds_direct_and_one_stop_sorted_by_price(graph):
+    itineraries, error = graph.search('ICN', 'NRT', DAY.isoformat(), max_stops=1)
+
+    assert error is None
+    assert [[leg['schedule_id'] for leg in item['legs']] for item in itineraries] == [[1, 2], [3]]
+    assert itineraries[0]['layovers'] == [{'airport': 'CJU', 'minutes': 110}]
+
+
+def test_max_stops_zero_only_direct(graph):
+    itineraries, _ = graph.search('ICN', 'NRT', DAY.isoformat(), max_stops=0)
+    assert [item['legs'][0]['schedule_id'] for item in itineraries] == [3]
+
+
+def test_unreachable_destination(graph):
+    assert graph.search('NRT', 'ICN', DAY.isoformat()) == ([], None)
+
+
+def test_day_graph_loads_from_primary(monkeypatch):
+    requested = []
+
+    class Connection:
+        def close(self):
+            pass
+
+    def get_db_connection(read_only=False):
+        requested.append(read_only)
+        return Connection()
+
+    monkeypatch.setattr(route_graph, 'get_db_connection', get_db_connection)
+    monkeypatch.setattr(route_graph, 'run_statement', lambda connection, name, params: ROWS)
+
+    snapshot, error = RouteGraph()._snapshot(DAY)
+    assert error is None and len(snapshot.outgoing['ICN']) == 2
+    assert requested == [False]
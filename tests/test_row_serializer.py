@@ -0,0 +1,55 @@
+# 컬럼 타입 기반 행 직렬화 → 검색 캐시 왕복
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from mysql.connector import FieldType
+
+from shared.row_serializer import _sample_result, compile_row_serializer, serialize_rows
+
+SEARCH = ('ICN', 'NRT', '2025-09-01')
+
+
+def _description(*columns):
+    return [(name, type_code, None, None, None, None, 1, 0, 0) for name, type_code in columns]
+
+
+def test_converts_dates_times_and_decimals():
+    serialize = compile_row_serializer(_description(
+        ('departure_time', FieldType.TIME), ('price', FieldType.NEWDECIMAL),
+        ('rate', FieldType.DECIMAL), ('seats', FieldType.LONG)))
+
+    row = serialize((timedelta(hours=6, minutes=30), Decimal('288000'), Decimal('12.5'), 3))
+
+    assert row == {'departure_time': '06:30:00', 'price': 288000, 'rate': 12.5, 'seats': 3}
+    assert type(row['price']) is int
+
+
+def test_dictionary_rows_and_none_values():
+    description = _description(('price', FieldType.NEWDECIMAL), ('date', FieldType.DATE))
+
+    class Cursor:
+        pass
+    cursor = Cursor()
+    cursor.description = description
+
+    rows = serialize_rows(cursor, [{'price': None, 'date': None}])
+    assert rows == [{'price': None, 'date': None}]
+
+
+def test_overrides_replace_type_converter():
+    serialize = compile_row_serializer(_description(('price', FieldType.NEWDECIMAL)),
+                                       overrides={'price': str})
+    assert serialize((Decimal('1.50'),)) == {'price': '1.50'}
+
+
+def test_search_rows_round_trip_through_cache(cache_service):
+    # 검색 쿼리와 같은 컬럼 타입 (ROUND 가격은 Decimal)
+    description, rows = _sample_result(10)
+    serialize = compile_row_serializer(description)
+    flights = [serialize(row) for row in rows]
+    # 별도 변환 없이 JSON으로 인코딩 가능해야 함
+    json.dumps(flights)
+
+    assert cache_service.set_flights_cache(*SEARCH, flights, 300)
+    assert cache_service.get_flights_cache(*SEARCH) == flights
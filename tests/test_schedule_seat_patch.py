@@ -0,0 +1,72 @@
+# 예약/취소 시 검색 캐시 좌석 반영 (patch_schedule_seats, 수정 번호)
+import pytest
+
+SEARCH = ('ICN', 'NRT', '2025-09-01')
+
+
+def _flights():
+    return [
+        {'schedule_id': 1, 'price': 100000, 'available_seats': 2},
+        {'schedule_id': 2, 'price': 150000, 'available_seats': 1},
+    ]
+
+
+@pytest.fixture
+def cached(cache_service):
+    assert cache_service.set_flights_cache(*SEARCH, _flights(), 300)
+    return cache_service
+
+
+def test_patch_updates_only_target_and_keeps_ttl(cached, fake_redis):
+    key = cached._generate_flight_cache_key(*SEARCH)
+    fake_redis.pexpire(key, 100000)
+
+    assert cached.patch_schedule_seats(*SEARCH, 1, -1) == 'patched'
+
+    flights = cached.get_flights_cache(*SEARCH)
+    assert [f['available_seats'] for f in flights] == [1, 1]
+    assert 0 < fake_redis.pttl(key) <= 100000
+
+
+def test_sold_out_schedule_is_removed(cached):
+    assert cached.patch_schedule_seats(*SEARCH, 2, -1) == 'patched'
+    assert [f['schedule_id'] for f in cached.get_flights_cache(*SEARCH)] == [1]
+
+
+def test_unknown_schedule_deletes_key(cached):
+    # 매진으로 목록에서 빠졌던 스케줄이 취소로 다시 열리면 다음 검색에서 새로 조회
+    assert cached.patch_schedule_seats(*SEARCH, 3, +1) == 'deleted'
+    assert cached.get_flights_cache(*SEARCH) is None
+
+
+def test_missing_key(cache_service):
+    assert cache_service.patch_schedule_seats(*SEARCH, 1, -1) == 'missing'
+
+
+def test_patch_deletes_month_calendar(cached, fake_redis):
+    assert cached.set_calendar_cache('ICN', 'NRT', {'2025-09': [{'date': '2025-09-01'}]}, 300)
+    cached.patch_schedule_seats(*SEARCH, 1, -1)
+    assert cached.get_calendar_cache('ICN', 'NRT', ['2025-09']) == {}
+
+
+def test_rebuild_started_before_patch_is_not_stored(cache_service):
+    # 재계산이 DB를 읽은 뒤, 저장 전에 예약이 반영된 경우
+    revision = cache_service.get_flights_revision(*SEARCH)
+    assert cache_service.patch_schedule_seats(*SEARCH, 1, -1) == 'missing'
+
+    assert not cache_service.set_flights_cache(*SEARCH, _flights(), 300, revision=revision)
+    assert cache_service.get_flights_cache(*SEARCH) is None
+
+    revision = cache_service.get_flights_revision(*SEARCH)
+    assert cache_service.set_flights_cache(*SEARCH, _flights(), 300, revision=revision)
+
+
+def test_invalidation_also_bumps_revision(cache_service):
+    revision = cache_service.get_flights_revision(*SEARCH)
+    cache_service.invalidate_flights_cache(*SEARCH)
+    assert cache_service.get_flights_revision(*SEARCH) != revision
+
+
+def test_generation_bump_hides_previous_entries(cached):
+    cached.invalidate_flights_cache()
+    assert cached.get_flights_cache(*SEARCH) is None
@@ -0,0 +1,42 @@
+# 검색 인기도 프로세스 내 집계와 Redis 반영
+import pytest
+
+from shared import redis_client
+
+
+@pytest.fixture(autouse=True)
+def empty_counts(monkeypatch):
+    monkeypatch.setattr(redis_client, '_popularity_counts', {})
+
+
+def test_not_counted_when_warmer_disabled(cache_service):
+    cache_service.popularity_enabled = False
+    cache_service.record_search_popularity('ICN', 'NRT')
+    assert redis_client._popularity_counts == {}
+
+
+def test_route_cap_limits_new_routes(cache_service):
+    cache_service.popularity_enabled = True
+    cache_service.popularity_max_routes = 2
+    for departure, arrival in [('ICN', 'NRT'), ('ICN', 'KIX'), ('GMP', 'CJU'), ('ICN', 'NRT')]:
+        cache_service.record_search_popularity(departure, arrival)
+    assert redis_client._popularity_counts == {'ICN:NRT': 2, 'ICN:KIX': 1}
+
+
+def test_flush_writes_counts_and_clears(cache_service):
+    cache_service.popularity_enabled = True
+    for _ in range(3):
+        cache_service.record_search_popularity('icn', 'nrt')
+    cache_service.record_search_popularity('GMP', 'CJU')
+
+    assert cache_service.flush_search_popularity() == 2
+    assert redis_client._popularity_counts == {}
+    assert cache_service.get_popular_routes(2) == [('ICN', 'NRT'), ('GMP', 'CJU')]
+
+
+def test_flush_keeps_counts_when_redis_unavailable(cache_service, monkeypatch):
+    cache_service.popularity_enabled = True
+    cache_service.record_search_popularity('ICN', 'NRT')
+    monkeypatch.setattr(redis_client, '_redis_client', None)
+    assert cache_service.flush_search_popularity() == 0
+    assert redis_client._popularity_counts == {'ICN:NRT': 1}
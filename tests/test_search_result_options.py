@@ -0,0 +1,85 @@
+# 검색 결과 필터/정렬/keyset 페이지 (flight-service routes)
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'flight-service'))
+
+from routes import apply_result_options, parse_result_options
+
+
+def _flights():
+    flights = []
+    for i in range(25):
+        flights.append({
+            'schedule_id': 100 + i,
+            'airline': 'CloudJet' if i % 2 else 'JetAir',
+            'aircraft': 'A321',
+            # 같은 가격/출발 시각이 섞이도록 (동률은 schedule_id로 순서 고정)
+            'price': 100000 + (i % 5) * 10000,
+            'departure_time': f"{6 + i % 4:02d}:00:00",
+            'arrival_time': f"{8 + i % 3:02d}:30:00",
+            'has_discount': i % 3 == 0,
+        })
+    return flights
+
+
+def _pages(flights, **args):
+    seen = []
+    cursor = None
+    while True:
+        query = dict(args, **({'cursor': cursor} if cursor else {}))
+        options, error = parse_result_options(query)
+        assert error is None
+        page, total, cursor = apply_result_options(flights, options)
+        seen.extend(flight['schedule_id'] for flight in page)
+        if cursor is None:
+            return seen, total
+
+
+def test_no_options_returns_none():
+    assert parse_result_options({}) == (None, None)
+
+
+@pytest.mark.parametrize('sort', ['price', 'departure', 'duration'])
+def test_keyset_pages_cover_all_results_once(sort):
+    flights = _flights()
+    original = copy.deepcopy(flights)
+
+    seen, total = _pages(flights, sort=sort, limit='4')
+
+    assert total == 25
+    assert sorted(seen) == sorted(flight['schedule_id'] for flight in flights)
+    assert len(seen) == len(set(seen))
+    # 캐시 목록은 공유되므로 수정하면 안 됨
+    assert flights == original
+
+
+def test_filters_apply_before_paging():
+    seen, total = _pages(_flights(), airline='CloudJet', max_price='120000', departure_after='07:00',
+                         discount_only='true', limit='2')
+    expected = [f['schedule_id'] for f in _flights()
+                if f['airline'] == 'CloudJet' and f['price'] <= 120000
+                and f['departure_time'] >= '07:00' and f['has_discount']]
+    assert total == len(expected)
+    assert sorted(seen) == sorted(expected)
+
+
+@pytest.mark.parametrize('args, message', [
+    ({'sort': 'seats'}, '정렬 기준'),
+    ({'limit': '0'}, 'limit'),
+    ({'departure_after': '7pm'}, 'HH:MM'),
+    ({'cursor': 'not-a-cursor'}, 'cursor'),
+])
+def test_invalid_options(args, message):
+    options, error = parse_result_options(args)
+    assert options is None and message in error
+
+
+def test_cursor_from_other_sort_is_rejected():
+    options, _ = parse_result_options({'sort': 'price', 'limit': '1'})
+    _, _, cursor = apply_result_options(_flights(), options)
+    options, error = parse_result_options({'sort': 'departure', 'cursor': cursor})
+    assert options is None and error
@@ -0,0 +1,134 @@
+# db_session / transaction 중첩 (요청 안: flask.g, 요청 밖: 스레드별)
+import threading
+
+import pytest
+from flask import Flask
+
+from shared import database
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.log.append('cursor closed')
+
+    def execute(self, statement, params=None):
+        self.log.append(statement)
+
+
+class FakeConnection:
+    def __init__(self, log):
+        self.log = log
+        self.in_transaction = False
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self.log)
+
+    def start_transaction(self):
+        self.log.append('BEGIN')
+        self.in_transaction = True
+
+    def commit(self):
+        self.log.append('COMMIT')
+        self.in_transaction = False
+
+    def rollback(self):
+        self.log.append('ROLLBACK')
+        self.in_transaction = False
+
+    def close(self):
+        self.log.append('returned')
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    checked_out = []
+
+    def get_db_connection(read_only=False):
+        log = []
+        checked_out.append(log)
+        return FakeConnection(log)
+
+    monkeypatch.setattr(database, 'get_db_connection', get_db_connection)
+    return checked_out
+
+
+def _statements(log):
+    return [entry for entry in log if entry != 'cursor closed']
+
+
+def test_nested_transaction_uses_savepoint(connections):
+    with database.transaction() as outer:
+        with database.transaction() as inner:
+            assert inner is outer
+
+    assert len(connections) == 1
+    assert _statements(connections[0]) == ['BEGIN', 'SAVEPOINT cjet_sp_1', 'RELEASE SAVEPOINT cjet_sp_1',
+                                           'COMMIT', 'returned']
+    assert connections[0].count('cursor closed') == 2
+
+
+def test_inner_failure_rolls_back_to_savepoint_only(connections):
+    with database.transaction():
+        with pytest.raises(ValueError):
+            with database.transaction():
+                raise ValueError()
+
+    assert _statements(connections[0]) == ['BEGIN', 'SAVEPOINT cjet_sp_1', 'ROLLBACK TO SAVEPOINT cjet_sp_1',
+                                           'COMMIT', 'returned']
+
+
+def test_outer_failure_rolls_back(connections):
+    with pytest.raises(ValueError):
+        with database.transaction():
+            raise ValueError()
+    assert _statements(connections[0]) == ['BEGIN', 'ROLLBACK', 'returned']
+
+
+def test_threads_get_separate_connections(connections):
+    def work():
+        with database.transaction():
+            with database.transaction():
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(connections) == 2
+    assert all('SAVEPOINT cjet_sp_1' in log for log in connections)
+
+
+def test_request_scope_returns_connection_on_teardown(connections):
+    app = Flask(__name__)
+    database.init_app(app)
+    seen = {}
+
+    @app.route('/book')
+    def book():
+        with database.transaction() as outer:
+            pass
+        with database.db_session(read_only=True) as connection:
+            # 같은 요청에서 primary를 이미 썼으면 그대로 재사용
+            seen['reused'] = connection is outer
+        seen['returned_before_teardown'] = 'returned' in connections[0]
+        return 'ok'
+
+    assert app.test_client().get('/book').status_code == 200
+    assert seen == {'reused': True, 'returned_before_teardown': False}
+    assert len(connections) == 1
+    assert connections[0][-1] == 'returned'
+
+
+def test_unavailable_database_raises(monkeypatch):
+    monkeypatch.setattr(database, 'get_db_connection', lambda read_only=False: None)
+    with pytest.raises(database.DatabaseUnavailableError):
+        with database.transaction():
+            pass